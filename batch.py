@@ -0,0 +1,92 @@
+import sys
+import asyncio
+import argparse
+import importlib
+from crawler_module.batch_runner import BatchRunner, load_jobs
+from crawler_module.metrics import Metrics, JsonLinesSink
+from crawler_module.rate_limit import ByteBudget
+
+SOURCES = {
+    "cola": "crawler_module.cola_crawler.ColaCrawler",
+    "copy": "crawler_module.copy_crawler.CopyCrawler",
+}
+
+
+def crawler_factory(source, proxies, **options):
+    # 第一个使用该漫画源的任务开始时才导入对应爬虫，只有Copy任务时不会加载Cola的依赖
+    # options透传给爬虫构造函数；所有爬虫共用同一个字节预算，在途图片数据的总量受同一个上限约束
+    module_name, class_name = SOURCES[source].rsplit(".", 1)
+
+    def create(**kwargs):
+        crawler_class = getattr(importlib.import_module(module_name), class_name)
+        return crawler_class(proxies=proxies, **options, **kwargs)
+
+    return create
+
+
+def print_result(idx, result):
+    job, report = result["job"], result["report"]
+    status = "成功" if result["ok"] else "失败"
+    name = report["manga"] or job["manga"]
+    print(f"\n[{idx}] {job['source']} {name} 章节 {job['chapters']}: {status} ({result['elapsed']} s)")
+    if report["error"]:
+        print(f"  {report['error']}")
+    for chapter in report["chapters"]:
+        print(f"  [{chapter['status']}] {chapter['name']}: {chapter['message']}")
+
+
+async def run(args, jobs, metrics):
+    proxies = {"http": args.proxy, "https": args.proxy} if args.proxy else None
+    byte_budget = ByteBudget(int(args.max_inflight_mb * 1024 * 1024)) if args.max_inflight_mb else None
+    factories = {
+        source: crawler_factory(source, proxies, byte_budget=byte_budget, cpu_executor=args.cpu_executor,
+                                cpu_workers=args.cpu_workers, cpu_queue=args.cpu_queue)
+        for source in SOURCES
+    }
+    async with BatchRunner(factories, args.parallel, metrics) as runner:
+        return await runner.run(jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按任务文件批量下载漫画")
+    parser.add_argument("jobs", help='任务文件(JSON)，如 [{"source": "copy", "manga": "path_word", "chapters": "1-5"}]')
+    parser.add_argument("--parallel", type=int, default=1, help="同时执行的任务数")
+    parser.add_argument("--proxy", help="代理地址，如 http://127.0.0.1:7897")
+    parser.add_argument("--max-inflight-mb", type=float, help="所有任务共用的图片在途数据上限(MB)，默认不限制")
+    parser.add_argument("--cpu-executor", choices=["thread", "process"], default="thread",
+                        help="解密、转码与PDF生成使用的执行器类型")
+    parser.add_argument("--cpu-workers", type=int, help="执行器的工作线程或进程数，默认为CPU核数")
+    parser.add_argument("--cpu-queue", type=int, help="同时提交到执行器(含排队)的任务数上限，默认为工作数的2倍")
+    parser.add_argument("--metrics", help="结束后将指标以Prometheus文本格式写入该文件")
+    parser.add_argument("--events", help="将指标事件以JSON行追加写入该文件")
+    args = parser.parse_args()
+
+    try:
+        jobs = load_jobs(args.jobs)
+    except (OSError, ValueError) as e:
+        print(f"读取任务文件失败: {e}")
+        return 2
+    unknown = sorted({job["source"] for job in jobs} - set(SOURCES))
+    if unknown:
+        print(f"未知的漫画源: {', '.join(unknown)}，可选: {', '.join(SOURCES)}")
+        return 2
+
+    metrics = Metrics()
+    sink = metrics.subscribe(JsonLinesSink(args.events)) if args.events else None
+    try:
+        results = asyncio.run(run(args, jobs, metrics))
+    finally:
+        if sink:
+            sink.close()
+    for idx, result in enumerate(results, 1):
+        print_result(idx, result)
+    failed = sum(not result["ok"] for result in results)
+    print(f"\n共 {len(results)} 个任务，成功 {len(results) - failed}，失败 {failed}")
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(metrics.to_prometheus())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import argparse
+import pyaes
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler_module.aes_backend import available_backends, get_aes_backend
+
+IV = "0000000000000000".encode("utf-8")
+DEFAULT_KEY = b"benchmarkaeskey0"
+
+
+def build_corpus(pages, page_size, key):
+    """生成加密页面语料，模拟enc.webp图片
+
+    Args:
+        pages: 页数
+        page_size: 每页明文大小(字节)
+        key: 密钥字节数据
+
+    Returns:
+        list: 加密后的页面字节数据列表
+    """
+    corpus = []
+    for _ in range(pages):
+        encrypter = pyaes.Encrypter(pyaes.AESModeOfOperationCBC(key, iv=IV))
+        plain = b"RIFF" + os.urandom(page_size - 4)
+        corpus.append(encrypter.feed(plain) + encrypter.feed())
+    return corpus
+
+
+def load_corpus(corpus_dir):
+    """读取目录下已保存的enc.webp页面
+
+    Args:
+        corpus_dir: 语料目录
+
+    Returns:
+        list: 加密后的页面字节数据列表
+    """
+    corpus = []
+    for fname in sorted(os.listdir(corpus_dir)):
+        if fname.endswith(".enc.webp"):
+            with open(os.path.join(corpus_dir, fname), "rb") as f:
+                corpus.append(f.read())
+    return corpus
+
+
+def run(backend_name, corpus, key, rounds):
+    """使用指定后端解密全部语料并计算吞吐
+
+    Args:
+        backend_name: 后端名称
+        corpus: 加密页面列表
+        key: 密钥字节数据
+        rounds: 重复轮数
+
+    Returns:
+        tuple: (MB/s, 解密结果列表)
+    """
+    backend = get_aes_backend(backend_name)
+    total_bytes = sum(len(data) for data in corpus) * rounds
+    outputs = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        outputs = [backend.decrypt_cbc(key, IV, data) for data in corpus]
+    elapsed = time.perf_counter() - start
+    return total_bytes / elapsed / 1024 / 1024, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AES解密后端吞吐基准")
+    parser.add_argument("--corpus", help="enc.webp页面目录，不指定时生成随机语料")
+    parser.add_argument("--key", help="密钥文件路径(.bin)，配合--corpus使用")
+    parser.add_argument("--pages", type=int, default=10, help="生成语料的页数")
+    parser.add_argument("--page-size", type=int, default=300 * 1024, help="生成语料的每页大小")
+    parser.add_argument("--rounds", type=int, default=3, help="重复轮数")
+    args = parser.parse_args()
+
+    if args.corpus:
+        if not args.key:
+            parser.error("使用--corpus时必须提供--key")
+        with open(args.key, "rb") as f:
+            key = f.read()
+        corpus = load_corpus(args.corpus)
+    else:
+        key = DEFAULT_KEY
+        corpus = build_corpus(args.pages, args.page_size, key)
+    if not corpus:
+        print("语料为空")
+        return 1
+
+    size_mb = sum(len(data) for data in corpus) / 1024 / 1024
+    print(f"语料: {len(corpus)} 页, {size_mb:.2f} MB, 轮数: {args.rounds}")
+    reference = None
+    for name in available_backends():
+        throughput, outputs = run(name, corpus, key, args.rounds)
+        if reference is None:
+            reference = outputs
+        elif outputs != reference:
+            print(f"{name}: 解密结果与其他后端不一致")
+            return 1
+        print(f"{name:>14}: {throughput:8.2f} MB/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mock_site import MockSite, AES_KEY, FIXTURE_DIR, COLA_MANGA_ID, COLA_ENCRYPTED
+from crawler_module.aes_backend import available_backends, get_aes_backend
+from crawler_module.cola_static import (key_candidates, find_image_key, find_chapter_data, decode_chapter_data,
+                                        resolve_image_info)
+
+DEFAULT_SCRIPTS = [os.path.join(FIXTURE_DIR, "cola_read.js"), os.path.join(FIXTURE_DIR, "cola_custom.js")]
+DEFAULT_READER = os.path.join(FIXTURE_DIR, "cola_reader.html")
+# fixtures/cola_reader.html由模拟站点以20页生成
+DEFAULT_READER_INFO = (COLA_MANGA_ID, COLA_ENCRYPTED, 20, "0001.enc.webp")
+
+
+def check_key(scripts, sample, expected, rounds):
+    """在各AES后端上从脚本中提取密钥，校验结果并统计耗时
+
+    Args:
+        scripts: 脚本内容列表
+        sample: 加密图片样本
+        expected: 期望的密钥，为None时只要求找到密钥
+        rounds: 重复轮数
+
+    Returns:
+        bool: 所有后端都得到正确结果时为True
+    """
+    ok = True
+    candidates = key_candidates(scripts)
+    print(f"候选密钥 {len(candidates)} 个, 样本 {len(sample) / 1024:.1f} KB")
+    for name in available_backends():
+        backend = get_aes_backend(name)
+        key = None
+        start = time.perf_counter()
+        for _ in range(rounds):
+            key = find_image_key(key_candidates(scripts), sample, backend)
+        elapsed = (time.perf_counter() - start) / rounds * 1000
+        correct = key is not None and (expected is None or key == expected)
+        ok = ok and correct
+        print(f"{name:>14}: {elapsed:8.2f} ms, 密钥 {key!r} {'正确' if correct else '错误'}")
+    return ok
+
+
+def check_chapter_info(scripts, html, expected, rounds):
+    """在各AES后端上解码阅读页内嵌的章节数据，校验结果并统计耗时
+
+    Args:
+        scripts: 脚本内容列表
+        html: 阅读页HTML
+        expected: 期望的(manga_id, encrypted_string, total_pages, image_filename)，为None时只要求解析成功
+        rounds: 重复轮数
+
+    Returns:
+        bool: 所有后端都得到正确结果时为True
+    """
+    ok = True
+    c_data = find_chapter_data(html)
+    if not c_data:
+        print("阅读页中未找到C_DATA")
+        return False
+    for name in available_backends():
+        backend = get_aes_backend(name)
+        info = None
+        start = time.perf_counter()
+        for _ in range(rounds):
+            candidates = key_candidates(scripts)
+            chapter_data = decode_chapter_data(c_data, candidates, backend)
+            info = resolve_image_info(chapter_data, candidates, backend) if chapter_data else None
+        elapsed = (time.perf_counter() - start) / rounds * 1000
+        correct = info is not None and (expected is None or tuple(info) == expected)
+        ok = ok and correct
+        print(f"{name:>14}: {elapsed:8.2f} ms, 章节信息 {info} {'正确' if correct else '错误'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cola静态密钥提取与章节信息解码的正确性校验与基准")
+    parser.add_argument("--script", action="append", help="阅读页脚本文件，可重复，默认为fixtures中的两个脚本")
+    parser.add_argument("--sample", help="加密图片文件(enc.webp)，默认使用模拟站点按AES_KEY加密的图片")
+    parser.add_argument("--expect-key", help="期望的密钥字符串，默认在使用模拟样本时为AES_KEY")
+    parser.add_argument("--reader", help="阅读页HTML文件，默认为fixtures/cola_reader.html")
+    parser.add_argument("--rounds", type=int, default=20, help="重复轮数")
+    args = parser.parse_args()
+
+    scripts = []
+    for path in args.script or DEFAULT_SCRIPTS:
+        with open(path, "r", encoding="utf-8") as f:
+            scripts.append(f.read())
+    if args.sample:
+        with open(args.sample, "rb") as f:
+            sample = f.read()
+        expected = args.expect_key.encode("utf-8") if args.expect_key else None
+    else:
+        sample = MockSite(variants=1).enc_webps[0]
+        expected = args.expect_key.encode("utf-8") if args.expect_key else AES_KEY
+    with open(args.reader or DEFAULT_READER, "r", encoding="utf-8") as f:
+        html = f.read()
+    key_ok = check_key(scripts, sample, expected, args.rounds)
+    print()
+    info_ok = check_chapter_info(scripts, html, None if args.reader else DEFAULT_READER_INFO, args.rounds)
+    return 0 if key_ok and info_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
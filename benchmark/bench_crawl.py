@@ -0,0 +1,309 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import shutil
+import tempfile
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mock_site import start_mock_site, COLA_MANGA_ID
+from crawler_module.cola_crawler import ColaCrawler
+from crawler_module.copy_crawler import CopyCrawler
+
+NO_PROXY = {"http": None, "https": None}
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crawl_baseline.json")
+# 低于该值的阶段CPU时间噪声太大，不参与回归判断
+MIN_COMPARABLE_CPU = 0.05
+
+
+def peak_rss_mb():
+    """读取当前进程的峰值常驻内存
+
+    Args:
+        None
+
+    Returns:
+        float: 峰值RSS(MB)，平台不支持时返回None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024, 2)
+
+
+def percentile(values, pct):
+    """计算百分位数(最近秩)
+
+    Args:
+        values: 数值列表
+        pct: 百分位(0-100)
+
+    Returns:
+        float: 百分位数，列表为空时返回0
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def track_page_latency(crawler, marker, latencies):
+    """包装爬虫的fetch，记录图片请求的耗时
+
+    Args:
+        crawler: 爬虫实例
+        marker: 图片URL中包含的路径片段
+        latencies: 用于保存耗时(秒)的列表
+
+    Returns:
+        None
+    """
+    fetch = crawler.fetch
+
+    async def timed_fetch(url, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fetch(url, *args, **kwargs)
+        finally:
+            if marker in url:
+                latencies.append(time.perf_counter() - start)
+
+    crawler.fetch = timed_fetch
+
+
+async def run_stage(stages, name, coro):
+    """执行一个阶段并记录墙钟时间、CPU时间与峰值内存
+
+    Args:
+        stages: 阶段统计字典
+        name: 阶段名称
+        coro: 该阶段的协程
+
+    Returns:
+        阶段协程的返回值
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = await coro
+    stages[name] = {
+        "wall_s": round(time.perf_counter() - wall_start, 4),
+        "cpu_s": round(time.process_time() - cpu_start, 4),
+        "peak_rss_mb": peak_rss_mb()
+    }
+    return result
+
+
+def summarize(stages, pages, latencies, budget):
+    fetch_wall = stages["fetch"]["wall_s"]
+    return {
+        "pages": pages,
+        "pages_per_sec": round(pages / fetch_wall, 2) if fetch_wall else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_inflight_mb": round(budget.peak / (1024 * 1024), 2),
+        "stages": stages
+    }
+
+
+async def bench_copy(base_url, keywords, byte_budget=None, cpu_executor="thread"):
+    """对模拟站点运行CopyCrawler的搜索、章节、解析、下载与合并阶段
+
+    Args:
+        base_url: 模拟站点根地址
+        keywords: 搜索关键词列表
+        byte_budget: 图片响应体的在途字节上限，默认为None即不限制
+        cpu_executor: 解密、转码与PDF生成使用的执行器类型，默认为thread
+
+    Returns:
+        dict: 统计结果
+    """
+    crawler = CopyCrawler(proxies=NO_PROXY, domains=[urlsplit(base_url).netloc], scheme="http",
+                          byte_budget=byte_budget, cpu_executor=cpu_executor)
+    latencies = []
+    track_page_latency(crawler, "/copyimg/", latencies)
+    stages = {}
+    async with crawler:
+        await run_stage(stages, "search", asyncio.gather(*[crawler.search_results(k) for k in keywords]))
+        path_word = "mock0"
+        chapters = await run_stage(stages, "chapters", crawler._fetch_chapters(path_word))
+        if isinstance(chapters, str):
+            raise RuntimeError(chapters)
+        image_urls = await run_stage(stages, "resolve", asyncio.gather(
+            *[crawler._resolve_chapter(path_word, ch["uuid"]) for ch in chapters]
+        ))
+        fetched = await run_stage(stages, "fetch", asyncio.gather(*[
+            crawler._fetch_chapter("mock", ch["name"], path_word, ch["uuid"], urls)
+            for ch, urls in zip(chapters, image_urls)
+        ]))
+
+        async def assemble():
+            for ch, result in zip(chapters, fetched):
+                await crawler._assemble_chapter(ch["uuid"], *result)
+
+        await run_stage(stages, "assemble", assemble())
+    return summarize(stages, sum(result[2] for result in fetched), latencies, crawler.byte_budget)
+
+
+async def bench_cola(base_url, cdn_url, keywords, pages, byte_budget=None, cpu_executor="thread"):
+    """对模拟站点运行ColaCrawler的搜索、章节、解析、下载解密与合并阶段
+
+    章节信息从模拟阅读页内嵌的C_DATA解码，密钥在下载第一张加密图片时从阅读页脚本中提取，都不启动浏览器
+
+    Args:
+        base_url: 模拟站点根地址
+        cdn_url: 模拟CDN根地址
+        keywords: 搜索关键词列表
+        pages: 每章页数，用于校验解析结果
+        byte_budget: 图片响应体的在途字节上限，默认为None即不限制
+        cpu_executor: 解密、转码与PDF生成使用的执行器类型，默认为thread
+
+    Returns:
+        dict: 统计结果
+    """
+    crawler = ColaCrawler(proxies=NO_PROXY, base_url=base_url, image_base_url=cdn_url, byte_budget=byte_budget,
+                          cpu_executor=cpu_executor)
+    latencies = []
+    track_page_latency(crawler, "/comic/", latencies)
+    stages = {}
+    async with crawler:
+        await run_stage(stages, "search", asyncio.gather(*[crawler.search_results(k) for k in keywords]))
+
+        async def load_chapters():
+            response = await crawler.fetch(f"{base_url}/manga-{COLA_MANGA_ID}0")
+            return crawler.parse_manga_page(response.text)["chapters"]
+
+        chapters = await run_stage(stages, "chapters", load_chapters())
+        infos = await run_stage(stages, "resolve", crawler.resolve_image_infos([ch["url"] for ch in chapters]))
+        if any(info[2] != pages for info in infos):
+            raise RuntimeError(f"章节信息解析错误: {infos}")
+        fetched = await run_stage(stages, "fetch", asyncio.gather(*[
+            crawler.download_chapter_images("mock", chapter["name"], chapter["url"], *info)
+            for chapter, info in zip(chapters, infos)
+        ]))
+
+        async def assemble():
+            for chapter, info, (_, image_paths, pdf_filepath) in zip(chapters, infos, fetched):
+                await crawler.finish_chapter(chapter["url"], image_paths, pdf_filepath, info[2])
+
+        await run_stage(stages, "assemble", assemble())
+    return summarize(stages, sum(result[0] for result in fetched), latencies, crawler.byte_budget)
+
+
+def compare(report, baseline, tolerance):
+    """与基线比较，找出超过容差的退化项
+
+    Args:
+        report: 本次结果
+        baseline: 基线结果
+        tolerance: 允许的相对退化比例
+
+    Returns:
+        list: 退化描述列表
+    """
+    regressions = []
+
+    def check(label, current, base, higher_is_better):
+        if current is None or not base:
+            return
+        if higher_is_better and current < base * (1 - tolerance):
+            regressions.append(f"{label}: {current} < 基线 {base}")
+        elif not higher_is_better and current > base * (1 + tolerance):
+            regressions.append(f"{label}: {current} > 基线 {base}")
+
+    for source, result in report.items():
+        base = baseline.get(source)
+        if not base:
+            continue
+        check(f"{source}.pages_per_sec", result["pages_per_sec"], base.get("pages_per_sec"), True)
+        check(f"{source}.latency_p99_ms", result["latency_p99_ms"], base.get("latency_p99_ms"), False)
+        check(f"{source}.peak_rss_mb", result["peak_rss_mb"], base.get("peak_rss_mb"), False)
+        for stage, stats in result["stages"].items():
+            base_cpu = base.get("stages", {}).get(stage, {}).get("cpu_s")
+            if base_cpu and base_cpu >= MIN_COMPARABLE_CPU:
+                check(f"{source}.{stage}.cpu_s", stats["cpu_s"], base_cpu, False)
+    return regressions
+
+
+def print_report(source, result):
+    print(f"\n[{source}] {result['pages']} 页, {result['pages_per_sec']} 页/秒, "
+          f"p50 {result['latency_p50_ms']} ms, p99 {result['latency_p99_ms']} ms, 峰值RSS {result['peak_rss_mb']} MB, "
+          f"峰值在途 {result['peak_inflight_mb']} MB")
+    for stage, stats in result["stages"].items():
+        print(f"  {stage:>9}: 墙钟 {stats['wall_s']:8.3f} s, CPU {stats['cpu_s']:8.3f} s")
+
+
+async def run(args, base_url, cdn_url):
+    keywords = [f"bench{i}" for i in range(args.searches)]
+    byte_budget = int(args.max_inflight_mb * 1024 * 1024) if args.max_inflight_mb else None
+    report = {}
+    if args.source in ("copy", "all"):
+        report["copy"] = await bench_copy(base_url, keywords, byte_budget, args.cpu_executor)
+    if args.source in ("cola", "all"):
+        report["cola"] = await bench_cola(base_url, cdn_url, keywords, args.pages, byte_budget, args.cpu_executor)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="基于本地模拟站点的离线爬虫基准")
+    parser.add_argument("--source", choices=["copy", "cola", "all"], default="all", help="要测试的漫画源")
+    parser.add_argument("--chapters", type=int, default=4, help="每部漫画的章节数")
+    parser.add_argument("--pages", type=int, default=20, help="每章页数")
+    parser.add_argument("--searches", type=int, default=8, help="并发搜索的关键词数")
+    parser.add_argument("--latency", type=float, default=0.02, help="模拟站点每个请求的延迟(秒)")
+    parser.add_argument("--max-inflight-mb", type=float, help="图片响应体的在途字节上限(MB)，默认不限制")
+    parser.add_argument("--cpu-executor", choices=["thread", "process"], default="thread",
+                        help="解密、转码与PDF生成使用的执行器类型")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果写入或覆盖基线，基线不存在时必须指定")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的相对退化比例")
+    parser.add_argument("--output", help="将本次结果保存为JSON")
+    args = parser.parse_args()
+    if not args.update_baseline and not os.path.exists(args.baseline):
+        print(f"基线文件不存在: {args.baseline}，请先在参考环境中使用 --update-baseline 生成")
+        return 2
+
+    process, base_url, cdn_url = start_mock_site(chapters=args.chapters, pages=args.pages, latency=args.latency)
+    workdir = tempfile.mkdtemp(prefix="manga_bench_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        report = asyncio.run(run(args, base_url, cdn_url))
+    finally:
+        os.chdir(cwd)
+        process.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"\n模拟站点: {base_url}")
+    for source, result in report.items():
+        print_report(source, result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n已写入基线: {args.baseline}")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.tolerance)
+    if regressions:
+        print("\n性能退化超过容差:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\n未发现超过容差的退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 只在对应阶段首次运行时才应加载的重量级依赖
+HEAVY_MODULES = ["pyppeteer", "PIL", "bs4", "lxml", "pyaes", "cryptography"]
+TARGETS = {
+    "copy": "import crawler_module.copy_crawler",
+    "cola": "import crawler_module.cola_crawler",
+    "main": "import main",
+    "batch": "import batch",
+}
+# 导入时不应加载任何重量级依赖的入口
+LIGHT_TARGETS = ["copy", "main", "batch"]
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement, rounds):
+    """在全新的解释器中重复执行导入语句，只计导入本身的耗时
+
+    Args:
+        statement: 导入语句
+        rounds: 重复次数
+
+    Returns:
+        dict: {"median_ms", "min_ms", "loaded": 导入后已加载的重量级依赖}
+    """
+    samples = []
+    loaded = []
+    code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    for _ in range(rounds):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        loaded = result["loaded"]
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "min_ms": round(min(samples), 2),
+        "loaded": loaded
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="入口模块的冷启动导入耗时基准")
+    parser.add_argument("--rounds", type=int, default=5, help="每个入口重复的次数")
+    parser.add_argument("--target", choices=list(TARGETS), action="append", help="只测试指定入口，可重复")
+    parser.add_argument("--output", help="将结果保存为JSON")
+    args = parser.parse_args()
+
+    report = {}
+    for name in args.target or TARGETS:
+        report[name] = measure(TARGETS[name], args.rounds)
+        result = report[name]
+        loaded = ", ".join(result["loaded"]) or "无"
+        print(f"{name:>6}: 中位数 {result['median_ms']:8.2f} ms, 最小 {result['min_ms']:8.2f} ms, 已加载: {loaded}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    eager = [name for name in LIGHT_TARGETS if report.get(name, {}).get("loaded")]
+    if eager:
+        print(f"\n以下入口在导入时加载了重量级依赖: {', '.join(eager)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
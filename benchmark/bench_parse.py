@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import argparse
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler_module.html_parser import available_parsers
+from crawler_module.cola_parser import parse_search_page, parse_manga_page
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def legacy_parse(search_html, detail_html):
+    """旧实现：html.parser解析搜索页，详情页分别为章节与标题各解析一次
+
+    Args:
+        search_html: 搜索页HTML
+        detail_html: 详情页HTML
+
+    Returns:
+        None
+    """
+    soup = BeautifulSoup(search_html, "html.parser")
+    soup.select_one("#fed-count")
+    for dl in soup.select("dl.fed-deta-info"):
+        dl.select_one("h1 a")
+        for li in dl.select("li"):
+            li.select_one(".fed-text-muted")
+    soup = BeautifulSoup(detail_html, "html.parser")
+    container = soup.select_one(".all_data_list")
+    if container:
+        container.select("a.fed-btns-info")
+    BeautifulSoup(detail_html, "html.parser").select_one(".fed-part-eone h1")
+
+
+def run(func, rounds):
+    """重复执行并返回平均耗时
+
+    Args:
+        func: 无参数的解析函数
+        rounds: 重复轮数
+
+    Returns:
+        tuple: (平均毫秒数, 最后一次的返回值)
+    """
+    result = None
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cola页面解析基准")
+    parser.add_argument("--search", default=os.path.join(FIXTURE_DIR, "cola_search.html"), help="搜索页HTML文件")
+    parser.add_argument("--detail", default=os.path.join(FIXTURE_DIR, "cola_detail.html"), help="详情页HTML文件")
+    parser.add_argument("--rounds", type=int, default=20, help="重复轮数")
+    args = parser.parse_args()
+
+    with open(args.search, "r", encoding="utf-8") as f:
+        search_html = f.read()
+    with open(args.detail, "r", encoding="utf-8") as f:
+        detail_html = f.read()
+
+    print(f"搜索页: {len(search_html) / 1024:.1f} KB, 详情页: {len(detail_html) / 1024:.1f} KB, 轮数: {args.rounds}")
+    elapsed, _ = run(lambda: legacy_parse(search_html, detail_html), args.rounds)
+    print(f"{'legacy':>12}: {elapsed:8.2f} ms")
+    reference = None
+    for name in available_parsers():
+        elapsed, result = run(
+            lambda: (parse_search_page(search_html, name), parse_manga_page(detail_html, name)),
+            args.rounds
+        )
+        if reference is None:
+            reference = result
+        elif result != reference:
+            print(f"{name}: 解析结果与其他后端不一致")
+            return 1
+        print(f"{name:>12}: {elapsed:8.2f} ms")
+    search, detail = reference
+    print(f"搜索结果 {len(search['results']['list'])} 条, 章节 {len(detail['chapters'])} 个")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+/* 阅读页公共脚本样例：C_DATA与enc_code的解密方式，密钥以明文字面量出现 */
+var __cad_keys={'data':'mockcdatakey0016','code':'mockenccodekey16','ad':'0123456789abcdef'};
+function __cdecrypt(_key,_word){var _k=CryptoJS.enc.Utf8.parse(_key);var _d=CryptoJS.AES.decrypt(_word,_k,{mode:CryptoJS.mode.ECB,padding:CryptoJS.pad.Pkcs7});return CryptoJS.enc.Utf8.stringify(_d).toString();}
+if(typeof C_DATA!=='undefined'){eval(__cdecrypt(__cad_keys.data,CryptoJS.enc.Base64.parse(C_DATA).toString(CryptoJS.enc.Utf8)));}
+function __cr_getpage(){return parseInt(__cdecrypt(__cad_keys.code,mh_info.enc_code1));}
+function __cr_getpice(_i){var _p=String(_i);while(_p.length<4){_p='0'+_p;}return '//'+mh_info.domain+'/comic/'+__cdecrypt(__cad_keys.code,mh_info.enc_code2)+'/'+_p+'.'+(image_info.img_type||'jpg');}
@@ -0,0 +1,8 @@
+/* 阅读页脚本样例：与站点脚本相同的字符串表加下标查找的混淆方式，真实密钥排在多个诱饵之后 */
+var _0x3f1a=['fed-list-imgs','\x30\x30\x30\x30\x30\x30\x30\x30\x30\x30\x30\x30\x30\x30\x30\x30','placeholderkey16','\x5f\x5f\x63\x72\x5f\x67\x65\x74\x70\x69\x63\x65','\x36\x66\x33\x61\x39\x63\x32\x65\x31\x62\x37\x64\x34\x30\x35\x38','abcdefghijklmnopqrstuvwx','\x6d\x6f\x63\x6b\x73\x69\x74\x65\x61\x65\x73\x6b\x65\x79\x31\x36','mangalist'];
+(function(_0x2d8f,_0x4b81){var _0x6e0b=function(_0x4f0c){while(--_0x4f0c){_0x2d8f['push'](_0x2d8f['shift']());}};_0x6e0b(++_0x4b81);}(_0x3f1a,0x0));
+var _0x1c2e=function(_0x5d1a,_0x3a2b){_0x5d1a=_0x5d1a-0x0;var _0x4e7f=_0x3f1a[_0x5d1a];return _0x4e7f;};
+var __READKEY=CryptoJS.enc.Utf8.parse(_0x1c2e('0x4'));
+function __cdecrypt(_0x1f2c,_0x2b9e){var _0x5c3d=CryptoJS['enc']['Utf8']['parse'](_0x1f2c);var _0x2a1f=CryptoJS.enc.Utf8.parse(_0x1c2e('0x1'));var _0x3e8a=CryptoJS['AES']['decrypt'](_0x2b9e,_0x5c3d,{'iv':_0x2a1f,'mode':CryptoJS['mode']['CBC'],'padding':CryptoJS['pad']['Pkcs7']});return _0x3e8a;}
+function __cr_decodeimg(_0x4a9b){return __cdecrypt(_0x1c2e('0x6'),_0x4a9b);}
+var __cad={'list':_0x1c2e('0x0'),'box':_0x1c2e('0x7'),'fallback':'zyxwvutsrqponmlk'};
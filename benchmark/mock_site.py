@@ -0,0 +1,282 @@
+import os
+import re
+import json
+import base64
+import time
+import random
+import threading
+import multiprocessing
+from io import BytesIO
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pyaes
+from PIL import Image
+
+AES_KEY = b"mocksiteaeskey16"
+AES_IV = b"0000000000000000"
+COLA_MANGA_ID = "10001"
+COLA_ENCRYPTED = "mockenc"
+# 与fixtures/cola_custom.js中的密钥一致，分别用于C_DATA与mh_info.enc_code*
+COLA_DATA_KEY = b"mockcdatakey0016"
+COLA_CODE_KEY = b"mockenccodekey16"
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def render_page(width, height, seed):
+    """生成一张带噪点的漫画页，让编码后的体积接近真实页面
+
+    Args:
+        width: 宽度
+        height: 高度
+        seed: 随机种子
+
+    Returns:
+        Image: 图片对象
+    """
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height), (250, 250, 250))
+    noise = Image.frombytes("L", (width // 4, height // 4), rng.randbytes(width // 4 * height // 4))
+    image.paste(noise.resize((width, height)).convert("RGB"), (0, 0))
+    return image
+
+
+def encrypt_cbc(data):
+    """使用与站点相同的参数进行AES-CBC加密
+
+    Args:
+        data: 明文字节数据
+
+    Returns:
+        bytes: 密文
+    """
+    encrypter = pyaes.Encrypter(pyaes.AESModeOfOperationCBC(AES_KEY, iv=AES_IV))
+    return encrypter.feed(data) + encrypter.feed()
+
+
+def encrypt_ecb_text(key, text):
+    """AES-ECB加密文本并编码为Base64，与阅读页脚本的__cdecrypt对应
+
+    Args:
+        key: 密钥字节数据
+        text: 明文字符串
+
+    Returns:
+        str: Base64密文
+    """
+    encrypter = pyaes.Encrypter(pyaes.AESModeOfOperationECB(key))
+    return base64.b64encode(encrypter.feed(text.encode("utf-8")) + encrypter.feed()).decode("ascii")
+
+
+def make_chapter_data(chapter, pages, domain):
+    """生成阅读页内嵌的C_DATA
+
+    Args:
+        chapter: 章节序号
+        pages: 总页数
+        domain: 图片CDN主机
+
+    Returns:
+        str: C_DATA的Base64文本
+    """
+    script = (
+        f'var mh_info={{startimg:1,enc_code1:"{encrypt_ecb_text(COLA_CODE_KEY, str(pages))}",mhid:"{COLA_MANGA_ID}",'
+        f'enc_code2:"{encrypt_ecb_text(COLA_CODE_KEY, f"{COLA_MANGA_ID}/{COLA_ENCRYPTED}")}",mhname:"mock",'
+        f'pageid:{chapter},pagename:"第{chapter:02d}话",readmode:3,domain:"{domain}"}};'
+        f'var image_info={{img_type:"enc.webp",urls__direct:"",line_id:1,local_watch_url:""}};'
+    )
+    return base64.b64encode(encrypt_ecb_text(COLA_DATA_KEY, script).encode("ascii")).decode("ascii")
+
+
+class MockSite:
+    """模拟站点的数据与路由
+
+    Copy接口与Cola页面由站点服务提供，两个站点的图片由另一个端口的CDN服务提供，
+    让爬虫按主机区分的连接池与限流器和真实环境一样工作
+    """
+
+    def __init__(self, chapters=4, pages=20, width=800, height=1200, latency=0.02, variants=4):
+        """生成模拟数据
+
+        Args:
+            chapters: 每部漫画的章节数，默认为4
+            pages: 每章页数，默认为20
+            width: 图片宽度，默认为800
+            height: 图片高度，默认为1200
+            latency: 每个请求额外等待的秒数，模拟网络延迟，默认为0.02
+            variants: 不同图片的数量，默认为4
+
+        Returns:
+            None
+        """
+        self.chapters = chapters
+        self.pages = pages
+        self.latency = latency
+        self.cdn_url = ""
+        self.scripts = {}
+        for name in ("cola_read.js", "cola_custom.js"):
+            with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+                self.scripts[name] = f.read()
+        self.jpegs = []
+        self.enc_webps = []
+        for seed in range(variants):
+            image = render_page(width, height, seed)
+            output = BytesIO()
+            image.save(output, "JPEG", quality=85)
+            self.jpegs.append(output.getvalue())
+            output = BytesIO()
+            image.save(output, "WEBP", quality=80)
+            self.enc_webps.append(encrypt_cbc(output.getvalue()))
+
+    def copy_chapters(self, path_word):
+        """生成Copy漫画的章节列表
+
+        Args:
+            path_word: 漫画路径标识
+
+        Returns:
+            list: 章节信息列表
+        """
+        return [{"name": f"第{i + 1:02d}话", "uuid": f"{path_word}-{i + 1}"} for i in range(self.chapters)]
+
+    def route(self, path, query):
+        """根据请求路径生成响应
+
+        Args:
+            path: 请求路径
+            query: 查询参数字典
+
+        Returns:
+            tuple: (状态码, Content-Type, 响应体)
+        """
+        if path == "/api/kb/web/searchbd/comics":
+            keyword = query.get("q", [""])[0]
+            items = [{"name": f"{keyword}{i}", "path_word": f"mock{i}", "author": [{"name": "作者"}]} for i in range(12)]
+            return self._json({"results": {"total": len(items), "list": items}})
+        match = re.match(r"^/api/v3/comic2/([^/]+)$", path)
+        if match:
+            groups = {"default": {"path_word": "default", "name": "默认", "count": self.chapters}}
+            return self._json({"results": {"groups": groups}})
+        match = re.match(r"^/api/v3/comic/([^/]+)/group/([^/]+)/chapters$", path)
+        if match:
+            chapters = self.copy_chapters(match.group(1)) if match.group(2) == "default" else []
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["500"])[0])
+            return self._json({"results": {"total": len(chapters), "list": chapters[offset:offset + limit]}})
+        match = re.match(r"^/api/v3/comic/([^/]+)/chapter/([^/]+)$", path)
+        if match:
+            contents = [{"url": f"{self.cdn_url}/copyimg/{match.group(2)}/{page}.jpg"} for page in range(self.pages)]
+            return self._json({"results": {"chapter": {"contents": contents}}})
+        match = re.match(r"^/copyimg/[^/]+/(\d+)\.jpg$", path)
+        if match:
+            return 200, "image/jpeg", self.jpegs[int(match.group(1)) % len(self.jpegs)]
+        match = re.match(r"^/comic/[^/]+/[^/]+/(\d+)\.(jpg|enc\.webp)$", path)
+        if match:
+            index = int(match.group(1)) % len(self.jpegs)
+            if match.group(2) == "jpg":
+                return 200, "image/jpeg", self.jpegs[index]
+            return 200, "image/webp", self.enc_webps[index]
+        if path == "/":
+            return 200, "text/html; charset=utf-8", b"<html><body>mock</body></html>"
+        if path == "/search":
+            return 200, "text/html; charset=utf-8", self._cola_search(query.get("searchString", [""])[0])
+        if path == "/js/manga.read.js":
+            return 200, "application/javascript", self.scripts["cola_read.js"]
+        if path == "/js/custom.js":
+            return 200, "application/javascript", self.scripts["cola_custom.js"]
+        match = re.match(r"^/manga-[^/]+/\d+/(\d+)\.html$", path)
+        if match:
+            return 200, "text/html; charset=utf-8", self._cola_reader(int(match.group(1)))
+        match = re.match(r"^/(manga-[^/]+)/?$", path)
+        if match:
+            return 200, "text/html; charset=utf-8", self._cola_detail(match.group(1))
+        return 404, "text/plain", b"not found"
+
+    def _json(self, data):
+        return 200, "application/json", json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    def _cola_search(self, keyword):
+        items = "".join(
+            f'<dl class="fed-deta-info"><dd><h1><a href="/manga-{COLA_MANGA_ID}{i}/">{keyword}{i}</a></h1>'
+            f'<ul><li><span class="fed-text-muted">作者：</span>作者</li></ul></dd></dl>'
+            for i in range(12)
+        )
+        return f'<html><body><span id="fed-count">12</span>{items}</body></html>'.encode("utf-8")
+
+    def _cola_reader(self, chapter):
+        c_data = make_chapter_data(chapter, self.pages, urlsplit(self.cdn_url).netloc)
+        return (f'<html><head><title>第{chapter:02d}话</title>'
+                f'<script src="https://www.googletagmanager.com/gtag/js"></script>'
+                f'<script src="/js/custom.js"></script><script src="/js/manga.read.js"></script></head>'
+                f'<body><div id="mangalist"></div><script>var C_DATA=\'{c_data}\';</script></body></html>').encode("utf-8")
+
+    def _cola_detail(self, path_word):
+        links = "".join(
+            f'<li><a class="fed-btns-info" title="第{i:02d}话" href="/{path_word}/1/{i}.html">第{i:02d}话</a></li>'
+            for i in range(self.chapters, 0, -1)
+        )
+        return (f'<html><body><div class="fed-part-eone"><h1>{path_word}</h1></div>'
+                f'<div class="all_data_list"><ul>{links}</ul></div></body></html>').encode("utf-8")
+
+
+class MockServer(ThreadingHTTPServer):
+    # 默认的监听队列只有5，并发建立连接时会因SYN重传产生1秒左右的假延迟
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def make_handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            status, content_type, body = site.route(url.path, parse_qs(url.query))
+            if site.latency:
+                time.sleep(site.latency)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(ready, options):
+    """在子进程中运行模拟站点与CDN，两个端口通过ready队列返回
+
+    Args:
+        ready: multiprocessing队列
+        options: MockSite的参数字典
+
+    Returns:
+        None
+    """
+    site = MockSite(**options)
+    servers = []
+    for _ in range(2):
+        server = MockServer(("127.0.0.1", 0), make_handler(site))
+        servers.append(server)
+    site.cdn_url = f"http://127.0.0.1:{servers[1].server_port}"
+    threading.Thread(target=servers[1].serve_forever, daemon=True).start()
+    ready.put((servers[0].server_port, servers[1].server_port))
+    servers[0].serve_forever()
+
+
+def start_mock_site(**options):
+    """在独立进程中启动模拟站点，避免服务端开销计入爬虫的CPU时间
+
+    Args:
+        **options: MockSite的参数
+
+    Returns:
+        tuple: (进程对象, 站点根地址, CDN根地址)
+    """
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(ready, options), daemon=True)
+    process.start()
+    site_port, cdn_port = ready.get(timeout=60)
+    return process, f"http://127.0.0.1:{site_port}", f"http://127.0.0.1:{cdn_port}"
@@ -0,0 +1,201 @@
+import importlib.util
+from abc import ABC, abstractmethod
+
+
+class AESBackend(ABC):
+    """AES解密后端接口，依赖库在创建实例时才导入"""
+
+    name = ""
+
+    @classmethod
+    def is_available(cls):
+        """判断该后端依赖是否已安装
+
+        Args:
+            None
+
+        Returns:
+            bool: 是否可用
+        """
+        return True
+
+    @abstractmethod
+    def decrypt_cbc(self, key, iv, data):
+        """解密AES-CBC数据并去除PKCS7填充
+
+        Args:
+            key: 密钥字节数据
+            iv: 初始向量字节数据
+            data: 加密的字节数据
+
+        Returns:
+            bytes: 解密后的字节数据
+        """
+        pass
+
+    @abstractmethod
+    def decrypt_ecb(self, key, data):
+        """解密AES-ECB数据并去除PKCS7填充
+
+        Args:
+            key: 密钥字节数据
+            data: 加密的字节数据
+
+        Returns:
+            bytes: 解密后的字节数据
+        """
+        pass
+
+    @abstractmethod
+    def decrypt_block(self, key, block):
+        """解密单个16字节分组，不做填充处理，用于低成本地校验候选密钥
+
+        Args:
+            key: 密钥字节数据
+            block: 16字节的加密分组
+
+        Returns:
+            bytes: 解密后的16字节数据
+        """
+        pass
+
+
+class CryptographyBackend(AESBackend):
+    """基于OpenSSL(cryptography库)的解密后端"""
+
+    name = "cryptography"
+
+    @classmethod
+    def is_available(cls):
+        return importlib.util.find_spec("cryptography") is not None
+
+    def __init__(self):
+        from cryptography.hazmat.primitives import padding
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        self.padding = padding
+        self.Cipher = Cipher
+        self.algorithms = algorithms
+        self.modes = modes
+
+    def decrypt_cbc(self, key, iv, data):
+        return self._decrypt(key, self.modes.CBC(iv), data)
+
+    def decrypt_ecb(self, key, data):
+        return self._decrypt(key, self.modes.ECB(), data)
+
+    def decrypt_block(self, key, block):
+        decryptor = self.Cipher(self.algorithms.AES(key), self.modes.ECB()).decryptor()
+        return decryptor.update(block) + decryptor.finalize()
+
+    def _decrypt(self, key, mode, data):
+        decryptor = self.Cipher(self.algorithms.AES(key), mode).decryptor()
+        raw = decryptor.update(data) + decryptor.finalize()
+        unpadder = self.padding.PKCS7(128).unpadder()
+        return unpadder.update(raw) + unpadder.finalize()
+
+
+class PyaesBackend(AESBackend):
+    """纯Python实现的解密后端，作为兜底"""
+
+    name = "pyaes"
+
+    @classmethod
+    def is_available(cls):
+        return importlib.util.find_spec("pyaes") is not None
+
+    def __init__(self):
+        import pyaes
+        self.pyaes = pyaes
+
+    def decrypt_cbc(self, key, iv, data):
+        decrypter = self.pyaes.Decrypter(self.pyaes.AESModeOfOperationCBC(key, iv=iv))
+        return decrypter.feed(data) + decrypter.feed()
+
+    def decrypt_ecb(self, key, data):
+        decrypter = self.pyaes.Decrypter(self.pyaes.AESModeOfOperationECB(key))
+        return decrypter.feed(data) + decrypter.feed()
+
+    def decrypt_block(self, key, block):
+        return self.pyaes.AESModeOfOperationECB(key).decrypt(block)
+
+
+BACKENDS = {
+    CryptographyBackend.name: CryptographyBackend,
+    PyaesBackend.name: PyaesBackend,
+}
+_instances = {}
+
+
+def available_backends():
+    """按优先级列出当前可用的后端名称
+
+    Args:
+        None
+
+    Returns:
+        list: 后端名称列表
+    """
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def resolve_aes_backend(name=None):
+    """检查并确定解密后端名称，未指定时选择最快的可用后端，不导入依赖库
+
+    Args:
+        name: 后端名称，默认为None
+
+    Returns:
+        str: 后端名称
+    """
+    if name is None:
+        return available_backends()[0]
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"未知的AES后端: {name}")
+    if not backend.is_available():
+        raise ValueError(f"AES后端 {name} 不可用，请先安装依赖")
+    return name
+
+
+def get_aes_backend(name=None):
+    """获取解密后端实例，未指定时选择最快的可用后端
+
+    Args:
+        name: 后端名称，默认为None
+
+    Returns:
+        AESBackend: 解密后端实例
+    """
+    return BACKENDS[resolve_aes_backend(name)]()
+
+
+def decrypt_cbc(name, key, iv, data):
+    """用指定后端解密AES-CBC数据，模块级函数，可提交到进程池执行
+
+    后端实例不能跨进程传递，每个线程或进程按名称取用本地缓存的实例
+
+    Args:
+        name: 后端名称
+        key: 密钥
+        iv: 初始向量
+        data: 加密数据
+
+    Returns:
+        bytes: 解密后的字节数据
+    """
+    return local_backend(name).decrypt_cbc(key, iv, data)
+
+
+def local_backend(name):
+    """按名称取用当前线程或进程中缓存的后端实例，供提交到执行器的模块级函数使用
+
+    Args:
+        name: 后端名称
+
+    Returns:
+        AESBackend: 解密后端实例
+    """
+    backend = _instances.get(name)
+    if backend is None:
+        backend = _instances.setdefault(name, get_aes_backend(name))
+    return backend
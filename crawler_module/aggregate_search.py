@@ -0,0 +1,123 @@
+import re
+import time
+import asyncio
+
+
+def normalize_title(name):
+    """生成用于去重的标题键，忽略大小写、空白与标点
+
+    Args:
+        name: 漫画名称
+
+    Returns:
+        str: 去重键
+    """
+    return re.sub(r'[\W_]+', '', name or '').lower()
+
+
+class AggregatedSearch:
+    """在多个漫画源、多个关键词与多个页数上并发搜索，按到达顺序流式产出去重后的结果
+
+    同名漫画只产出一次，之后其他来源的命中会追加到已产出条目的sources中；
+    每个漫画源有独立的截止时间，超时或失败的来源记录在errors中，不影响其他来源
+    """
+
+    def __init__(self, crawlers, keywords, pages=(1,), deadline=15.0):
+        """初始化聚合搜索
+
+        Args:
+            crawlers: {来源名称: 爬虫实例}
+            keywords: 关键词列表
+            pages: 每个关键词搜索的页数列表，默认为(1,)
+            deadline: 每个漫画源的截止秒数，默认为15
+
+        Returns:
+            None
+        """
+        self.crawlers = crawlers
+        self.keywords = list(keywords)
+        self.pages = list(pages)
+        self.deadline = deadline
+        self.results = {}
+        self.errors = {}
+
+    async def _search(self, source, crawler, keyword, page, deadline_at, queue):
+        try:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            data = await asyncio.wait_for(crawler.search_results(keyword, page), remaining)
+            if isinstance(data, str):
+                self.errors.setdefault(source, []).append(f"{keyword} 第{page}页: {data}")
+            else:
+                for item in data.get("results", {}).get("list", []):
+                    queue.put_nowait((source, keyword, item))
+        except asyncio.TimeoutError:
+            self.errors.setdefault(source, []).append(f"{keyword} 第{page}页: 超时")
+        except Exception as e:
+            self.errors.setdefault(source, []).append(f"{keyword} 第{page}页: {e}")
+        finally:
+            queue.put_nowait(None)
+
+    def _merge(self, source, keyword, item):
+        key = normalize_title(item.get("name"))
+        if not key:
+            return None
+        hit = {"source": source, "path_word": item.get("path_word"), "keyword": keyword}
+        entry = self.results.get(key)
+        if entry is not None:
+            if all(s["source"] != source or s["path_word"] != hit["path_word"] for s in entry["sources"]):
+                entry["sources"].append(hit)
+            return None
+        entry = {
+            "name": item.get("name"),
+            "author": [a["name"] for a in item.get("author") or []],
+            "sources": [hit]
+        }
+        self.results[key] = entry
+        return entry
+
+    async def stream(self):
+        """执行搜索并在结果到达时逐条产出新出现的漫画
+
+        Args:
+            None
+
+        Returns:
+            AsyncIterator[dict]: {"name", "author", "sources": [{"source", "path_word", "keyword"}]}
+        """
+        queue = asyncio.Queue()
+        tasks = []
+        for source, crawler in self.crawlers.items():
+            deadline_at = time.monotonic() + self.deadline
+            for keyword in self.keywords:
+                for page in self.pages:
+                    tasks.append(asyncio.ensure_future(
+                        self._search(source, crawler, keyword, page, deadline_at, queue)
+                    ))
+        pending = len(tasks)
+        try:
+            while pending:
+                message = await queue.get()
+                if message is None:
+                    pending -= 1
+                    continue
+                entry = self._merge(*message)
+                if entry is not None:
+                    yield entry
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def collect(self):
+        """执行搜索并等待全部来源完成或超时
+
+        Args:
+            None
+
+        Returns:
+            list: 去重后的全部结果
+        """
+        async for _ in self.stream():
+            pass
+        return list(self.results.values())
@@ -1,19 +1,48 @@
 import os
-import json
+import time
 import asyncio
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from curl_cffi import CurlHttpVersion
+from curl_cffi.requests import AsyncSession
+from .manifest import DownloadManifest, content_hash
+from .metadata_cache import MetadataCache, LATEST_KEY
+from .retry import RetryPolicy, CircuitOpenError
+from .rate_limit import AIMDLimiter, ByteBudget
+from .metrics import Metrics
+from .image_utils import is_embeddable_jpeg_file, encode_jpeg
+from .body_sink import FileSink
+
+CPU_EXECUTORS = ("thread", "process")
+
 
 class BaseCrawler(ABC):
     """漫画爬虫基类，定义统一接口"""
 
-    def __init__(self, proxies=None, headers=None, max_concurrency=10):
+    # 各主机的限流配置(AIMDLimiter参数)，未列出的主机以max_concurrency为初始并发上限
+    HOST_LIMITS = {}
+    # 图片请求返回这些状态码时，下载清单中保存的章节图片描述可能已失效，需要重新解析
+    STALE_STATUS = {403, 404, 410}
+
+    def __init__(self, proxies=None, headers=None, max_concurrency=10, stage_limits=None, cache_ttls=None,
+                 retry_policy=None, host_limits=None, metrics=None, byte_budget=None, cpu_executor="thread",
+                 cpu_workers=None, cpu_queue=None):
         """初始化爬虫基类，支持多站点缓存隔离
         
         Args:
             proxies: 代理设置，默认为None
             headers: 请求头设置，默认为None
-            max_concurrency: 最大并发数，默认为10
+            max_concurrency: 未单独配置的主机的初始并发数，默认为10
+            stage_limits: 多章节下载各阶段的并发上限，默认为None
+            cache_ttls: 各类元数据缓存的过期秒数，默认为None
+            retry_policy: 重试与熔断策略，默认为None即使用RetryPolicy默认配置
+            host_limits: 按主机覆盖的限流配置，如{"api.example.com": {"max_limit": 4, "rate": 5}}，默认为None
+            metrics: 指标收集器，多个爬虫可共用一个，默认为None即新建
+            byte_budget: 图片响应体的在途字节上限，可传入字节数或多个爬虫共用的ByteBudget，默认为None即不限制
+            cpu_executor: 解密、转码与PDF生成使用的执行器类型，thread或process，默认为thread
+            cpu_workers: 执行器的工作线程或进程数，默认为None即CPU核数
+            cpu_queue: 同时提交到执行器(含排队)的任务数上限，默认为None即工作数的2倍
         
         Returns:
             None
@@ -30,8 +59,247 @@ class BaseCrawler(ABC):
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
             "Connection": "keep-alive"
         }
-        self.semaphore = asyncio.Semaphore(max_concurrency)
-        self.thread_pool = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.stage_limits = stage_limits
+        self.host_limits = {**self.HOST_LIMITS, **(host_limits or {})}
+        self._limiters = {}
+        if cpu_executor not in CPU_EXECUTORS:
+            raise ValueError(f"未知的执行器类型: {cpu_executor}，可选: {', '.join(CPU_EXECUTORS)}")
+        self.cpu_executor = cpu_executor
+        self.cpu_workers = cpu_workers or os.cpu_count() or 1
+        self._cpu_pool = None
+        self._cpu_slots = asyncio.Semaphore(cpu_queue or self.cpu_workers * 2)
+        self._sessions = {}
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.metrics = metrics or Metrics()
+        self.byte_budget = byte_budget if isinstance(byte_budget, ByteBudget) else ByteBudget(byte_budget)
+        self.cache = MetadataCache(self.CACHE_DIR, cache_ttls)
+        self.manifest = DownloadManifest(os.path.join(self.CACHE_DIR, "manifest.sqlite3"))
+        self._stale_chapters = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def get_session(self, host):
+        """获取指定主机的长连接会话，不存在时创建
+
+        每个主机共用一个连接池会话，开启keep-alive与HTTP/2多路复用，
+        同一章节的所有图片请求复用少量连接而不是每次重新握手
+
+        Args:
+            host: 主机名
+
+        Returns:
+            AsyncSession: 该主机的共享会话
+        """
+        session = self._sessions.get(host)
+        if session is None:
+            session = AsyncSession(
+                proxies=self.PROXIES,
+                verify=False,
+                max_clients=self.get_limiter(host).max_limit,
+                http_version=CurlHttpVersion.V2TLS
+            )
+            self._sessions[host] = session
+        return session
+
+    def get_limiter(self, host):
+        """获取指定主机的自适应并发限制器，不存在时按配置创建
+
+        Args:
+            host: 主机名
+
+        Returns:
+            AIMDLimiter: 该主机的限制器
+        """
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            options = {"initial": self.max_concurrency, **self.host_limits.get(host, {})}
+            limiter = AIMDLimiter(**options)
+            self._limiters[host] = limiter
+        return limiter
+
+    async def fetch(self, url, method="GET", max_attempts=None, sink=None, **kwargs):
+        """通过共享会话发送请求，按重试策略处理失败
+
+        网络异常与可重试状态码(429、5xx等)按指数退避重试并优先遵循Retry-After，
+        其他状态码直接返回；主机熔断时不发请求直接抛出CircuitOpenError，熔断恢复后的探测请求被取消时交还探测名额；
+        每次尝试都占用该主机限制器的一个名额，退避等待期间不占用；
+        每次尝试的耗时、状态码、接收字节数与重试次数记录在self.metrics中；
+        提供sink时以流式请求按块读取状态码为200的响应体，读取完成才算一次尝试结束(释放名额、记录耗时)，
+        读取中断与网络异常一样计入熔断并重试
+
+        Args:
+            url: 请求URL
+            method: 请求方法，默认为GET
+            max_attempts: 最大尝试次数，默认为None即使用重试策略的配置
+            sink: 接收响应体的对象(见body_sink)，每次尝试前调用reset()，默认为None即一次性读取响应体
+            **kwargs: 透传给会话的参数，未指定headers时使用self.HEADERS
+
+        Returns:
+            Response: 最后一次的响应对象，重试耗尽时可能是失败状态码；提供sink时响应体已交给sink
+        """
+        kwargs.setdefault("headers", self.HEADERS)
+        host = urlsplit(url).netloc
+        session = self.get_session(host)
+        policy = self.retry_policy
+        breaker = policy.breaker(host)
+        limiter = self.get_limiter(host)
+        metrics = self.metrics
+        attempts = max_attempts or policy.max_attempts
+        for attempt in range(attempts):
+            if not breaker.allow():
+                metrics.inc("circuit_rejections", host=host)
+                raise CircuitOpenError(host)
+            if attempt:
+                metrics.inc("retries", host=host)
+            probe = breaker.probing
+            try:
+                await limiter.acquire()
+            except asyncio.CancelledError:
+                if probe:
+                    breaker.release_probe()
+                raise
+            start = time.monotonic()
+            try:
+                if sink is None:
+                    response = await session.request(method, url, **kwargs)
+                    received = len(response.content)
+                else:
+                    response = await session.request(method, url, stream=True, **kwargs)
+                    received = await self._drain(response, sink)
+            except asyncio.CancelledError:
+                limiter.release()
+                if probe:
+                    breaker.release_probe()
+                raise
+            except Exception:
+                limiter.release(overloaded=True)
+                metrics.observe("fetch", time.monotonic() - start, host=host)
+                metrics.inc("http_requests", host=host, status="error")
+                breaker.record_failure(probe=probe)
+                if attempt == attempts - 1:
+                    raise
+                await asyncio.sleep(policy.backoff(attempt))
+                continue
+            elapsed = time.monotonic() - start
+            metrics.observe("fetch", elapsed, host=host)
+            metrics.inc("http_requests", host=host, status=response.status_code)
+            metrics.inc("bytes_received", received, host=host)
+            if not policy.is_retryable(response.status_code):
+                limiter.release(latency=elapsed)
+                breaker.record_success()
+                return response
+            limiter.release(overloaded=True)
+            breaker.record_failure(probe=probe)
+            if attempt == attempts - 1:
+                return response
+            await asyncio.sleep(policy.backoff(attempt, response))
+
+    @property
+    def cpu_pool(self):
+        """解密、转码与PDF生成共用的线程池或进程池，首次使用时创建(进程池依赖multiprocessing，届时才导入)"""
+        if self._cpu_pool is None:
+            if self.cpu_executor == "process":
+                from concurrent.futures import ProcessPoolExecutor
+                self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers)
+            else:
+                self._cpu_pool = ThreadPoolExecutor(max_workers=self.cpu_workers)
+        return self._cpu_pool
+
+    async def run_cpu(self, func, *args):
+        """在执行器中运行耗CPU的函数，不阻塞事件循环上的其他下载
+
+        提交的任务数受cpu_queue限制，超出时在此等待；使用进程池时func与参数需可序列化(模块级函数)
+
+        Args:
+            func: 要执行的函数
+            *args: 函数参数
+
+        Returns:
+            函数的返回值
+        """
+        async with self._cpu_slots:
+            return await asyncio.get_running_loop().run_in_executor(self.cpu_pool, func, *args)
+
+    async def _drain(self, response, sink):
+        received = 0
+        try:
+            if response.status_code == 200:
+                sink.reset()
+                async for chunk in response.aiter_content():
+                    received += len(chunk)
+                    sink.write(chunk)
+        finally:
+            await response.aclose()
+        return received
+
+    async def download_page(self, url, path, chapter_key=None, page=None, max_attempts=None, **kwargs):
+        """流式下载未加密的页面图片并保存
+
+        响应体按块写入临时文件并同时计算内容哈希，可直接嵌入PDF的JPEG原样改名保存，
+        其他格式读回后转码；下载与转码期间占用self.byte_budget中的预留
+
+        Args:
+            url: 图片URL
+            path: 图片保存路径
+            chapter_key: 章节标识，默认为None即不记录
+            page: 页码(从1开始)，默认为None
+            max_attempts: 最大尝试次数，默认为None即使用重试策略的配置
+            **kwargs: 透传给fetch的参数
+
+        Returns:
+            int: 响应状态码，200表示已保存
+        """
+        temp_path = path + ".part"
+        async with self.byte_budget.reserve() as reservation:
+            try:
+                with open(temp_path, "wb") as f:
+                    sink = FileSink(f, reservation)
+                    response = await self.fetch(url, max_attempts=max_attempts, sink=sink, **kwargs)
+                if response.status_code != 200:
+                    os.remove(temp_path)
+                    return response.status_code
+                if is_embeddable_jpeg_file(temp_path):
+                    os.replace(temp_path, path)
+                    if chapter_key is not None and page is not None:
+                        self.manifest.mark_page(chapter_key, page, sink.hexdigest())
+                    return response.status_code
+                with open(temp_path, "rb") as f:
+                    data = f.read()
+                os.remove(temp_path)
+                with self.metrics.timer("transcode"):
+                    image_data = await self.run_cpu(encode_jpeg, data)
+                self.save_page(path, image_data, chapter_key, page)
+                return response.status_code
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+    async def close(self):
+        """关闭所有共享会话、执行器与下载清单
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception as e:
+                print(f"关闭会话失败: {e}")
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown()
+            self._cpu_pool = None
+        self.manifest.close()
 
     @abstractmethod
     async def search_manga(self, keyword, page=1):
@@ -46,6 +314,19 @@ class BaseCrawler(ABC):
         """
         pass
 
+    @abstractmethod
+    async def search_results(self, keyword, page=1):
+        """搜索漫画并返回结构化结果，只写入按关键词与页数区分的缓存，不影响索引引用的最近一次搜索
+
+        Args:
+            keyword: 搜索关键词
+            page: 页数
+
+        Returns:
+            dict: {"results": {"total": 总数, "list": [{"name", "path_word", ...}]}}，失败时返回错误信息字符串
+        """
+        pass
+
     @abstractmethod
     async def get_manga_chapters(self, index_or_url):
         """获取漫画章节列表并缓存
@@ -58,7 +339,6 @@ class BaseCrawler(ABC):
         """
         pass
 
-    @abstractmethod
     async def download_manga(self, chapter_spec, index_or_url):
         """下载漫画章节，合并为PDF并删除图片
 
@@ -69,8 +349,56 @@ class BaseCrawler(ABC):
         Returns:
             str: 下载结果
         """
+        return self.format_download_report(await self.download_report(chapter_spec, index_or_url))
+
+    @abstractmethod
+    async def download_report(self, chapter_spec, index_or_url):
+        """下载漫画章节并返回结构化的结果，供批量任务汇总
+
+        Args:
+            chapter_spec: 章节规格 (x 或 x-y 或 all)
+            index_or_url: 索引或URL/path_word
+
+        Returns:
+            dict: 下载报告，格式见make_report
+        """
         pass
 
+    def make_report(self, manga_name, chapters=None, outcomes=None, error=None):
+        """生成下载报告
+
+        Args:
+            manga_name: 漫画名称
+            chapters: 章节数据列表，默认为None
+            outcomes: 与chapters一一对应的ChapterOutcome列表，默认为None
+            error: 整体失败时的错误信息，默认为None
+
+        Returns:
+            dict: {"manga": 漫画名称, "error": 错误信息或None, "chapters": [{"name", "status", "message"}]}
+        """
+        return {
+            "manga": manga_name,
+            "error": error,
+            "chapters": [
+                {"name": chapter["name"], "status": outcome.status, "message": outcome.message}
+                for chapter, outcome in zip(chapters or [], outcomes or [])
+            ]
+        }
+
+    def format_download_report(self, report):
+        """统一格式化下载报告的输出
+
+        Args:
+            report: make_report生成的下载报告
+
+        Returns:
+            str: 格式化后的下载结果
+        """
+        if report["error"]:
+            return report["error"]
+        results = "\n".join(f"{chapter['name']}: {chapter['message']}" for chapter in report["chapters"])
+        return f"\n{report['manga']} 下载完成:\n" + results
+
     def format_chapter_list(self, manga_name, chapters):
         """统一格式化章节列表的输出
         
@@ -89,8 +417,84 @@ class BaseCrawler(ABC):
         )
         return f"**{manga_name}** 章节列表:\n{chapter_list}"
 
+    def write_file_atomic(self, path, data):
+        """先写入同目录临时文件再原子替换，避免留下半截文件
+
+        Args:
+            path: 目标文件路径
+            data: 要写入的字节数据
+
+        Returns:
+            None
+        """
+        temp_path = path + ".part"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def save_page(self, path, data, chapter_key=None, page=None):
+        """原子写入页面图片，并在下载清单中记录页面状态与内容哈希
+
+        Args:
+            path: 图片保存路径
+            data: 图片字节数据
+            chapter_key: 章节标识，默认为None即不记录
+            page: 页码(从1开始)，默认为None
+
+        Returns:
+            None
+        """
+        self.write_file_atomic(path, data)
+        if chapter_key is not None and page is not None:
+            self.manifest.mark_page(chapter_key, page, content_hash(data))
+
+    def page_done(self, path, completed_pages, page):
+        """判断页面是否已在之前的运行中完成
+
+        Args:
+            path: 图片保存路径
+            completed_pages: 下载清单中已完成的页面
+            page: 页码(从1开始)
+
+        Returns:
+            bool: 清单有记录且文件仍存在时为True
+        """
+        return page in completed_pages and os.path.exists(path)
+
+    def mark_stale(self, chapter_key, status_code):
+        """图片请求返回STALE_STATUS中的状态码时，记录该章节的图片描述需要重新解析
+
+        Args:
+            chapter_key: 章节标识
+            status_code: 图片请求的状态码
+
+        Returns:
+            None
+        """
+        if status_code in self.STALE_STATUS:
+            self._stale_chapters.add(chapter_key)
+
+    def pop_stale(self, chapter_key):
+        """取出并清除章节的失效标记
+
+        Args:
+            chapter_key: 章节标识
+
+        Returns:
+            bool: 该章节是否有图片请求因描述失效而失败
+        """
+        if chapter_key in self._stale_chapters:
+            self._stale_chapters.discard(chapter_key)
+            return True
+        return False
+
     def clear_cache(self, cache_type):
-        """删除指定类型的所有缓存文件
+        """删除指定类型的所有缓存
         
         Args:
             cache_type: 缓存类型
@@ -98,39 +502,29 @@ class BaseCrawler(ABC):
         Returns:
             None
         """
-        for fname in os.listdir(self.CACHE_DIR):
-            if fname.startswith(f"{cache_type}_") and fname.endswith(".json"):
-                try:
-                    os.remove(os.path.join(self.CACHE_DIR, fname))
-                except Exception as e:
-                    print(f"删除缓存文件 {fname} 失败: {e}")
+        self.cache.clear(cache_type)
 
-    def load_from_cache(self, cache_type):
-        """直接加载指定类型的唯一缓存文件
+    def load_from_cache(self, cache_type, key=LATEST_KEY):
+        """按类型与标识加载缓存，先查内存再查磁盘
         
         Args:
             cache_type: 缓存类型
+            key: 缓存标识(如关键词与页数、path_word)，默认为latest即最近一次结果
         
         Returns:
-            dict: 缓存的数据，如果不存在则返回None
+            dict: 缓存的数据，如果不存在或已过期则返回None
         """
-        cache_file = os.path.join(self.CACHE_DIR, f"{cache_type}_latest.json")
-        if os.path.exists(cache_file):
-            with open(cache_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return None
+        return self.cache.get(cache_type, key)
 
-    def save_to_cache(self, cache_type, data):
-        """保存数据到指定类型的唯一缓存文件
+    def save_to_cache(self, cache_type, data, key=LATEST_KEY):
+        """按类型与标识保存缓存
         
         Args:
             cache_type: 缓存类型
             data: 要保存的数据
+            key: 缓存标识，默认为latest即最近一次结果
         
         Returns:
             None
         """
-        os.makedirs(self.CACHE_DIR, exist_ok=True)
-        cache_file = os.path.join(self.CACHE_DIR, f"{cache_type}_latest.json")
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        self.cache.set(cache_type, data, key)
@@ -0,0 +1,133 @@
+import json
+import time
+import asyncio
+from .metrics import Metrics
+
+REQUIRED_JOB_KEYS = ("source", "manga")
+
+
+def load_jobs(path):
+    """读取任务文件
+
+    文件内容为JSON列表或{"jobs": [...]}，每个任务为
+    {"source": 漫画源, "manga": 索引或URL/path_word, "chapters": 章节规格(默认all)}
+
+    Args:
+        path: 任务文件路径
+
+    Returns:
+        list: 任务字典列表
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    jobs = data.get("jobs") if isinstance(data, dict) else data
+    if not isinstance(jobs, list):
+        raise ValueError("任务文件应为任务列表或包含jobs列表的对象")
+    result = []
+    for idx, job in enumerate(jobs):
+        missing = [key for key in REQUIRED_JOB_KEYS if not isinstance(job, dict) or key not in job]
+        if missing:
+            raise ValueError(f"第{idx + 1}个任务缺少字段: {', '.join(missing)}")
+        result.append({**job, "manga": str(job["manga"]), "chapters": str(job.get("chapters", "all"))})
+    return result
+
+
+def report_ok(report):
+    """判断下载报告是否全部成功(已跳过的章节视为成功)
+
+    Args:
+        report: BaseCrawler.make_report生成的下载报告
+
+    Returns:
+        bool: 没有整体错误且没有失败或不完整的章节时为True
+    """
+    return not report["error"] and all(chapter["status"] in ("done", "skipped") for chapter in report["chapters"])
+
+
+class BatchRunner:
+    """非交互的批量下载任务执行器
+
+    每个漫画源只创建一个爬虫实例并在所有任务间复用，浏览器、连接池、限流器、
+    元数据缓存与下载清单都保持热状态；所有爬虫共用一个指标收集器
+    """
+
+    def __init__(self, factories, parallel=1, metrics=None):
+        """初始化执行器
+
+        Args:
+            factories: {来源名称: 爬虫工厂}，工厂以metrics关键字参数调用并返回爬虫实例
+            parallel: 同时执行的任务数，默认为1
+            metrics: 指标收集器，默认为None即新建
+
+        Returns:
+            None
+        """
+        self.factories = factories
+        self.parallel = max(1, parallel)
+        self.metrics = metrics or Metrics()
+        self.crawlers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def get_crawler(self, source):
+        """获取指定来源的共享爬虫，不存在时创建
+
+        Args:
+            source: 来源名称
+
+        Returns:
+            BaseCrawler: 爬虫实例
+        """
+        crawler = self.crawlers.get(source)
+        if crawler is None:
+            factory = self.factories.get(source)
+            if factory is None:
+                raise ValueError(f"未知的漫画源: {source}")
+            crawler = factory(metrics=self.metrics)
+            self.crawlers[source] = crawler
+        return crawler
+
+    async def _run_job(self, job, semaphore):
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                crawler = self.get_crawler(job["source"])
+                report = await crawler.download_report(job["chapters"], job["manga"])
+            except Exception as e:
+                report = {"manga": job["manga"], "error": f"任务执行出错: {e}", "chapters": []}
+            ok = report_ok(report)
+            self.metrics.inc("batch_jobs", source=job["source"], status="ok" if ok else "failed")
+            return {"job": job, "report": report, "ok": ok, "elapsed": round(time.monotonic() - start, 2)}
+
+    async def run(self, jobs):
+        """执行全部任务，按输入顺序返回结果
+
+        Args:
+            jobs: 任务字典列表
+
+        Returns:
+            list: [{"job", "report", "ok", "elapsed"}]
+        """
+        semaphore = asyncio.Semaphore(self.parallel)
+        return await asyncio.gather(*(self._run_job(job, semaphore) for job in jobs))
+
+    async def close(self):
+        """关闭所有已创建的爬虫
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        crawlers = list(self.crawlers.values())
+        self.crawlers.clear()
+        for crawler in crawlers:
+            try:
+                await crawler.close()
+            except Exception as e:
+                print(f"关闭爬虫失败: {e}")
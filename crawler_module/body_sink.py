@@ -0,0 +1,85 @@
+import hashlib
+
+
+class BufferSink:
+    """把流式响应体收集到内存，收到的字节计入字节预留"""
+
+    def __init__(self, reservation):
+        self.reservation = reservation
+        self.chunks = []
+
+    def reset(self):
+        """丢弃上一次尝试收到的数据，重试前调用
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.chunks.clear()
+        self.reservation.rewind()
+
+    def write(self, chunk):
+        """接收一个数据块
+
+        Args:
+            chunk: 字节数据
+
+        Returns:
+            None
+        """
+        self.reservation.add(len(chunk))
+        self.chunks.append(chunk)
+
+    def getvalue(self):
+        """合并收到的数据并释放数据块
+
+        Args:
+            None
+
+        Returns:
+            bytes: 完整的响应体
+        """
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class FileSink:
+    """把流式响应体按块写入已打开的文件，同时计算内容哈希，收到的字节计入字节预留"""
+
+    def __init__(self, file, reservation):
+        self.file = file
+        self.reservation = reservation
+        self.digest = hashlib.sha256()
+
+    def reset(self):
+        """清空文件与哈希，重试前调用
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.file.seek(0)
+        self.file.truncate()
+        self.digest = hashlib.sha256()
+        self.reservation.rewind()
+
+    def write(self, chunk):
+        """写入一个数据块
+
+        Args:
+            chunk: 字节数据
+
+        Returns:
+            None
+        """
+        self.reservation.add(len(chunk))
+        self.file.write(chunk)
+        self.digest.update(chunk)
+
+    def hexdigest(self):
+        return self.digest.hexdigest()
@@ -0,0 +1,174 @@
+import asyncio
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+
+class BrowserPagePool:
+    """预热的浏览器页面池，拦截图片、媒体、字体与第三方脚本"""
+
+    BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+    def __init__(self, browser, size=3, user_agent=None, script_hosts=None):
+        """初始化页面池
+
+        每个页面使用独立的隐身上下文，互不共享Cookie，可以并行解析多个章节
+
+        Args:
+            browser: pyppeteer浏览器实例
+            size: 页面数量，默认为3
+            user_agent: 页面使用的User-Agent，默认为None
+            script_hosts: 允许加载脚本的主机(含子域名)，默认为None即不限制
+
+        Returns:
+            None
+        """
+        self.browser = browser
+        self.size = size
+        self.user_agent = user_agent
+        self.script_hosts = script_hosts
+        self._pages = asyncio.Queue()
+        self._contexts = {}
+        for _ in range(size):
+            self._pages.put_nowait(None)
+
+    async def start(self):
+        """创建并预热全部页面
+
+        Args:
+            None
+
+        Returns:
+            BrowserPagePool: 页面池自身
+        """
+        slots = []
+        while not self._pages.empty():
+            slots.append(self._pages.get_nowait())
+        results = await asyncio.gather(
+            *(self._new_page() for slot in slots if slot is None), return_exceptions=True
+        )
+        for slot in slots:
+            if slot is not None:
+                self._pages.put_nowait(slot)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"预热页面失败: {result}")
+                result = None
+            self._pages.put_nowait(result)
+        return self
+
+    async def _new_page(self):
+        """在新的隐身上下文中创建启用请求拦截的页面
+
+        Args:
+            None
+
+        Returns:
+            Page: 新页面
+        """
+        context = await self.browser.createIncognitoBrowserContext()
+        try:
+            page = await context.newPage()
+            if self.user_agent:
+                await page.setUserAgent(self.user_agent)
+            await page.setRequestInterception(True)
+        except Exception:
+            await context.close()
+            raise
+        self._contexts[page] = context
+        page.on('request', lambda request: asyncio.ensure_future(self._intercept(request)))
+        return page
+
+    async def _intercept(self, request):
+        """放行或拦截页面发出的请求
+
+        Args:
+            request: 被拦截的请求
+
+        Returns:
+            None
+        """
+        try:
+            if self.should_block(request):
+                await request.abort()
+            else:
+                await request.continue_()
+        except Exception:
+            pass
+
+    def should_block(self, request):
+        """判断请求是否应被拦截
+
+        Args:
+            request: 被拦截的请求
+
+        Returns:
+            bool: 是否拦截
+        """
+        if request.resourceType in self.BLOCKED_RESOURCE_TYPES:
+            return True
+        if request.resourceType == "script" and self.script_hosts:
+            host = urlsplit(request.url).hostname or ""
+            return not any(host == h or host.endswith("." + h) for h in self.script_hosts)
+        return False
+
+    async def _discard_page(self, page):
+        """关闭页面及其上下文
+
+        Args:
+            page: 要关闭的页面
+
+        Returns:
+            None
+        """
+        context = self._contexts.pop(page, None)
+        try:
+            if context:
+                await context.close()
+            else:
+                await page.close()
+        except Exception as e:
+            print(f"关闭页面失败: {e}")
+
+    @asynccontextmanager
+    async def page(self):
+        """借出一个页面，用完后归还；出错的页面会被关闭，其空位下次借出时重建
+
+        Args:
+            None
+
+        Returns:
+            Page: 借出的页面
+        """
+        page = await self._pages.get()
+        if page is None:
+            try:
+                page = await self._new_page()
+            except BaseException:
+                self._pages.put_nowait(None)
+                raise
+        healthy = False
+        try:
+            yield page
+            healthy = True
+        finally:
+            if healthy:
+                self._pages.put_nowait(page)
+            else:
+                await self._discard_page(page)
+                self._pages.put_nowait(None)
+
+    async def close(self):
+        """关闭页面池中的所有页面
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        while not self._pages.empty():
+            page = self._pages.get_nowait()
+            if page is not None:
+                await self._discard_page(page)
+        for page in list(self._contexts):
+            await self._discard_page(page)
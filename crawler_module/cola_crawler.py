@@ -1,47 +1,94 @@
 import os
 import re
 import asyncio
+from collections import OrderedDict
 from urllib.parse import urlsplit
-from curl_cffi.requests import AsyncSession
-from bs4 import BeautifulSoup
-from PIL import Image
-import img2pdf
 from datetime import datetime
-from io import BytesIO
-import pyaes
-
-os.environ['PYPPETEER_CHROMIUM_REVISION'] = '1263111'
-from pyppeteer import launch
 from .base_crawler import BaseCrawler
+from .aes_backend import resolve_aes_backend, decrypt_cbc
+from .browser_pool import BrowserPagePool
+from .pipeline import ChapterPipeline, ChapterOutcome, StageError, StageSkipped
+from .pdf_writer import write_pdf
+from .body_sink import BufferSink
+from .image_utils import normalize_image
+from .html_parser import get_html_parser
+from .cola_parser import parse_search_page, parse_manga_page
+from .cola_static import find_scripts, key_candidates, find_chapter_data, search_image_key, decode_image_info
+from .metrics import timed
+
+# pyppeteer在导入时读取该环境变量，因此在首次启动浏览器、导入pyppeteer之前设置
+CHROMIUM_REVISION = '1263111'
 
 
 class ColaCrawler(BaseCrawler):
     """Cola漫画爬虫优化版"""
 
-    def __init__(self, proxies=None, headers=None, max_concurrency=10):
+    BASE_URL = "https://www.colamanga.com"
+    IMAGE_BASE_URL = "https://img.colamanga.com"
+    SCRIPT_HOSTS = ["colamanga.com"]
+    HOST_LIMITS = {
+        "www.colamanga.com": {"initial": 4, "max_limit": 8, "rate": 5, "burst": 10},
+    }
+    # 内存中保留的阅读页数量，解析章节信息与提取密钥共用同一次请求
+    READER_CACHE_SIZE = 32
+
+    def __init__(self, proxies=None, headers=None, max_concurrency=10, aes_backend=None, page_pool_size=3,
+                 stage_limits=None, host_limits=None, html_parser=None, base_url=None, image_base_url=None,
+                 metrics=None, byte_budget=None, cpu_executor="thread", cpu_workers=None, cpu_queue=None,
+                 retry_policy=None, cache_ttls=None):
         """初始化Cola漫画爬虫
         
         Args:
             proxies: 代理设置，默认为None
             headers: 请求头设置，默认为None
-            max_concurrency: 最大并发数，默认为10
+            max_concurrency: 未单独配置的主机(如图片CDN)的初始并发数，默认为10
+            aes_backend: AES解密后端名称，默认为None即自动选择最快的可用后端
+            page_pool_size: 解析章节信息的浏览器页面池大小，默认为3
+            stage_limits: 多章节下载各阶段的并发上限，默认为None
+            host_limits: 按主机覆盖的限流配置，默认为None
+            html_parser: HTML解析后端名称，默认为None即优先使用lxml，未安装时退回html.parser
+            base_url: 站点根地址，默认为None即使用BASE_URL，可指向本地模拟站点
+            image_base_url: 图片CDN根地址，默认为None即使用IMAGE_BASE_URL
+            metrics: 指标收集器，默认为None即新建
+            byte_budget: 图片响应体的在途字节上限或共用的ByteBudget，默认为None即不限制
+            cpu_executor: 解密、转码与PDF生成使用的执行器类型，thread或process，默认为thread
+            cpu_workers: 执行器的工作线程或进程数，默认为None即CPU核数
+            cpu_queue: 同时提交到执行器(含排队)的任务数上限，默认为None即工作数的2倍
+            retry_policy: 重试与熔断策略，默认为None即使用RetryPolicy默认配置
+            cache_ttls: 各类元数据缓存的过期秒数，默认为None即使用DEFAULT_TTLS
         
         Returns:
             None
         """
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.image_base_url = (image_base_url or self.IMAGE_BASE_URL).rstrip('/')
         headers = headers or {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Origin": "https://www.colamanga.com",
-            "Referer": "https://www.colamanga.com",
+            "Origin": self.base_url,
+            "Referer": self.base_url,
             "Connection": "keep-alive"
         }
-        super().__init__(proxies, headers, max_concurrency)
+        super().__init__(proxies, headers, max_concurrency, stage_limits, host_limits=host_limits, metrics=metrics,
+                         byte_budget=byte_budget, cpu_executor=cpu_executor, cpu_workers=cpu_workers,
+                         cpu_queue=cpu_queue, retry_policy=retry_policy, cache_ttls=cache_ttls)
         self.browser = None
+        self.page_pool = None
+        self.page_pool_size = page_pool_size
+        self._page_pool_lock = asyncio.Lock()
+        self._home_visited = False
+        self.aes_backend_name = resolve_aes_backend(aes_backend)
+        self.html_parser = get_html_parser(html_parser)
+        self._key_index = None
+        self._key_captures = {}
+        self._reader_pages = OrderedDict()
+        self._script_texts = {}
+        self._static_keys = []
+        self._data_keys = []
 
     async def init_browser(self):
-        """初始化浏览器实例
+        """初始化浏览器实例，首次调用时才导入pyppeteer
         
         Args:
             None
@@ -50,6 +97,8 @@ class ColaCrawler(BaseCrawler):
             browser: 初始化后的浏览器实例
         """
         if not self.browser:
+            os.environ['PYPPETEER_CHROMIUM_REVISION'] = CHROMIUM_REVISION
+            from pyppeteer import launch
             self.browser = await launch(
                 headless=True,
                 args=[
@@ -70,10 +119,45 @@ class ColaCrawler(BaseCrawler):
         Returns:
             None
         """
+        if self.page_pool:
+            await self.page_pool.close()
+            self.page_pool = None
         if self.browser:
             await self.browser.close()
             self.browser = None
 
+    async def get_page_pool(self):
+        """获取浏览器页面池，首次调用时启动浏览器并预热页面
+        
+        Args:
+            None
+        
+        Returns:
+            BrowserPagePool: 页面池
+        """
+        async with self._page_pool_lock:
+            if not self.page_pool:
+                browser = await self.init_browser()
+                self.page_pool = await BrowserPagePool(
+                    browser,
+                    size=self.page_pool_size,
+                    user_agent=self.HEADERS['User-Agent'],
+                    script_hosts=self.SCRIPT_HOSTS
+                ).start()
+        return self.page_pool
+
+    async def close(self):
+        """关闭浏览器与所有共享会话
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        await self.close_browser()
+        await super().close()
+
     async def search_manga(self, keyword, page=1):
         """搜索漫画并缓存结果
         
@@ -84,23 +168,43 @@ class ColaCrawler(BaseCrawler):
         Returns:
             str: 格式化的搜索结果
         """
-        self.clear_cache("search")
+        search_results = await self.search_results(keyword, page)
+        if isinstance(search_results, str):
+            return search_results
+        self.save_to_cache("search", search_results)
+        return self.format_search_results(search_results)
+
+    async def search_results(self, keyword, page=1):
+        """搜索漫画并返回结构化结果，只写入按关键词与页数区分的缓存
+        
+        Args:
+            keyword: 搜索关键词
+            page: 页数，默认为1
+        
+        Returns:
+            dict: 解析后的搜索结果，失败时返回错误信息字符串
+        """
+        cache_key = f"{keyword}:{page}"
+        cached_results = self.load_from_cache("search", cache_key)
+        if cached_results:
+            return cached_results
         try:
-            async with AsyncSession(proxies=self.PROXIES, headers=self.HEADERS, verify=False) as session:
-                await session.get("https://www.colamanga.com")
-                params = {"type": 1, "searchString": keyword, "page": page}
-                response = await session.get("https://www.colamanga.com/search", params=params)
-                if response.status_code == 200:
-                    search_results = self.html_to_json(response.text)
-                    self.save_to_cache("search", search_results)
-                    return self.format_search_results(search_results)
-                else:
-                    return f"搜索失败，状态码: {response.status_code}"
+            if not self._home_visited:
+                self._home_visited = True
+                await self.fetch(self.base_url)
+            params = {"type": 1, "searchString": keyword, "page": page}
+            response = await self.fetch(f"{self.base_url}/search", params=params)
+            if response.status_code == 200:
+                search_results = self.html_to_json(response.text)
+                self.save_to_cache("search", search_results, cache_key)
+                return search_results
+            else:
+                return f"搜索失败，状态码: {response.status_code}"
         except Exception as e:
             return f"搜索失败: {e}"
 
     def html_to_json(self, html):
-        """将HTML转换为JSON格式
+        """将搜索页HTML转换为JSON格式
         
         Args:
             html: HTML内容
@@ -108,36 +212,7 @@ class ColaCrawler(BaseCrawler):
         Returns:
             dict: 解析后的JSON数据
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        result = {
-            "results": {
-                "total": soup.select_one('#fed-count').text if soup.select_one('#fed-count') else "0",
-                "list": []
-            }
-        }
-        for dl in soup.select('dl.fed-deta-info'):
-            manga = {}
-            title = dl.select_one('h1 a')
-            if title:
-                manga['name'] = title.text.strip()
-                manga['path_word'] = title.get('href', '').strip('/')
-                manga['url'] = f"https://www.colamanga.com/{title.get('href', '')}"
-            for li in dl.select('li'):
-                label = li.select_one('.fed-text-muted')
-                if not label: continue
-                key = label.text.strip().rstrip('：')
-                value = li.get_text().replace(label.text, '').strip()
-                if key == '作者':
-                    manga['author'] = [{"name": value}]
-                elif key == '别名':
-                    manga['alias'] = value
-                elif key == '状态':
-                    manga['status'] = value
-                elif key == '类别':
-                    manga['categories'] = [a.text.strip() for a in li.select('a')]
-            manga['popular'] = "未知"
-            result['results']['list'].append(manga)
-        return result
+        return parse_search_page(html, self.html_parser, self.base_url)
 
     def format_search_results(self, search_results):
         """格式化搜索结果为可读字符串
@@ -173,7 +248,6 @@ class ColaCrawler(BaseCrawler):
         Returns:
             str: 格式化的章节列表
         """
-        self.clear_cache("chapters")
         manga_path_word = ""
         manga_name = ""
         if str(index_or_path).isdigit():
@@ -190,21 +264,46 @@ class ColaCrawler(BaseCrawler):
         else:
             manga_path_word = index_or_path
             manga_name = "未知漫画"
-        cached_chapters = self.load_from_cache("chapters")
-        if cached_chapters:
-            return self.format_chapter_list(manga_name, cached_chapters)
-        manga_url = f"https://www.colamanga.com/{manga_path_word}"
+        manga_page = await self.load_manga_page(manga_path_word, f"{self.base_url}/{manga_path_word}")
+        if isinstance(manga_page, str):
+            return manga_page
+        return self.format_chapter_list(manga_page["name"] or manga_name, manga_page["chapters"])
+
+    async def load_manga_page(self, manga_path_word, manga_url):
+        """获取漫画名称与章节列表，二者一起缓存，命中缓存时也能得到漫画名称
+        
+        Args:
+            manga_path_word: 漫画path_word，作为缓存标识
+            manga_url: 漫画详情页URL
+        
+        Returns:
+            dict: {"name": 漫画名称(未找到时为None), "chapters": 章节信息列表}，失败时返回错误信息字符串
+        """
+        cached_page = self.load_from_cache("chapters", manga_path_word)
+        # 旧版本只缓存了章节列表，不含漫画名称，视为未命中
+        if isinstance(cached_page, dict) and cached_page.get("chapters"):
+            return cached_page
         try:
-            async with AsyncSession(proxies=self.PROXIES, headers=self.HEADERS, verify=False) as session:
-                response = await session.get(manga_url)
-                if response.status_code == 200:
-                    chapters = self.parse_chapters(response.text)
-                    self.save_to_cache("chapters", chapters)
-                    return self.format_chapter_list(manga_name, chapters)
-                else:
-                    return f"获取章节列表失败，状态码: {response.status_code}"
+            response = await self.fetch(manga_url)
+            if response.status_code != 200:
+                return f"获取章节列表失败，状态码: {response.status_code}"
+            manga_page = self.parse_manga_page(response.text)
         except Exception as e:
             return f"获取章节列表失败: {e}"
+        if manga_page["chapters"]:
+            self.save_to_cache("chapters", manga_page, manga_path_word)
+        return manga_page
+
+    def parse_manga_page(self, html):
+        """一次解析漫画详情页，同时提取漫画名称与章节列表
+        
+        Args:
+            html: HTML内容
+        
+        Returns:
+            dict: {"name": 漫画名称(未找到时为None), "chapters": 章节信息列表}
+        """
+        return parse_manga_page(html, self.html_parser, self.base_url)
 
     def parse_chapters(self, html):
         """解析HTML中的章节信息
@@ -215,35 +314,7 @@ class ColaCrawler(BaseCrawler):
         Returns:
             list: 章节信息列表
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        chapters = []
-        chapter_container = soup.select_one('.all_data_list')
-        if chapter_container:
-            chapter_links = chapter_container.select('a.fed-btns-info')
-            for a in chapter_links:
-                chapter_url = f"https://www.colamanga.com{a.get('href')}"
-                chapter_title = a.get('title') or a.text.strip()
-                chapters.append({"name": chapter_title, "url": chapter_url})
-        else:
-            all_links = soup.select('.fed-part-rows a')
-            start_index = -1
-            end_index = -1
-            for i, a in enumerate(all_links):
-                text = a.text.strip()
-                if text == "更多":
-                    start_index = i
-                elif text == "展开":
-                    end_index = i
-                    break
-            if start_index != -1 and end_index != -1 and start_index < end_index:
-                for a in all_links[start_index + 1:end_index]:
-                    href = a.get('href')
-                    title = a.text.strip()
-                    if re.match(r'^\d+\s+.+', title) or re.match(r'^第\d+[话章]', title):
-                        chapter_url = f"https://www.colamanga.com{href}"
-                        chapters.append({"name": title, "url": chapter_url})
-        chapters.reverse()
-        return chapters
+        return self.parse_manga_page(html)["chapters"]
 
     def format_chapters_list(self, manga_name, chapters):
         """格式化章节列表为可读字符串
@@ -262,35 +333,90 @@ class ColaCrawler(BaseCrawler):
             result_str += f"{i + 1}. {chapter['name']}\n"
         return result_str
 
-    async def get_manga_image_info(self, chapter_url):
+    @timed("resolve")
+    async def get_manga_image_info(self, chapter_url, refresh=False):
         """获取漫画图片信息，并返回图片完整文件名
         
+        先查下载清单中保存的章节描述；没有时优先通过一次HTTP请求解码阅读页内嵌的章节数据，
+        失败时再用浏览器打开阅读页解析，解析成功的结果保存到下载清单供之后的运行直接使用
+        
         Args:
             chapter_url: 章节URL
+            refresh: 是否忽略已保存的描述重新解析，默认为False
         
         Returns:
             tuple: (manga_id, encrypted_string, total_pages, image_filename)
         """
+        if not refresh:
+            descriptor = self.manifest.get_descriptor(chapter_url)
+            if descriptor:
+                self.metrics.inc("resolve_source", source="store")
+                return tuple(descriptor)
+        info = await self.resolve_static_image_info(chapter_url)
+        source = "static"
+        if info is None:
+            info = await self.resolve_browser_image_info(chapter_url)
+            source = "browser"
+        if info[0] and info[2]:
+            self.metrics.inc("resolve_source", source=source)
+            self.manifest.save_descriptor(chapter_url, list(info))
+        return info
+
+    async def resolve_static_image_info(self, chapter_url):
+        """不启动浏览器，解码阅读页内嵌的C_DATA得到章节图片信息
+        
+        解密用的密钥从页面脚本中收集，解开过C_DATA的密钥在后续章节中优先尝试；试解密在执行器中进行
+        
+        Args:
+            chapter_url: 章节URL
+        
+        Returns:
+            tuple: (manga_id, encrypted_string, total_pages, image_filename)，解析失败时返回None
+        """
         try:
-            browser = await self.init_browser()
-            page = await browser.newPage()
-            await page.setUserAgent(self.HEADERS['User-Agent'])
-            await page.goto(chapter_url, {'waitUntil': 'networkidle0', 'timeout': 60000})
-            await page.waitForSelector('#mangalist', {'timeout': 15000})
-            cookies = await page.cookies()
-            total_pages = 0
-            for cookie in cookies:
-                if cookie['name'].startswith('_tkb_'):
-                    total_pages = int(cookie['value'])
-                    break
-            first_image = None
-            try:
-                first_image = await page.evaluate('__cr_getpice(1)')
-            except:
-                elements = await page.querySelectorAll('img.fed-list-imgs')
-                if elements and len(elements) > 0:
-                    first_image = await page.evaluate('(element) => element.src', elements[0])
-            await page.close()
+            html = await self.fetch_reader_page(chapter_url)
+            c_data = find_chapter_data(html) if html else None
+            if not c_data:
+                print(f"阅读页中未找到章节数据，改用浏览器解析: {chapter_url}")
+                return None
+            scripts = await self.fetch_reader_scripts(chapter_url)
+            candidates = self._data_keys + [key for key in key_candidates(scripts) if key not in self._data_keys]
+            decoded = await self.run_cpu(decode_image_info, self.aes_backend_name, c_data, candidates)
+            if decoded is None:
+                print(f"无法解密章节数据，改用浏览器解析: {chapter_url}")
+                return None
+            key, info = decoded
+            if key and key not in self._data_keys:
+                self._data_keys.insert(0, key)
+        except Exception as e:
+            print(f"静态解析章节信息失败: {e}")
+            return None
+        if info is None:
+            print(f"章节数据不完整，改用浏览器解析: {chapter_url}")
+        return info
+
+    async def resolve_browser_image_info(self, chapter_url):
+        """用浏览器打开阅读页，读取_tkb_ Cookie与第一张图片的URL得到章节图片信息
+        
+        Args:
+            chapter_url: 章节URL
+        
+        Returns:
+            tuple: (manga_id, encrypted_string, total_pages, image_filename)
+        """
+        try:
+            pool = await self.get_page_pool()
+            async with pool.page() as page:
+                await page.goto(chapter_url, {'waitUntil': 'domcontentloaded', 'timeout': 30000})
+                await page.waitForSelector('#mangalist', {'timeout': 15000})
+                total_pages = await self.read_total_pages(page)
+                first_image = None
+                try:
+                    first_image = await page.evaluate('__cr_getpice(1)')
+                except:
+                    elements = await page.querySelectorAll('img.fed-list-imgs')
+                    if elements and len(elements) > 0:
+                        first_image = await page.evaluate('(element) => element.src', elements[0])
             if not first_image:
                 print("无法获取图片URL")
                 return None, None, 0, "jpg"
@@ -310,15 +436,46 @@ class ColaCrawler(BaseCrawler):
             print(f"获取漫画信息失败: {e}")
             return None, None, 0, "jpg"
 
-    async def download_manga(self, chapter_spec, index_or_path):
-        """下载漫画章节，合并为PDF并删除图片
+    async def read_total_pages(self, page, timeout=10):
+        """等待并读取_tkb_ Cookie中的总页数，读取后删除该Cookie以便页面复用
+        
+        Args:
+            page: 已打开章节的页面
+            timeout: 最长等待秒数，默认为10
+        
+        Returns:
+            int: 总页数，未找到则返回0
+        """
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            cookies = [c for c in await page.cookies() if c['name'].startswith('_tkb_')]
+            if cookies:
+                await page.deleteCookie(*[{'name': c['name']} for c in cookies])
+                return int(cookies[0]['value'])
+            if asyncio.get_running_loop().time() >= deadline:
+                return 0
+            await asyncio.sleep(0.2)
+
+    async def resolve_image_infos(self, chapter_urls):
+        """通过页面池并行获取多个章节的图片信息
+        
+        Args:
+            chapter_urls: 章节URL列表
+        
+        Returns:
+            list: 与chapter_urls一一对应的 (manga_id, encrypted_string, total_pages, image_filename)
+        """
+        return await asyncio.gather(*(self.get_manga_image_info(url) for url in chapter_urls))
+
+    async def download_report(self, chapter_spec, index_or_path):
+        """下载漫画章节，合并为PDF并删除图片；浏览器保持打开，供同一实例的后续下载复用
         
         Args:
             chapter_spec: 章节规格 (x 或 x-y 或 all)
             index_or_path: 索引或URL/path_word
         
         Returns:
-            str: 下载结果
+            dict: 下载报告，格式见BaseCrawler.make_report
         """
         try:
             manga_path_word = ""
@@ -327,89 +484,171 @@ class ColaCrawler(BaseCrawler):
             if str(index_or_path).isdigit():
                 search_results = self.load_from_cache("search")
                 if not search_results or "results" not in search_results:
-                    return "无搜索缓存，请先搜索漫画"
+                    return self.make_report(manga_name, error="无搜索缓存，请先搜索漫画")
                 idx = int(index_or_path) - 1
                 manga_list = search_results["results"]["list"]
                 if idx < 0 or idx >= len(manga_list):
-                    return f"无效的索引: {index_or_path}"
+                    return self.make_report(manga_name, error=f"无效的索引: {index_or_path}")
                 manga = manga_list[idx]
                 manga_path_word = manga["path_word"]
                 manga_name = manga["name"]
                 manga_url = manga["url"]
             else:
                 manga_path_word = index_or_path
-                manga_url = f"https://www.colamanga.com/{manga_path_word}"
-            chapters = self.load_from_cache("chapters")
-            if not chapters:
-                try:
-                    async with AsyncSession(proxies=self.PROXIES, headers=self.HEADERS, verify=False) as session:
-                        response = await session.get(manga_url)
-                        if response.status_code == 200:
-                            chapters = self.parse_chapters(response.text)
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            title_elem = soup.select_one('.fed-part-eone h1')
-                            if title_elem:
-                                manga_name = title_elem.text.strip()
-                            self.save_to_cache("chapters", chapters)
-                        else:
-                            return f"获取章节列表失败，状态码: {response.status_code}"
-                except Exception as e:
-                    return f"获取章节列表失败: {e}"
+                manga_url = f"{self.base_url}/{manga_path_word}"
+            manga_page = await self.load_manga_page(manga_path_word, manga_url)
+            if isinstance(manga_page, str):
+                return self.make_report(manga_name, error=manga_page)
+            # 页面上找不到名称时用path_word作目录名，避免章节直接落在下载根目录
+            manga_name = manga_page["name"] or manga_name or manga_path_word
+            chapters = manga_page["chapters"]
             if not chapters:
-                return f"{manga_name}: 未找到章节"
+                return self.make_report(manga_name, error=f"{manga_name}: 未找到章节")
             if chapter_spec.lower() == 'all':
                 selected_chapters = chapters
             elif '-' in chapter_spec:
                 try:
                     start, end = map(int, chapter_spec.split('-'))
                     if start < 1 or end > len(chapters) or start > end:
-                        return f"无效的章节范围: {chapter_spec}"
+                        return self.make_report(manga_name, error=f"无效的章节范围: {chapter_spec}")
                     selected_chapters = chapters[start - 1:end]
                 except ValueError:
-                    return f"无效的章节范围格式: {chapter_spec}"
+                    return self.make_report(manga_name, error=f"无效的章节范围格式: {chapter_spec}")
             else:
                 try:
                     idx = int(chapter_spec) - 1
                     if idx < 0 or idx >= len(chapters):
-                        return f"无效的章节索引: {chapter_spec}"
+                        return self.make_report(manga_name, error=f"无效的章节索引: {chapter_spec}")
                     selected_chapters = [chapters[idx]]
                 except ValueError:
-                    return f"无效的章节索引格式: {chapter_spec}"
-            results = []
-            try:
-                await self.init_browser()
-                for chapter in selected_chapters:
-                    print(f"\n开始下载章节: {chapter['name']}")
-                    manga_id, encrypted_string, total_pages, image_filename = await self.get_manga_image_info(
-                        chapter['url'])
-                    if not manga_id or total_pages == 0:
-                        results.append(f"{chapter['name']}: 信息获取失败")
-                        continue
-                    success_count = await self.download_manga_chapter(
-                        manga_name,
-                        chapter['name'],
-                        chapter['url'],
-                        manga_id,
-                        encrypted_string,
-                        total_pages,
-                        image_filename
-                    )
-                    results.append(f"{chapter['name']}: 成功下载 {success_count}/{total_pages} 页")
-            finally:
-                await self.close_browser()
-            return f"\n{manga_name} 下载完成:\n" + "\n".join(results)
+                    return self.make_report(manga_name, error=f"无效的章节索引格式: {chapter_spec}")
+            async def resolve(chapter):
+                if self.manifest.is_chapter_complete(chapter['url']):
+                    raise StageSkipped("已下载，跳过")
+                info = await self.get_manga_image_info(chapter['url'])
+                manga_id, encrypted_string, total_pages, image_filename = info
+                if not manga_id or total_pages == 0:
+                    raise StageError("信息获取失败")
+                return info
+
+            async def fetch(chapter, info):
+                print(f"\n开始下载章节: {chapter['name']}")
+                return await self.fetch_chapter_images(manga_name, chapter['name'], chapter['url'], info)
+
+            async def assemble(chapter, info, fetched):
+                success_count, image_paths, pdf_filepath = fetched
+                total_pages = len(image_paths)
+                complete = await self.finish_chapter(chapter['url'], image_paths, pdf_filepath, total_pages)
+                return ChapterOutcome("done" if complete else "partial", f"成功下载 {success_count}/{total_pages} 页")
+
+            limits = {"resolve": self.page_pool_size, **(self.stage_limits or {})}
+            pipeline = ChapterPipeline(resolve, fetch, assemble, limits)
+            outcomes = await pipeline.run(selected_chapters)
+            return self.make_report(manga_name, selected_chapters, outcomes)
+        except Exception as e:
+            return self.make_report(manga_name, error=f"下载过程中出错: {e}")
+
+    async def obtain_crypto_key(self, url, sample=None):
+        """获取章节的AES密钥并保存到缓存，优先从页面脚本中静态提取，失败时再用浏览器捕获
+        
+        Args:
+            url: 章节URL
+            sample: 用于验证候选密钥的加密图片，默认为None即直接使用浏览器捕获
+        
+        Returns:
+            str: 保存的密钥文件路径，未获取到密钥时返回None
+        """
+        if sample is not None:
+            key_path = await self.extract_static_key(url, sample)
+            if key_path:
+                return key_path
+        return await self.capture_crypto_key(url)
+
+    async def fetch_reader_page(self, url):
+        """通过HTTP获取阅读页，最近的READER_CACHE_SIZE个页面保留在内存中
+        
+        Args:
+            url: 章节URL
+        
+        Returns:
+            str: 阅读页HTML，获取失败时返回None
+        """
+        html = self._reader_pages.get(url)
+        if html is not None:
+            self._reader_pages.move_to_end(url)
+            return html
+        response = await self.fetch(url)
+        if response.status_code != 200:
+            print(f"获取阅读页失败，状态码: {response.status_code}")
+            return None
+        self._reader_pages[url] = response.text
+        while len(self._reader_pages) > self.READER_CACHE_SIZE:
+            self._reader_pages.popitem(last=False)
+        return response.text
+
+    async def fetch_reader_scripts(self, url):
+        """获取阅读页的内联脚本与站点外部脚本，外部脚本按URL缓存在内存中
+        
+        Args:
+            url: 章节URL
+        
+        Returns:
+            list: 脚本内容列表
+        """
+        html = await self.fetch_reader_page(url)
+        if html is None:
+            return []
+        script_urls, scripts = find_scripts(html, url, self.SCRIPT_HOSTS, self.html_parser)
+        missing = [script_url for script_url in script_urls if script_url not in self._script_texts]
+        responses = await asyncio.gather(*(self.fetch(script_url) for script_url in missing), return_exceptions=True)
+        for script_url, script_response in zip(missing, responses):
+            if isinstance(script_response, Exception) or script_response.status_code != 200:
+                print(f"获取脚本失败: {script_url}")
+                continue
+            self._script_texts[script_url] = script_response.text
+        return scripts + [self._script_texts[script_url] for script_url in script_urls if script_url in self._script_texts]
+
+    @timed("key_extract")
+    async def extract_static_key(self, url, sample):
+        """不启动浏览器，从阅读页脚本中找出能解密样本图片的AES密钥并保存到缓存
+        
+        之前验证过的密钥优先尝试，命中时不需要再请求阅读页；试解密在执行器中进行
+        
+        Args:
+            url: 章节URL
+            sample: 该章节的一张加密图片
+        
+        Returns:
+            str: 保存的密钥文件路径，未找到时返回None
+        """
+        try:
+            key_bytes = None
+            if self._static_keys:
+                key_bytes = await self.run_cpu(search_image_key, self.aes_backend_name, list(self._static_keys), sample)
+            if key_bytes is None:
+                scripts = await self.fetch_reader_scripts(url)
+                key_bytes = await self.run_cpu(search_image_key, self.aes_backend_name, key_candidates(scripts), sample)
         except Exception as e:
-            await self.close_browser()
-            return f"下载过程中出错: {e}"
+            print(f"静态提取密钥失败: {e}")
+            return None
+        if key_bytes is None:
+            print(f"未能从页面脚本中提取密钥，改用浏览器捕获: {url}")
+            return None
+        if key_bytes in self._static_keys:
+            self._static_keys.remove(key_bytes)
+        self._static_keys.insert(0, key_bytes)
+        self.metrics.inc("key_source", source="static")
+        return self.save_key_to_cache(url, key_bytes)
 
+    @timed("key_capture")
     async def capture_crypto_key(self, url):
-        """捕获网页中的AES密钥并保存到缓存
+        """用浏览器打开阅读页，挂钩CryptoJS.AES.decrypt捕获AES密钥并保存到缓存
         
         Args:
             url: 网页URL
         
         Returns:
-            str: 保存的密钥文件路径
+            str: 保存的密钥文件路径，未捕获到密钥时返回None
         """
         if not self.browser:
             await self.init_browser()
@@ -440,6 +679,23 @@ class ColaCrawler(BaseCrawler):
         words = []
         if crypto_key and isinstance(crypto_key, dict):
             words = crypto_key.get('words', [])
+        if not words:
+            print(f"未能捕获密钥: {url}")
+            return None
+        key_bytes = b"".join(num.to_bytes(4, byteorder='big', signed=num < 0) for num in words)
+        self.metrics.inc("key_source", source="browser")
+        return self.save_key_to_cache(url, key_bytes)
+
+    def save_key_to_cache(self, url, key_bytes):
+        """保存密钥到缓存目录并更新内存索引
+        
+        Args:
+            url: 漫画章节URL
+            key_bytes: 密钥字节数据
+        
+        Returns:
+            str: 保存的密钥文件路径
+        """
         manga_id, page_num = self.extract_manga_info(url)
         dir_path = os.path.join(self.CACHE_DIR, 'aes_key')
         os.makedirs(dir_path, exist_ok=True)
@@ -448,9 +704,8 @@ class ColaCrawler(BaseCrawler):
         file_prefix = f"{manga_id}_{page_num}"
         self.cleanup_old_keys(dir_path)
         bin_path = os.path.join(dir_path, f'{file_prefix}_{date_str}.bin')
-        with open(bin_path, 'wb') as f:
-            for num in words:
-                f.write(num.to_bytes(4, byteorder='big'))
+        self.write_file_atomic(bin_path, key_bytes)
+        self.load_key_index()[(manga_id, page_num)] = (today.date(), key_bytes)
         print(f"已保存密钥到: {bin_path}")
         return bin_path
 
@@ -492,145 +747,232 @@ class ColaCrawler(BaseCrawler):
                             file_path = os.path.join(dir_path, filename)
                             os.remove(file_path)
                             print(f"已删除旧密钥: {file_path}")
+                            self._drop_indexed_key(filename, file_date)
                 except Exception as e:
                     print(f"处理文件 {filename} 时出错: {e}")
 
-    def read_key_from_cache(self, url):
-        """从缓存中读取AES密钥
+    def load_key_index(self):
+        """从aes_key目录加载密钥到内存索引，只在首次调用时扫描磁盘
         
         Args:
-            url: 漫画章节URL
+            None
         
         Returns:
-            bytes: 密钥字节数据，如果不存在则返回None
+            dict: {(manga_id, page_num): (日期, 密钥字节数据)}
         """
-        manga_id, page_num = self.extract_manga_info(url)
-        file_prefix = f"{manga_id}_{page_num}"
+        if self._key_index is not None:
+            return self._key_index
+        self._key_index = {}
         cache_dir = os.path.join(self.CACHE_DIR, 'aes_key')
         if not os.path.exists(cache_dir):
-            print(f"缓存目录 {cache_dir} 不存在")
-            return None
-        candidate_files = []
+            return self._key_index
+        pattern = re.compile(r'^(.+)_([^_]+)_(\d{4}_\d{2}_\d{2})\.bin$')
         for filename in os.listdir(cache_dir):
-            if filename.startswith(file_prefix) and filename.endswith('.bin'):
-                date_match = re.search(r'_(\d{4}_\d{2}_\d{2})\.bin$', filename)
-                if date_match:
-                    file_date = datetime.strptime(date_match.group(1), '%Y_%m_%d')
-                    candidate_files.append((file_date, filename))
-        if not candidate_files:
-            print(f"未找到匹配的密钥文件: {file_prefix}_*.bin")
-            return None
-        candidate_files.sort(reverse=True)
-        latest_file = candidate_files[0][1]
-        key_path = os.path.join(cache_dir, latest_file)
-        try:
-            with open(key_path, 'rb') as f:
-                key_bytes = f.read()
+            match = pattern.match(filename)
+            if not match:
+                continue
+            try:
+                file_date = datetime.strptime(match.group(3), '%Y_%m_%d').date()
+                cache_key = (match.group(1), match.group(2))
+                if cache_key in self._key_index and self._key_index[cache_key][0] >= file_date:
+                    continue
+                with open(os.path.join(cache_dir, filename), 'rb') as f:
+                    key_bytes = f.read()
+                if key_bytes:
+                    self._key_index[cache_key] = (file_date, key_bytes)
+            except Exception as e:
+                print(f"读取密钥文件 {filename} 失败: {e}")
+        return self._key_index
+
+    def _drop_indexed_key(self, filename, file_date):
+        """密钥文件被删除后同步移除内存索引中的对应项
+        
+        Args:
+            filename: 被删除的密钥文件名
+            file_date: 密钥文件日期
+        
+        Returns:
+            None
+        """
+        if self._key_index is None:
+            return
+        match = re.match(r'^(.+)_([^_]+)_\d{4}_\d{2}_\d{2}\.bin$', filename)
+        if match:
+            cache_key = (match.group(1), match.group(2))
+            entry = self._key_index.get(cache_key)
+            if entry and entry[0] == file_date:
+                del self._key_index[cache_key]
+
+    def read_key_from_cache(self, url):
+        """从内存密钥索引中读取AES密钥
+        
+        Args:
+            url: 漫画章节URL
+        
+        Returns:
+            bytes: 密钥字节数据，如果不存在则返回None
+        """
+        entry = self.load_key_index().get(self.extract_manga_info(url))
+        return entry[1] if entry else None
+
+    async def get_crypto_key(self, url, stale_key=None, sample=None):
+        """获取章节的AES密钥，缺失时获取新密钥
+        
+        同一章节的并发请求共享同一个进行中的获取任务，不会重复请求阅读页或打开浏览器页面
+        
+        Args:
+            url: 漫画章节URL
+            stale_key: 已确认失效的密钥，索引中仍是该密钥时重新获取，默认为None
+            sample: 用于静态提取时验证密钥的加密图片，默认为None
+        
+        Returns:
+            bytes: 密钥字节数据，获取失败则返回None
+        """
+        key_bytes = self.read_key_from_cache(url)
+        if key_bytes is not None and key_bytes != stale_key:
             return key_bytes
+        cache_key = self.extract_manga_info(url)
+        task = self._key_captures.get(cache_key)
+        if task is None:
+            print("缓存中未找到可用密钥，获取新密钥...")
+            task = asyncio.ensure_future(self.obtain_crypto_key(url, sample))
+            self._key_captures[cache_key] = task
+            task.add_done_callback(lambda _: self._key_captures.pop(cache_key, None))
+        try:
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            print(f"读取密钥文件失败: {e}")
+            print(f"获取密钥失败: {e}")
+            return None
+        key_bytes = self.read_key_from_cache(url)
+        if key_bytes is None or key_bytes == stale_key:
             return None
+        return key_bytes
 
-    async def decrypt_webp_image(self, input_path, output_path, key_bytes):
-        """使用pyaes解密AES-CBC加密的图片并直接保存为JPEG格式
+    async def decrypt_webp_image(self, encrypted_data, output_path, key_bytes, chapter_key=None, page=None):
+        """解密AES-CBC加密的图片，必要时转码后保存为JPEG格式，解密与转码在执行器中进行
         
         Args:
-            input_path: 输入文件路径
+            encrypted_data: 加密的图片字节数据
             output_path: 输出文件路径
             key_bytes: 密钥字节数据
+            chapter_key: 下载清单中的章节标识，默认为None
+            page: 页码，默认为None
         
         Returns:
             bool: 解密是否成功
         """
         iv = "0000000000000000".encode("utf-8")
         try:
-            with open(input_path, "rb") as f:
-                encrypted_data = f.read()
-            aes_cbc = pyaes.AESModeOfOperationCBC(key_bytes, iv=iv)
-            decrypter = pyaes.Decrypter(aes_cbc)
-            raw_decrypted = decrypter.feed(encrypted_data)
-            raw_decrypted += decrypter.feed()
-            image = Image.open(BytesIO(raw_decrypted))
-            image.convert("RGB").save(output_path, "JPEG", quality=85)
+            with self.metrics.timer("decrypt"):
+                raw_decrypted = await self.run_cpu(decrypt_cbc, self.aes_backend_name, key_bytes, iv, encrypted_data)
+            with self.metrics.timer("transcode"):
+                image_data = await self.run_cpu(normalize_image, raw_decrypted)
+            self.save_page(output_path, image_data, chapter_key, page)
             return True
         except Exception as e:
             print(f"解密或转换失败: {e}")
             return False
 
-    async def download_image(self, session, url, filepath, referer, chapter_url, max_retries=3):
-        """下载图片，对enc.webp格式进行AES解密处理
+    async def download_image(self, url, filepath, referer, chapter_url, max_attempts=None, page=None):
+        """流式下载图片，对enc.webp格式进行AES解密处理
+
+        未加密的图片按块写入磁盘；加密图片按块接收到内存后解密，下载与解密期间占用全局字节预算
         
         Args:
-            session: 请求会话
             url: 图片URL
             filepath: 保存路径
             referer: 引用页面
             chapter_url: 章节URL
-            max_retries: 最大重试次数，默认为3
+            max_attempts: 最大尝试次数，默认为None即使用重试策略的配置
+            page: 页码，提供时在下载清单中记录该页，默认为None
         
         Returns:
             bool: 下载是否成功
         """
         headers = self.HEADERS.copy()
         headers["Referer"] = referer
-        is_enc_webp = 'enc.webp' in filepath.lower()
-        for attempt in range(max_retries):
+        if 'enc.webp' not in filepath.lower():
             try:
-                async with self.semaphore:
-                    response = await session.get(url, headers=headers)
-                    if response.status_code == 200:
-                        temp_filepath = filepath + ".temp"
-                        with open(temp_filepath, 'wb') as f:
-                            f.write(response.content)
-                        if is_enc_webp:
-                            decrypted_filepath = filepath.replace('.enc.webp', '.jpg')
-                            key_bytes = self.read_key_from_cache(chapter_url)
-                            if key_bytes is None:
-                                print("缓存中未找到密钥，获取新密钥...")
-                                await self.capture_crypto_key(chapter_url)
-                                key_bytes = self.read_key_from_cache(chapter_url)
-                                if key_bytes is None:
-                                    print("即使获取了新密钥，仍然无法从缓存中读取")
-                                    return False
-                            success = await self.decrypt_webp_image(temp_filepath, decrypted_filepath, key_bytes)
-                            if not success:
-                                print("使用缓存密钥解密失败，尝试获取新密钥...")
-                                await self.capture_crypto_key(chapter_url)
-                                key_bytes = self.read_key_from_cache(chapter_url)
-                                if key_bytes is None:
-                                    print("无法读取新生成的密钥")
-                                    return False
-                                success = await self.decrypt_webp_image(temp_filepath, decrypted_filepath, key_bytes)
-                                if not success:
-                                    print("使用新密钥解密仍然失败，可能是图片格式问题")
-                                    return False
-                            try:
-                                os.remove(temp_filepath)
-                            except Exception as e:
-                                print(f"删除临时文件失败: {e}")
-                            return True
-                        else:
-                            img = Image.open(temp_filepath)
-                            img = img.convert('RGB')
-                            img.save(filepath, format="JPEG", quality=85)
-                            os.remove(temp_filepath)
-                            return True
-                    elif attempt < max_retries - 1:
-                        print(f"  重试 ({attempt + 1}/{max_retries})...")
-                        await asyncio.sleep(1)
-                    else:
-                        print(f"  下载失败，状态码: {response.status_code}")
+                status_code = await self.download_page(url, filepath, chapter_url, page, max_attempts, headers=headers)
             except Exception as e:
-                if attempt < max_retries - 1:
-                    print(f"  出错: {e}，重试...")
-                    await asyncio.sleep(1)
-                else:
-                    print(f"  下载失败: {e}")
-        return False
+                print(f"  下载失败: {e}")
+                return False
+            if status_code != 200:
+                print(f"  下载失败，状态码: {status_code}")
+                self.mark_stale(chapter_url, status_code)
+                return False
+            return True
+        async with self.byte_budget.reserve() as reservation:
+            sink = BufferSink(reservation)
+            try:
+                response = await self.fetch(url, max_attempts=max_attempts, sink=sink, headers=headers)
+            except Exception as e:
+                print(f"  下载失败: {e}")
+                return False
+            if response.status_code != 200:
+                print(f"  下载失败，状态码: {response.status_code}")
+                self.mark_stale(chapter_url, response.status_code)
+                return False
+            return await self.decrypt_downloaded_image(sink.getvalue(), filepath, chapter_url, page)
+
+    async def decrypt_downloaded_image(self, content, filepath, chapter_url, page=None):
+        """解密已下载的enc.webp图片，缓存密钥失效时重新获取密钥再试一次
+        
+        Args:
+            content: 加密的图片字节数据
+            filepath: 原图片保存路径(.enc.webp)
+            chapter_url: 章节URL
+            page: 页码，默认为None
+        
+        Returns:
+            bool: 解密是否成功
+        """
+        decrypted_filepath = filepath.replace('.enc.webp', '.jpg')
+        key_bytes = await self.get_crypto_key(chapter_url, sample=content)
+        if key_bytes is None:
+            print("无法获取密钥")
+            return False
+        success = await self.decrypt_webp_image(content, decrypted_filepath, key_bytes, chapter_url, page)
+        if not success:
+            print("使用缓存密钥解密失败，尝试获取新密钥...")
+            key_bytes = await self.get_crypto_key(chapter_url, stale_key=key_bytes, sample=content)
+            if key_bytes is None:
+                print("无法读取新生成的密钥")
+                return False
+            success = await self.decrypt_webp_image(content, decrypted_filepath, key_bytes, chapter_url, page)
+            if not success:
+                print("使用新密钥解密仍然失败，可能是图片格式问题")
+                return False
+        return True
+
+    async def fetch_chapter_images(self, manga_name, chapter_name, chapter_url, info):
+        """下载章节图片；有图片因地址失效(403/404等)下载失败时重新解析章节信息，只重试缺失的页面
+        
+        Args:
+            manga_name: 漫画名称
+            chapter_name: 章节名称
+            chapter_url: 章节URL
+            info: get_manga_image_info的结果
+        
+        Returns:
+            tuple: (成功下载的页数, 图片路径列表, PDF文件路径)
+        """
+        fetched = await self.download_chapter_images(manga_name, chapter_name, chapter_url, *info)
+        if not self.pop_stale(chapter_url):
+            return fetched
+        fresh = await self.get_manga_image_info(chapter_url, refresh=True)
+        if not fresh[0] or tuple(fresh) == tuple(info):
+            return fetched
+        print(f"{chapter_name}: 图片地址已失效，使用重新解析的章节信息重试")
+        self.metrics.inc("descriptor_revalidations")
+        retried = await self.download_chapter_images(manga_name, chapter_name, chapter_url, *fresh)
+        return fetched[0] + retried[0], retried[1], retried[2]
 
     async def download_manga_chapter(self, manga_name, chapter_name, chapter_url, manga_id, encrypted_string,
                                      total_pages, image_filename="0001.jpg"):
-        """下载一个章节的所有图片，对于enc.webp格式进行解密处理
+        """下载一个章节的所有图片，对于enc.webp格式进行解密处理，完成后合并为PDF
         
         Args:
             manga_name: 漫画名称
@@ -644,52 +986,105 @@ class ColaCrawler(BaseCrawler):
         Returns:
             int: 成功下载的页数
         """
+        success_count, image_paths, pdf_filepath = await self.download_chapter_images(
+            manga_name, chapter_name, chapter_url, manga_id, encrypted_string, total_pages, image_filename
+        )
+        await self.finish_chapter(chapter_url, image_paths, pdf_filepath, total_pages)
+        return success_count
+
+    async def finish_chapter(self, chapter_url, image_paths, pdf_filepath, total_pages):
+        """生成PDF；所有页面都已完成时在下载清单中标记章节完成并删除图片，否则保留图片以便续传
+        
+        Args:
+            chapter_url: 章节URL
+            image_paths: 图片路径列表
+            pdf_filepath: PDF文件路径
+            total_pages: 总页数
+        
+        Returns:
+            bool: 章节是否完整
+        """
+        complete = len(self.manifest.completed_pages(chapter_url)) >= total_pages
+        built = await self.build_chapter_pdf(image_paths, pdf_filepath, keep_images=not complete)
+        if built and complete:
+            self.manifest.finish_chapter(chapter_url, pdf_filepath)
+        return built and complete
+
+    async def download_chapter_images(self, manga_name, chapter_name, chapter_url, manga_id, encrypted_string,
+                                      total_pages, image_filename="0001.jpg"):
+        """下载一个章节的所有图片，对于enc.webp格式进行解密处理
+        
+        Args:
+            manga_name: 漫画名称
+            chapter_name: 章节名称
+            chapter_url: 章节URL
+            manga_id: 漫画ID
+            encrypted_string: 加密字符串
+            total_pages: 总页数
+            image_filename: 图片文件名，默认为"0001.jpg"
+        
+        Returns:
+            tuple: (成功下载的页数, 图片路径列表, PDF文件路径)
+        """
         safe_manga_name = re.sub(r'[^\w\s.-]', '', manga_name).strip()
         safe_chapter_name = re.sub(r'[^\w\s.-]', '', chapter_name).strip()
         chapter_dir = os.path.join(self.MANGA_DIR, safe_manga_name, safe_chapter_name)
         os.makedirs(chapter_dir, exist_ok=True)
         pdf_filepath = os.path.join(chapter_dir, f"{safe_chapter_name}.pdf")
+        # 密钥在第一张加密图片下载完成后以其为样本获取，同一章节的并发页面共享该获取任务
         is_enc_webp = 'enc.webp' in image_filename.lower()
-        if is_enc_webp:
-            key_bytes = self.read_key_from_cache(chapter_url)
-            if key_bytes is None:
-                print(f"开始获取章节 {chapter_name} 的AES密钥...")
-                await self.capture_crypto_key(chapter_url)
+        self.manifest.start_chapter(chapter_url, manga_name, chapter_name, pdf_filepath, total_pages)
+        completed_pages = self.manifest.completed_pages(chapter_url)
         if '.' in image_filename:
             ext = image_filename.split('.', 1)[1]
         else:
             ext = "jpg"
-        async with AsyncSession(proxies=self.PROXIES, headers=self.HEADERS, verify=False) as session:
-            tasks = []
-            image_paths = []
-            for page in range(1, total_pages + 1):
-                page_str = f"{page:04d}.{ext}"
-                image_url = f"https://img.colamanga.com/comic/{manga_id}/{encrypted_string}/{page_str}"
-                filepath = os.path.join(chapter_dir, page_str)
-                final_path = filepath
-                if is_enc_webp:
-                    final_path = filepath.replace('.enc.webp', '.jpg')
-                    image_paths.append(final_path)
-                else:
-                    image_paths.append(filepath)
-                if os.path.exists(final_path):
-                    print(f"第 {page}/{total_pages} 页已存在")
-                    continue
-                tasks.append(asyncio.create_task(
-                    self.download_image(session, image_url, filepath, chapter_url, chapter_url)
-                ))
-            success_count = sum(await asyncio.gather(*tasks))
-            try:
-                print(f"正在生成PDF文件: {pdf_filepath}")
-                existing_images = [p for p in image_paths if os.path.exists(p)]
-                if existing_images:
-                    with open(pdf_filepath, "wb") as f:
-                        f.write(img2pdf.convert(sorted(existing_images)))
-                    for img_path in existing_images:
-                        try:
-                            os.remove(img_path)
-                        except Exception as e:
-                            print(f"删除图片失败: {e}")
-            except Exception as e:
-                print(f"生成PDF失败: {e}")
-            return success_count
+        tasks = []
+        image_paths = []
+        for page in range(1, total_pages + 1):
+            page_str = f"{page:04d}.{ext}"
+            image_url = f"{self.image_base_url}/comic/{manga_id}/{encrypted_string}/{page_str}"
+            filepath = os.path.join(chapter_dir, page_str)
+            final_path = filepath
+            if is_enc_webp:
+                final_path = filepath.replace('.enc.webp', '.jpg')
+                image_paths.append(final_path)
+            else:
+                image_paths.append(filepath)
+            if self.page_done(final_path, completed_pages, page):
+                print(f"第 {page}/{total_pages} 页已存在")
+                continue
+            tasks.append(asyncio.create_task(
+                self.download_image(image_url, filepath, chapter_url, chapter_url, page=page)
+            ))
+        success_count = sum(await asyncio.gather(*tasks))
+        return success_count, image_paths, pdf_filepath
+
+    @timed("pdf_build")
+    async def build_chapter_pdf(self, image_paths, pdf_filepath, keep_images=False):
+        """在执行器中将已下载的图片逐页流式写入PDF并删除图片
+        
+        Args:
+            image_paths: 图片路径列表
+            pdf_filepath: PDF文件路径
+            keep_images: 是否保留图片，默认为False
+        
+        Returns:
+            bool: 是否生成了PDF
+        """
+        try:
+            print(f"正在生成PDF文件: {pdf_filepath}")
+            existing_images = [p for p in image_paths if os.path.exists(p)]
+            if not existing_images:
+                return False
+            await self.run_cpu(write_pdf, pdf_filepath, sorted(existing_images))
+            if not keep_images:
+                for img_path in existing_images:
+                    try:
+                        os.remove(img_path)
+                    except Exception as e:
+                        print(f"删除图片失败: {e}")
+            return True
+        except Exception as e:
+            print(f"生成PDF失败: {e}")
+            return False
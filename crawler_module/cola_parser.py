@@ -0,0 +1,103 @@
+import re
+from .html_parser import make_soup, text_of
+
+BASE_URL = "https://www.colamanga.com"
+CHAPTER_TITLE_PATTERNS = (re.compile(r'^\d+\s+.+'), re.compile(r'^第\d+[话章]'))
+
+
+def parse_search_page(html, parser=None, base_url=BASE_URL):
+    """解析搜索结果页，只在每个结果条目的子树内查询
+
+    Args:
+        html: HTML内容
+        parser: HTML解析后端名称，默认为None即自动选择
+        base_url: 站点根地址，默认为BASE_URL
+
+    Returns:
+        dict: 与Copy接口一致的搜索结果结构
+    """
+    soup = make_soup(html, parser)
+    result = {
+        "results": {
+            "total": text_of(soup, '#fed-count') or "0",
+            "list": []
+        }
+    }
+    for dl in soup.select('dl.fed-deta-info'):
+        manga = {}
+        title = dl.select_one('h1 a')
+        if title:
+            manga['name'] = title.text.strip()
+            manga['path_word'] = title.get('href', '').strip('/')
+            manga['url'] = f"{base_url}/{title.get('href', '')}"
+        for li in dl.select('li'):
+            label = li.select_one('.fed-text-muted')
+            if not label:
+                continue
+            label_text = label.text
+            key = label_text.strip().rstrip('：')
+            if key == '作者':
+                manga['author'] = [{"name": li.get_text().replace(label_text, '').strip()}]
+            elif key == '别名':
+                manga['alias'] = li.get_text().replace(label_text, '').strip()
+            elif key == '状态':
+                manga['status'] = li.get_text().replace(label_text, '').strip()
+            elif key == '类别':
+                manga['categories'] = [a.text.strip() for a in li.select('a')]
+        manga['popular'] = "未知"
+        result['results']['list'].append(manga)
+    return result
+
+
+def parse_manga_page(html, parser=None, base_url=BASE_URL):
+    """一次解析漫画详情页，同时提取漫画名称与章节列表
+
+    Args:
+        html: HTML内容
+        parser: HTML解析后端名称，默认为None即自动选择
+        base_url: 站点根地址，默认为BASE_URL
+
+    Returns:
+        dict: {"name": 漫画名称(未找到时为None), "chapters": 按从旧到新排列的章节信息列表}
+    """
+    soup = make_soup(html, parser)
+    return {
+        "name": text_of(soup, '.fed-part-eone h1'),
+        "chapters": parse_chapter_links(soup, base_url)
+    }
+
+
+def parse_chapter_links(soup, base_url=BASE_URL):
+    """从已解析的详情页中提取章节链接，优先只查询章节列表容器
+
+    Args:
+        soup: 已解析的详情页文档
+        base_url: 站点根地址，默认为BASE_URL
+
+    Returns:
+        list: 章节信息列表
+    """
+    chapters = []
+    chapter_container = soup.select_one('.all_data_list')
+    if chapter_container:
+        for a in chapter_container.select('a.fed-btns-info'):
+            chapter_title = a.get('title') or a.text.strip()
+            chapters.append({"name": chapter_title, "url": f"{base_url}{a.get('href')}"})
+    else:
+        all_links = soup.select('.fed-part-rows a')
+        start_index = -1
+        end_index = -1
+        for i, a in enumerate(all_links):
+            text = a.text.strip()
+            if text == "更多":
+                start_index = i
+            elif text == "展开":
+                end_index = i
+                break
+        if start_index != -1 and end_index != -1 and start_index < end_index:
+            for a in all_links[start_index + 1:end_index]:
+                title = a.text.strip()
+                if any(pattern.match(title) for pattern in CHAPTER_TITLE_PATTERNS):
+                    chapters.append({"name": title, "url": f"{base_url}{a.get('href')}"})
+    chapters.reverse()
+    return chapters
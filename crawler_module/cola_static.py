@@ -0,0 +1,298 @@
+import re
+import base64
+import binascii
+from urllib.parse import urljoin, urlsplit
+from .html_parser import make_soup
+from .aes_backend import local_backend
+
+ZERO_IV = b"0000000000000000"
+KEY_SIZES = (16, 24, 32)
+IMAGE_MAGIC = (b"RIFF", b"\xff\xd8\xff", b"\x89PNG", b"GIF8")
+STRING_PATTERN = re.compile(r'''(["'])((?:\\.|(?!\1)[^\\\n])*)\1''')
+PARSE_PATTERN = re.compile(r'''enc\.(Utf8|Latin1|Hex|Base64)\.parse\(\s*(["'])((?:\\.|(?!\2)[^\\\n])*)\2\s*\)''')
+ESCAPE_PATTERN = re.compile(r'\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|.)', re.S)
+SIMPLE_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+C_DATA_PATTERN = re.compile(r'''\bC_DATA\s*=\s*(["'])([A-Za-z0-9+/=\s]+)\1''')
+FIELD_PATTERN = re.compile(r'''(\w+)\s*:\s*(?:(["'])((?:\\.|(?!\2)[^\\\n])*)\2|(-?\d+(?:\.\d+)?))''')
+
+
+def unescape_js(literal):
+    """还原JS字符串字面量中的转义序列(混淆脚本常用\\xNN与\\uNNNN)
+
+    Args:
+        literal: 去掉引号后的字面量内容
+
+    Returns:
+        str: 还原后的字符串
+    """
+    def replace(match):
+        escape = match.group(1)
+        if escape[0] in "xu" and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        return SIMPLE_ESCAPES.get(escape, escape)
+    return ESCAPE_PATTERN.sub(replace, literal)
+
+
+def find_scripts(html, page_url, hosts=None, parser=None):
+    """从阅读页中找出外部脚本地址与内联脚本
+
+    Args:
+        html: 阅读页HTML
+        page_url: 阅读页URL，用于补全相对地址
+        hosts: 只保留主机名以这些域名结尾的外部脚本，默认为None即只保留与阅读页同主机的脚本
+        parser: HTML解析后端名称，默认为None
+
+    Returns:
+        tuple: (外部脚本URL列表, 内联脚本内容列表)
+    """
+    page_host = urlsplit(page_url).hostname or ""
+    urls = []
+    inline = []
+    for script in make_soup(html, parser).find_all("script"):
+        src = script.get("src")
+        if not src:
+            if script.string:
+                inline.append(script.string)
+            continue
+        url = urljoin(page_url, src)
+        host = urlsplit(url).hostname or ""
+        if host == page_host or any(host == h or host.endswith("." + h) for h in hosts or ()):
+            if url not in urls:
+                urls.append(url)
+    return urls, inline
+
+
+def _decode_parse_argument(encoding, value):
+    try:
+        if encoding == "Hex":
+            return binascii.unhexlify(value)
+        if encoding == "Base64":
+            return base64.b64decode(value)
+        return value.encode("latin-1" if encoding == "Latin1" else "utf-8")
+    except (ValueError, UnicodeEncodeError):
+        return None
+
+
+def key_candidates(scripts):
+    """从脚本中收集可能的AES密钥，CryptoJS.enc.*.parse的参数优先，其次是长度符合密钥长度的字符串字面量
+
+    Args:
+        scripts: 脚本内容列表
+
+    Returns:
+        list: 去重后的候选密钥字节数据，按可能性排序
+    """
+    parsed = []
+    literals = []
+    for script in scripts:
+        for match in PARSE_PATTERN.finditer(script):
+            key = _decode_parse_argument(match.group(1), unescape_js(match.group(3)))
+            if key is not None:
+                parsed.append(key)
+        for match in STRING_PATTERN.finditer(script):
+            value = unescape_js(match.group(2))
+            if len(value) in KEY_SIZES:
+                try:
+                    literals.append(value.encode("utf-8"))
+                except UnicodeEncodeError:
+                    continue
+    candidates = []
+    for key in parsed + literals:
+        if len(key) in KEY_SIZES and key not in candidates:
+            candidates.append(key)
+    return candidates
+
+
+def looks_like_image(data):
+    """根据文件头判断数据是否为常见图片格式
+
+    Args:
+        data: 字节数据
+
+    Returns:
+        bool: 是否为WebP、JPEG、PNG或GIF
+    """
+    return data.startswith(IMAGE_MAGIC)
+
+
+def find_image_key(candidates, sample, backend, iv=ZERO_IV):
+    """用加密图片样本试解密，找出正确的密钥
+
+    每个候选只解密首个分组检查图片文件头，通过后再解密最后一个分组检查PKCS7填充，不解密整个样本
+
+    Args:
+        candidates: 候选密钥列表
+        sample: 一张加密图片的字节数据
+        backend: AES解密后端
+        iv: 初始向量，默认为ZERO_IV
+
+    Returns:
+        bytes: 正确的密钥，都不正确时返回None
+    """
+    if len(sample) < 32 or len(sample) % 16:
+        return None
+    for key in candidates:
+        try:
+            head = bytes(a ^ b for a, b in zip(backend.decrypt_block(key, sample[:16]), iv))
+            if not looks_like_image(head):
+                continue
+            backend.decrypt_cbc(key, sample[-32:-16], sample[-16:])
+            return key
+        except Exception:
+            continue
+    return None
+
+
+def find_chapter_data(html):
+    """从阅读页中取出内嵌的章节数据C_DATA
+
+    Args:
+        html: 阅读页HTML
+
+    Returns:
+        str: C_DATA的Base64文本，不存在时返回None
+    """
+    match = C_DATA_PATTERN.search(html)
+    return re.sub(r'\s+', '', match.group(2)) if match else None
+
+
+def decrypt_text(text, candidates, backend, accept):
+    """解密Base64编码的AES密文(ECB或零IV的CBC)，返回第一个通过校验的明文
+
+    Args:
+        text: Base64文本
+        candidates: 候选密钥列表
+        backend: AES解密后端
+        accept: 校验明文的函数
+
+    Returns:
+        tuple: (明文, 使用的密钥)，都失败时返回(None, None)
+    """
+    try:
+        data = base64.b64decode(text, validate=True)
+    except (binascii.Error, ValueError):
+        return None, None
+    if not data or len(data) % 16:
+        return None, None
+    for key in candidates:
+        for decrypt in (backend.decrypt_ecb, lambda k, d: backend.decrypt_cbc(k, ZERO_IV, d)):
+            try:
+                plain = decrypt(key, data).decode("utf-8")
+            except Exception:
+                continue
+            if accept(plain):
+                return plain, key
+    return None, None
+
+
+def parse_js_object(script, name):
+    """读取脚本中形如 var name = {key: "value", ...} 的对象字面量的字符串与数字字段
+
+    Args:
+        script: 脚本内容
+        name: 变量名
+
+    Returns:
+        dict: 字段字典，不存在时返回空字典
+    """
+    match = re.search(r'\b' + re.escape(name) + r'\s*=\s*\{(.*?)\}', script, re.S)
+    if not match:
+        return {}
+    fields = {}
+    for field in FIELD_PATTERN.finditer(match.group(1)):
+        fields[field.group(1)] = unescape_js(field.group(3)) if field.group(2) else field.group(4)
+    return fields
+
+
+def decode_chapter_data(c_data, candidates, backend):
+    """解码C_DATA，得到阅读页脚本中的mh_info与image_info
+
+    C_DATA是Base64包裹的AES密文(可能再包一层Base64)，解密后是给mh_info、image_info赋值的脚本
+
+    Args:
+        c_data: C_DATA的Base64文本
+        candidates: 候选密钥列表
+        backend: AES解密后端
+
+    Returns:
+        dict: {"mh_info": {...}, "image_info": {...}, "key": 解开C_DATA的密钥(未加密时为None)}，解码失败时返回None
+    """
+    def accept(text):
+        return "mh_info" in text
+
+    layers = [c_data]
+    try:
+        inner = base64.b64decode(c_data, validate=True).decode("utf-8")
+        layers.insert(0, inner)
+    except (binascii.Error, ValueError):
+        pass
+    for layer in layers:
+        script, key = (layer, None) if accept(layer) else decrypt_text(layer, candidates, backend, accept)
+        if script is not None:
+            return {
+                "mh_info": parse_js_object(script, "mh_info"),
+                "image_info": parse_js_object(script, "image_info"),
+                "key": key
+            }
+    return None
+
+
+def resolve_image_info(chapter_data, candidates, backend):
+    """由mh_info与image_info得到与浏览器解析相同的章节图片信息
+
+    enc_code1解密后为总页数，enc_code2解密后为图片目录路径，最后两段即漫画ID与加密字符串
+
+    Args:
+        chapter_data: decode_chapter_data的结果
+        candidates: 候选密钥列表
+        backend: AES解密后端
+
+    Returns:
+        tuple: (manga_id, encrypted_string, total_pages, image_filename)，信息不完整时返回None
+    """
+    mh_info = chapter_data["mh_info"]
+    if "enc_code1" not in mh_info or "enc_code2" not in mh_info:
+        return None
+    total_pages, _ = decrypt_text(mh_info["enc_code1"], candidates, backend, lambda text: text.strip().isdigit())
+    image_path, _ = decrypt_text(
+        mh_info["enc_code2"], candidates, backend,
+        lambda text: text.isprintable() and len([s for s in text.split("/") if s]) >= 2
+    )
+    if total_pages is None or image_path is None or int(total_pages) == 0:
+        return None
+    segments = [segment for segment in image_path.split("/") if segment]
+    start = int(mh_info.get("startimg") or 1)
+    ext = (chapter_data["image_info"].get("img_type") or "jpg").lstrip(".")
+    return segments[-2], segments[-1], int(total_pages), f"{start:04d}.{ext}"
+
+
+def search_image_key(backend_name, candidates, sample):
+    """find_image_key的执行器入口，后端按名称在执行器中取用，可提交到进程池
+
+    Args:
+        backend_name: AES后端名称
+        candidates: 候选密钥列表
+        sample: 一张加密图片的字节数据
+
+    Returns:
+        bytes: 正确的密钥，都不正确时返回None
+    """
+    return find_image_key(candidates, sample, local_backend(backend_name))
+
+
+def decode_image_info(backend_name, c_data, candidates):
+    """decode_chapter_data与resolve_image_info的执行器入口，可提交到进程池
+
+    Args:
+        backend_name: AES后端名称
+        c_data: C_DATA的Base64文本
+        candidates: 候选密钥列表
+
+    Returns:
+        tuple: (解开C_DATA的密钥(未加密时为None), 章节图片信息(不完整时为None))，C_DATA无法解码时返回None
+    """
+    backend = local_backend(backend_name)
+    chapter_data = decode_chapter_data(c_data, candidates, backend)
+    if chapter_data is None:
+        return None
+    return chapter_data["key"], resolve_image_info(chapter_data, candidates, backend)
@@ -1,67 +1,136 @@
 import os
 import re
 import json
+import time
 import asyncio
-from curl_cffi.requests import AsyncSession
-from PIL import Image
-import img2pdf
 from .base_crawler import BaseCrawler
+from .pipeline import ChapterPipeline, ChapterOutcome, StageError, StageSkipped
+from .pdf_writer import write_pdf
+from .domain_health import DomainHealth
+from .retry import CircuitOpenError, NonRetryableError
+from .metrics import timed
 
 
 class CopyCrawler(BaseCrawler):
-    def __init__(self, proxies=None, headers=None, max_concurrency=10, domains=None):
+    MISSING_STATUS = {400, 404, 410}
+    CHAPTER_PAGE_LIMIT = 500
+    API_HOST_LIMIT = {"initial": 4, "max_limit": 8, "rate": 5, "burst": 10}
+
+    def __init__(self, proxies=None, headers=None, max_concurrency=10, domains=None, stage_limits=None,
+                 host_limits=None, scheme="https", metrics=None, byte_budget=None,
+                 cpu_executor="thread", cpu_workers=None, cpu_queue=None, retry_policy=None,
+                 cache_ttls=None):
         self.domains = domains or [
             "www.copy20.com",
             "www.mangacopy.com"
         ]
-        self.current_domain_index = 0
-        self.domain_fail_count = 0
+        self.domain_health = {domain: DomainHealth() for domain in self.domains}
+        self.scheme = scheme
         headers = headers or {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36 Edg/135.0.0.0",
             "Accept": "*/*",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Referer": f"https://{self.get_current_domain()}/",
+            "Referer": f"{scheme}://{self.domains[0]}/",
             "Connection": "keep-alive"
         }
-        super().__init__(proxies, headers, max_concurrency)
+        host_limits = {**{domain: self.API_HOST_LIMIT for domain in self.domains}, **(host_limits or {})}
+        super().__init__(proxies, headers, max_concurrency, stage_limits, host_limits=host_limits, metrics=metrics,
+                         byte_budget=byte_budget, cpu_executor=cpu_executor, cpu_workers=cpu_workers,
+                         cpu_queue=cpu_queue, retry_policy=retry_policy, cache_ttls=cache_ttls)
+
+    def rank_domains(self):
+        return sorted(self.domains, key=lambda domain: (
+            self.retry_policy.breaker(domain).is_open(),
+            self.domain_health[domain].score()
+        ))
 
     def get_current_domain(self):
-        return self.domains[self.current_domain_index]
+        return self.rank_domains()[0]
 
-    def switch_to_next_domain(self):
-        self.current_domain_index = (self.current_domain_index + 1) % len(self.domains)
-        self.domain_fail_count = 0
-        self.HEADERS["Referer"] = f"https://{self.get_current_domain()}/"
-        return self.get_current_domain()
+    async def _timed_get(self, domain, path, timeout):
+        headers = self.HEADERS.copy()
+        headers["Referer"] = f"{self.scheme}://{domain}/"
+        health = self.domain_health[domain]
+        start = time.monotonic()
+        response = None
+        try:
+            response = await self.fetch(f"{self.scheme}://{domain}{path}", max_attempts=1, headers=headers, timeout=timeout)
+            if response.status_code == 200:
+                data = json.loads(response.text)
+                health.record_success(time.monotonic() - start)
+                return data, response
+            if response.status_code in self.MISSING_STATUS:
+                health.record_success(time.monotonic() - start)
+                raise NonRetryableError(response.status_code)
+        except (asyncio.CancelledError, NonRetryableError) as e:
+            if isinstance(e, asyncio.CancelledError):
+                health.record_cancelled(time.monotonic() - start)
+            raise
+        except Exception as e:
+            pass
+        health.record_failure()
+        return None, response
+
+    async def _hedged_get(self, path, timeout):
+        domains = self.rank_domains()
+        pending = {asyncio.ensure_future(self._timed_get(domains[0], path, timeout))}
+        next_index = 1
+        # 失败的响应中优先保留带Retry-After的，供_api_get决定退避时间
+        failed_response = None
+        try:
+            while pending:
+                hedge_delay = self.domain_health[domains[next_index - 1]].p95() if next_index < len(domains) else None
+                done, pending = await asyncio.wait(pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                failed = False
+                for task in done:
+                    data, response = task.result()
+                    if data is not None:
+                        return data, response
+                    if response is not None and (failed_response is None or "Retry-After" in response.headers):
+                        failed_response = response
+                    failed = True
+                if (failed or not done) and next_index < len(domains):
+                    self.metrics.inc("domain_switches", reason="error" if failed else "hedge")
+                    pending.add(asyncio.ensure_future(self._timed_get(domains[next_index], path, timeout)))
+                    next_index += 1
+            return None, failed_response
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _api_get(self, path, timeout=3):
+        attempts = self.retry_policy.max_attempts
+        for attempt in range(attempts):
+            try:
+                data, response = await self._hedged_get(path, timeout)
+            except NonRetryableError:
+                return None
+            if data is not None:
+                return data
+            if attempt < attempts - 1:
+                await asyncio.sleep(self.retry_policy.backoff(attempt, response))
+        return None
 
     async def search_manga(self, keyword, page=1):
-        self.clear_cache("search")
+        data = await self.search_results(keyword, page)
+        if isinstance(data, str):
+            return data
+        self.save_to_cache("search", data)
+        return self._format_search(data)
+
+    async def search_results(self, keyword, page=1):
+        cache_key = f"{keyword}:{page}"
+        cached = self.load_from_cache("search", cache_key)
+        if cached:
+            return cached
         limit = 12
-        total_attempts = 0
-        max_attempts = 2 * len(self.domains)
-        while total_attempts < max_attempts:
-            try:
-                async with AsyncSession(proxies=self.PROXIES, headers=self.HEADERS, verify=False) as session:
-                    domain = self.get_current_domain()
-                    url = f"https://{domain}/api/kb/web/searchbd/comics?offset={(page - 1) * limit}&platform=2&limit={limit}&q={keyword}"
-                    response = await session.get(url, timeout=3)
-                    if response.status_code == 200:
-                        data = json.loads(response.text)
-                        self.save_to_cache("search", data)
-                        self.domain_fail_count = 0
-                        return self._format_search(data)
-                    self.domain_fail_count += 1
-                    total_attempts += 1
-                    if self.domain_fail_count >= 2:
-                        self.switch_to_next_domain()
-                    await asyncio.sleep(1)
-            except Exception as e:
-                self.domain_fail_count += 1
-                total_attempts += 1
-                if self.domain_fail_count >= 2:
-                    self.switch_to_next_domain()
-                await asyncio.sleep(1)
-        return "搜索失败: 所有域名尝试均失败"
+        data = await self._api_get(
+            f"/api/kb/web/searchbd/comics?offset={(page - 1) * limit}&platform=2&limit={limit}&q={keyword}"
+        )
+        if data is None:
+            return "搜索失败: 所有域名尝试均失败"
+        self.save_to_cache("search", data, cache_key)
+        return data
 
     def _format_search(self, data):
         if not data.get("results", {}).get("list"):
@@ -79,35 +148,13 @@ class CopyCrawler(BaseCrawler):
         return "\n".join(output)
 
     async def get_manga_chapters(self, identifier):
-        self.clear_cache("chapters")
         manga_info = await self._get_manga_metadata(identifier)
         if "error" in manga_info:
             return manga_info["error"]
-        total_attempts = 0
-        max_attempts = 2 * len(self.domains)
-        while total_attempts < max_attempts:
-            try:
-                async with AsyncSession(proxies=self.PROXIES, headers=self.HEADERS, verify=False) as session:
-                    domain = self.get_current_domain()
-                    url = f"https://{domain}/api/v3/comic/{manga_info['path_word']}/group/default/chapters?limit=500"
-                    response = await session.get(url, timeout=3)
-                    if response.status_code == 200:
-                        data = json.loads(response.text)
-                        self.save_to_cache("chapters", data)
-                        self.domain_fail_count = 0
-                        return self._format_chapters(data["results"]["list"], manga_info["name"])
-                    self.domain_fail_count += 1
-                    total_attempts += 1
-                    if self.domain_fail_count >= 2:
-                        self.switch_to_next_domain()
-                    await asyncio.sleep(1)
-            except Exception as e:
-                self.domain_fail_count += 1
-                total_attempts += 1
-                if self.domain_fail_count >= 2:
-                    self.switch_to_next_domain()
-                await asyncio.sleep(1)
-        return "获取章节失败: 所有域名尝试均失败"
+        chapters = await self._fetch_chapters(manga_info["path_word"])
+        if isinstance(chapters, str):
+            return chapters
+        return self._format_chapters(chapters, manga_info["name"])
 
     async def _get_manga_metadata(self, identifier):
         if identifier.isdigit():
@@ -136,56 +183,80 @@ class CopyCrawler(BaseCrawler):
             output.append(f"{idx + 1}. {ch['name']}")
         return "\n".join(output)
 
-    async def download_manga(self, chapter_spec, identifier):
+    async def download_report(self, chapter_spec, identifier):
         manga_info = await self._get_manga_metadata(identifier)
         if "error" in manga_info:
-            return manga_info["error"]
+            return self.make_report("", error=manga_info["error"])
         chapters = await self._fetch_chapters(manga_info["path_word"])
         if isinstance(chapters, str):
-            return chapters
+            return self.make_report(manga_info["name"], error=chapters)
         selected = self._parse_chapter_spec(chapter_spec, chapters)
         if "error" in selected:
-            return selected["error"]
-        results = []
-        for ch in selected["chapters"]:
-            result = await self._download_chapter(
-                manga_info["name"],
-                ch["name"],
-                manga_info["path_word"],
-                ch["uuid"]
-            )
-            results.append(f"{ch['name']}: {result}")
-        return f"\n{manga_info['name']} 下载结果:\n" + "\n".join(results)
+            return self.make_report(manga_info["name"], error=selected["error"])
+        path_word = manga_info["path_word"]
+
+        async def resolve(ch):
+            return await self._resolve_chapter(path_word, ch["uuid"])
+
+        async def fetch(ch, image_urls):
+            return await self._fetch_chapter(manga_info["name"], ch["name"], path_word, ch["uuid"], image_urls)
+
+        async def assemble(ch, image_urls, fetched):
+            return await self._assemble_chapter(ch["uuid"], *fetched)
+
+        pipeline = ChapterPipeline(resolve, fetch, assemble, self.stage_limits)
+        outcomes = await pipeline.run(selected["chapters"])
+        return self.make_report(manga_info["name"], selected["chapters"], outcomes)
 
     async def _fetch_chapters(self, path_word):
-        cached = self.load_from_cache("chapters")
+        cached = self.load_from_cache("chapters", path_word)
         if cached:
             return cached["results"]["list"]
-        total_attempts = 0
-        max_attempts = 2 * len(self.domains)
-        while total_attempts < max_attempts:
-            try:
-                async with AsyncSession(proxies=self.PROXIES, headers=self.HEADERS, verify=False) as session:
-                    domain = self.get_current_domain()
-                    url = f"https://{domain}/api/v3/comic/{path_word}/group/default/chapters?limit=500"
-                    response = await session.get(url, timeout=3)
-                    if response.status_code == 200:
-                        data = json.loads(response.text)
-                        self.save_to_cache("chapters", data)
-                        self.domain_fail_count = 0
-                        return data["results"]["list"]
-                    self.domain_fail_count += 1
-                    total_attempts += 1
-                    if self.domain_fail_count >= 2:
-                        self.switch_to_next_domain()
-                    await asyncio.sleep(1)
-            except Exception as e:
-                self.domain_fail_count += 1
-                total_attempts += 1
-                if self.domain_fail_count >= 2:
-                    self.switch_to_next_domain()
-                await asyncio.sleep(1)
-        return "获取章节失败: 所有域名尝试均失败"
+        groups = await self._fetch_groups(path_word)
+        if groups is None:
+            return "获取章节失败: 漫画详情获取失败，无法确定章节分组"
+        pages = await asyncio.gather(*[self._fetch_group_chapters(path_word, group) for group in groups])
+        chapters = []
+        for group, group_chapters in zip(groups, pages):
+            if group_chapters is None:
+                return f"获取章节失败: 分组 {group['name']} 获取失败"
+            chapters.extend(group_chapters)
+        data = {"results": {"list": chapters, "total": len(chapters)}}
+        self.save_to_cache("chapters", data, path_word)
+        return chapters
+
+    async def _fetch_groups(self, path_word):
+        data = await self._api_get(f"/api/v3/comic2/{path_word}?platform=1")
+        if data is None:
+            return None
+        groups = data.get("results", {}).get("groups") or {}
+        result = [
+            {"path_word": g.get("path_word", key), "name": g.get("name", key), "count": g.get("count")}
+            for key, g in groups.items()
+        ]
+        result.sort(key=lambda g: g["path_word"] != "default")
+        return result or [{"path_word": "default", "name": "默认", "count": None}]
+
+    async def _fetch_group_chapters(self, path_word, group):
+        limit = self.CHAPTER_PAGE_LIMIT
+        base = f"/api/v3/comic/{path_word}/group/{group['path_word']}/chapters?limit={limit}&offset="
+        known = group["count"] or limit
+        offsets = list(range(0, known, limit))
+        pages = await asyncio.gather(*[self._api_get(f"{base}{offset}") for offset in offsets])
+        if any(page is None for page in pages):
+            return None
+        total = pages[0]["results"].get("total", 0)
+        extra = list(range(offsets[-1] + limit, total, limit))
+        if extra:
+            more = await asyncio.gather(*[self._api_get(f"{base}{offset}") for offset in extra])
+            if any(page is None for page in more):
+                return None
+            pages.extend(more)
+        chapters = [ch for page in pages for ch in page["results"]["list"]]
+        if group["path_word"] != "default":
+            for ch in chapters:
+                ch["name"] = f"[{group['name']}] {ch['name']}"
+        return chapters
 
     def _parse_chapter_spec(self, spec, chapters):
         if spec.lower() == "all":
@@ -206,17 +277,40 @@ class CopyCrawler(BaseCrawler):
         except ValueError:
             return {"error": "格式错误 应为数字"}
 
-    async def _download_chapter(self, manga_name, chapter_name, path_word, uuid):
-        dir_path = self._create_chapter_dir(manga_name, chapter_name)
-        pdf_path = os.path.join(dir_path, f"{chapter_name}.pdf")
+    async def _resolve_chapter(self, path_word, uuid):
+        if self.manifest.is_chapter_complete(uuid):
+            raise StageSkipped("已下载，跳过")
         image_urls = await self._get_image_urls(path_word, uuid)
         if isinstance(image_urls, str):
-            return image_urls
+            raise StageError(image_urls)
+        return image_urls
+
+    async def _fetch_chapter(self, manga_name, chapter_name, path_word, uuid, image_urls):
+        dir_path = self._create_chapter_dir(manga_name, chapter_name)
+        pdf_path = os.path.join(dir_path, f"{chapter_name}.pdf")
+        self.manifest.start_chapter(uuid, manga_name, chapter_name, pdf_path, len(image_urls))
         success = await self._download_images(image_urls, dir_path, path_word, uuid)
-        if success == 0:
-            return "无成功下载"
-        self._generate_pdf(dir_path, pdf_path)
-        return f"成功 {success}/{len(image_urls)}"
+        total = len(image_urls)
+        if self.pop_stale(uuid):
+            fresh_urls = await self._get_image_urls(path_word, uuid, refresh=True)
+            if isinstance(fresh_urls, list) and fresh_urls and fresh_urls != image_urls:
+                print(f"{chapter_name}: 图片地址已失效，使用重新获取的地址重试")
+                self.metrics.inc("descriptor_revalidations")
+                # 重新获取的页数可能与旧地址不同，之后按新页数判断是否完整
+                total = len(fresh_urls)
+                self.manifest.start_chapter(uuid, manga_name, chapter_name, pdf_path, total)
+                success += await self._download_images(fresh_urls, dir_path, path_word, uuid)
+        if success == 0 and not self.manifest.completed_pages(uuid):
+            raise StageError("无成功下载")
+        return dir_path, pdf_path, success, total
+
+    async def _assemble_chapter(self, uuid, dir_path, pdf_path, success, total):
+        completed_pages = self.manifest.completed_pages(uuid)
+        complete = all(page in completed_pages for page in range(1, total + 1))
+        built = await self._generate_pdf(dir_path, pdf_path, keep_images=not complete)
+        if built and complete:
+            self.manifest.finish_chapter(uuid, pdf_path)
+        return ChapterOutcome("done" if built and complete else "partial", f"成功 {success}/{total}")
 
     def _create_chapter_dir(self, manga_name, chapter_name):
         safe_manga = re.sub(r'[^\w\s.-]', '', manga_name).strip()
@@ -225,97 +319,62 @@ class CopyCrawler(BaseCrawler):
         os.makedirs(dir_path, exist_ok=True)
         return dir_path
 
-    async def _get_image_urls(self, path_word, uuid):
-        total_attempts = 0
-        max_attempts = 2 * len(self.domains)
-        while total_attempts < max_attempts:
-            try:
-                async with AsyncSession(proxies=self.PROXIES, headers=self.HEADERS, verify=False) as session:
-                    domain = self.get_current_domain()
-                    url = f"https://{domain}/api/v3/comic/{path_word}/chapter/{uuid}?platform=1"
-                    response = await session.get(url, timeout=3)
-                    if response.status_code == 200:
-                        data = json.loads(response.text)
-                        self.domain_fail_count = 0
-                        return [c["url"] for c in data.get("results", {}).get("chapter", {}).get("contents", [])]
-                    self.domain_fail_count += 1
-                    total_attempts += 1
-                    if self.domain_fail_count >= 2:
-                        self.switch_to_next_domain()
-                    await asyncio.sleep(1)
-            except Exception as e:
-                self.domain_fail_count += 1
-                total_attempts += 1
-                if self.domain_fail_count >= 2:
-                    self.switch_to_next_domain()
-                await asyncio.sleep(1)
-        return "获取图片URL失败: 所有域名尝试均失败"
+    async def _get_image_urls(self, path_word, uuid, refresh=False):
+        if not refresh:
+            image_urls = self.manifest.get_descriptor(uuid)
+            if image_urls:
+                self.metrics.inc("descriptor_hits")
+                return image_urls
+        data = await self._api_get(f"/api/v3/comic/{path_word}/chapter/{uuid}?platform=1")
+        if data is None:
+            return "获取图片URL失败: 所有域名尝试均失败"
+        image_urls = [c["url"] for c in data.get("results", {}).get("chapter", {}).get("contents", [])]
+        if image_urls:
+            self.manifest.save_descriptor(uuid, image_urls)
+        return image_urls
 
     async def _download_images(self, urls, dir_path, path_word, uuid):
         tasks = []
+        completed_pages = self.manifest.completed_pages(uuid)
         for idx, url in enumerate(urls):
             filepath = os.path.join(dir_path, f"{idx + 1:04d}.jpg")
-            if os.path.exists(filepath):
+            if self.page_done(filepath, completed_pages, idx + 1):
                 continue
-            tasks.append(self._download_image(url, filepath, path_word, uuid))
+            tasks.append(self._download_image(url, filepath, path_word, uuid, page=idx + 1))
         results = await asyncio.gather(*tasks)
         return sum(results)
 
-    async def _download_image(self, url, filepath, path_word, uuid, max_retries=3):
-        domain = self.get_current_domain()
-        referer = f"https://{domain}/comic/{path_word}/chapter/{uuid}"
+    async def _download_image(self, url, filepath, path_word, uuid, page=None):
         headers = self.HEADERS.copy()
-        headers["Referer"] = referer
-        attempts = 0
-        domain_fails = 0
-        while attempts < max_retries * len(self.domains):
+        for index, domain in enumerate(self.rank_domains()):
+            if index:
+                self.metrics.inc("domain_switches", reason="referer")
+            headers["Referer"] = f"{self.scheme}://{domain}/comic/{path_word}/chapter/{uuid}"
             try:
-                async with self.semaphore:
-                    response = await AsyncSession().get(url, headers=headers)
-                    if response.status_code == 200:
-                        self._save_image(response.content, filepath)
-                        return True
-                    domain_fails += 1
-                    attempts += 1
-                    if domain_fails >= 2:
-                        domain = self.switch_to_next_domain()
-                        referer = f"https://{domain}/comic/{path_word}/chapter/{uuid}"
-                        headers["Referer"] = referer
-                        domain_fails = 0
-                    await asyncio.sleep(1)
+                status_code = await self.download_page(url, filepath, uuid, page, headers=headers)
+                if status_code == 200:
+                    return True
+                self.mark_stale(uuid, status_code)
+            except CircuitOpenError:
+                return False
             except Exception as e:
-                domain_fails += 1
-                attempts += 1
-                if domain_fails >= 2:
-                    domain = self.switch_to_next_domain()
-                    referer = f"https://{domain}/comic/{path_word}/chapter/{uuid}"
-                    headers["Referer"] = referer
-                    domain_fails = 0
-                await asyncio.sleep(1)
+                pass
         return False
 
-    def _save_image(self, content, path):
-        temp_path = path + ".tmp"
-        with open(temp_path, "wb") as f:
-            f.write(content)
-        try:
-            img = Image.open(temp_path).convert("RGB")
-            img.save(path, "JPEG", quality=85)
-        finally:
-            os.remove(temp_path)
-
-    def _generate_pdf(self, dir_path, pdf_path):
+    @timed("pdf_build")
+    async def _generate_pdf(self, dir_path, pdf_path, keep_images=False):
         images = sorted([
             os.path.join(dir_path, f)
             for f in os.listdir(dir_path)
             if f.endswith(".jpg")
         ])
         if not images:
-            return
-        with open(pdf_path, "wb") as f:
-            f.write(img2pdf.convert(images))
-        for img in images:
-            try:
-                os.remove(img)
-            except Exception as e:
-                pass
+            return False
+        await self.run_cpu(write_pdf, pdf_path, images)
+        if not keep_images:
+            for img in images:
+                try:
+                    os.remove(img)
+                except Exception as e:
+                    pass
+        return True
@@ -0,0 +1,99 @@
+import time
+from collections import deque
+
+
+class DomainHealth:
+    """单个镜像域名的健康度，基于EWMA延迟与错误率打分，分数越低越优先"""
+
+    def __init__(self, alpha=0.3, default_latency=0.5, error_half_life=60.0, window=50):
+        """初始化域名健康度
+
+        Args:
+            alpha: EWMA平滑系数，默认为0.3
+            default_latency: 未测量过的域名假定的延迟(秒)，默认为0.5
+            error_half_life: 错误率随时间衰减的半衰期(秒)，让故障镜像恢复后能重新被选中，默认为60
+            window: 计算p95延迟使用的最近样本数，默认为50
+
+        Returns:
+            None
+        """
+        self.alpha = alpha
+        self.default_latency = default_latency
+        self.error_half_life = error_half_life
+        self.latency = None
+        self.error_rate = 0.0
+        self.last_error = 0.0
+        self.samples = deque(maxlen=window)
+
+    def _decayed_error_rate(self):
+        if not self.error_rate:
+            return 0.0
+        elapsed = time.monotonic() - self.last_error
+        return self.error_rate * 0.5 ** (elapsed / self.error_half_life)
+
+    def record_success(self, latency):
+        """记录一次成功请求
+
+        Args:
+            latency: 请求耗时(秒)
+
+        Returns:
+            None
+        """
+        self.samples.append(latency)
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = self.alpha * latency + (1 - self.alpha) * self.latency
+        self.error_rate = (1 - self.alpha) * self._decayed_error_rate()
+        self.last_error = time.monotonic()
+
+    def record_cancelled(self, elapsed):
+        """记录一次被对冲请求抢先而取消的请求，耗时作为延迟下限计入EWMA
+
+        Args:
+            elapsed: 取消前已经等待的时间(秒)
+
+        Returns:
+            None
+        """
+        if self.latency is None or elapsed > self.latency:
+            self.latency = elapsed if self.latency is None else self.alpha * elapsed + (1 - self.alpha) * self.latency
+
+    def record_failure(self):
+        """记录一次失败请求
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.error_rate = self.alpha + (1 - self.alpha) * self._decayed_error_rate()
+        self.last_error = time.monotonic()
+
+    def p95(self):
+        """最近样本的p95延迟
+
+        Args:
+            None
+
+        Returns:
+            float: p95延迟(秒)，没有样本时返回默认延迟
+        """
+        if not self.samples:
+            return self.default_latency
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def score(self):
+        """综合延迟与错误率的分数
+
+        Args:
+            None
+
+        Returns:
+            float: 分数，越低越好
+        """
+        latency = self.default_latency if self.latency is None else self.latency
+        return latency * (1 + 10 * self._decayed_error_rate())
@@ -0,0 +1,65 @@
+import importlib.util
+
+# 按速度优先级排列：parser名称 -> 依赖的模块(None表示标准库自带)
+PARSERS = {
+    "lxml": "lxml",
+    "html.parser": None,
+}
+
+
+def available_parsers():
+    """按优先级列出当前可用的HTML解析后端
+
+    Args:
+        None
+
+    Returns:
+        list: 解析后端名称列表
+    """
+    return [name for name, module in PARSERS.items() if module is None or importlib.util.find_spec(module)]
+
+
+def get_html_parser(name=None):
+    """获取HTML解析后端名称，未指定时选择最快的可用后端
+
+    Args:
+        name: 解析后端名称，默认为None
+
+    Returns:
+        str: 可传给BeautifulSoup的解析后端名称
+    """
+    if name is None:
+        return available_parsers()[0]
+    if name not in PARSERS:
+        raise ValueError(f"未知的HTML解析后端: {name}")
+    if name not in available_parsers():
+        raise ValueError(f"HTML解析后端 {name} 不可用，请先安装依赖")
+    return name
+
+
+def make_soup(html, parser=None):
+    """解析HTML文档，首次调用时才导入bs4
+
+    Args:
+        html: HTML内容
+        parser: 解析后端名称，默认为None即自动选择
+
+    Returns:
+        BeautifulSoup: 解析后的文档
+    """
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, get_html_parser(parser))
+
+
+def text_of(node, selector):
+    """读取节点内第一个匹配元素的文本
+
+    Args:
+        node: 文档或元素节点
+        selector: CSS选择器
+
+    Returns:
+        str: 去除首尾空白的文本，没有匹配时返回None
+    """
+    elem = node.select_one(selector)
+    return elem.get_text().strip() if elem else None
@@ -0,0 +1,140 @@
+from collections import namedtuple
+from io import BytesIO
+
+JpegInfo = namedtuple("JpegInfo", ["width", "height", "components", "precision", "marker", "dpi"], defaults=(None,))
+
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+EMBEDDABLE_SOF_MARKERS = {0xC0, 0xC1, 0xC2}
+STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7}
+
+
+def read_jpeg_info(source):
+    """只读取JPEG文件头中的JFIF与SOF段，获取尺寸、颜色通道数与分辨率，不解码图片
+
+    Args:
+        source: JPEG字节数据或已打开的二进制文件对象
+
+    Returns:
+        JpegInfo: 图片信息，dpi为JFIF中记录的(水平, 垂直)分辨率，没有记录时为None；不是有效JPEG时返回None
+    """
+    f = BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    if f.read(2) != b"\xff\xd8":
+        return None
+    dpi = None
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        if marker in STANDALONE_MARKERS or marker == 0x00:
+            continue
+        if marker in (0xD9, 0xDA):
+            return None
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = int.from_bytes(length_bytes, "big")
+        if marker in SOF_MARKERS:
+            header = f.read(6)
+            if len(header) < 6:
+                return None
+            return JpegInfo(
+                width=int.from_bytes(header[3:5], "big"),
+                height=int.from_bytes(header[1:3], "big"),
+                components=header[5],
+                precision=header[0],
+                marker=marker,
+                dpi=dpi
+            )
+        if marker == 0xE0 and dpi is None:
+            segment = f.read(length - 2)
+            dpi = _jfif_dpi(segment)
+            continue
+        f.seek(length - 2, 1)
+
+
+def _jfif_dpi(segment):
+    # APP0: "JFIF\0", 版本(2字节), 单位(0无单位/1每英寸/2每厘米), 水平密度, 垂直密度
+    if len(segment) < 12 or not segment.startswith(b"JFIF\0"):
+        return None
+    unit = segment[7]
+    x_density = int.from_bytes(segment[8:10], "big")
+    y_density = int.from_bytes(segment[10:12], "big")
+    if unit not in (1, 2) or not x_density or not y_density:
+        return None
+    scale = 2.54 if unit == 2 else 1
+    return x_density * scale, y_density * scale
+
+
+def is_embeddable_jpeg(data):
+    """判断图片是否为可直接嵌入PDF的完整JPEG(8位、灰度或RGB、霍夫曼编码)
+
+    Args:
+        data: 图片字节数据
+
+    Returns:
+        bool: 是否可以原样保存
+    """
+    if not _embeddable(read_jpeg_info(data)):
+        return False
+    return b"\xff\xd9" in data[-32:]
+
+
+def is_embeddable_jpeg_file(path):
+    """判断图片文件是否可直接嵌入PDF，只读取文件头与末尾，不把整个文件读入内存
+
+    Args:
+        path: 图片文件路径
+
+    Returns:
+        bool: 是否可以原样保存
+    """
+    with open(path, "rb") as f:
+        if not _embeddable(read_jpeg_info(f)):
+            return False
+        f.seek(0, 2)
+        f.seek(max(0, f.tell() - 32))
+        return b"\xff\xd9" in f.read()
+
+
+def _embeddable(info):
+    if info is None:
+        return False
+    return info.marker in EMBEDDABLE_SOF_MARKERS and info.precision == 8 and info.components in (1, 3)
+
+
+def encode_jpeg(data, quality=85):
+    """解码图片并重新编码为RGB JPEG，首次调用时才导入PIL
+
+    Args:
+        data: 原始图片字节数据
+        quality: JPEG质量，默认为85
+
+    Returns:
+        bytes: JPEG字节数据
+    """
+    from PIL import Image
+    output = BytesIO()
+    Image.open(BytesIO(data)).convert("RGB").save(output, "JPEG", quality=quality)
+    return output.getvalue()
+
+
+def normalize_image(data):
+    """可直接嵌入PDF的JPEG原样返回，WebP、PNG、CMYK等其他格式转码为JPEG
+
+    Args:
+        data: 原始图片字节数据
+
+    Returns:
+        bytes: 可嵌入PDF的JPEG字节数据
+    """
+    if is_embeddable_jpeg(data):
+        return data
+    return encode_jpeg(data)
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+
+def content_hash(data):
+    """计算页面内容哈希
+
+    Args:
+        data: 字节数据
+
+    Returns:
+        str: sha256十六进制字符串
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+class DownloadManifest:
+    """基于SQLite的章节下载清单，记录PDF路径、页数、逐页状态与内容哈希，以及解析出的章节图片描述"""
+
+    def __init__(self, db_path):
+        """打开或创建清单数据库
+
+        Args:
+            db_path: 数据库文件路径
+
+        Returns:
+            None
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chapters (
+                chapter_key TEXT PRIMARY KEY,
+                manga_name TEXT,
+                chapter_name TEXT,
+                pdf_path TEXT,
+                page_count INTEGER,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                chapter_key TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                content_hash TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (chapter_key, page)
+            );
+            CREATE TABLE IF NOT EXISTS descriptors (
+                chapter_key TEXT PRIMARY KEY,
+                descriptor TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    def get_chapter(self, chapter_key):
+        """读取章节记录
+
+        Args:
+            chapter_key: 章节标识(章节URL或UUID)
+
+        Returns:
+            dict: 章节记录，不存在则返回None
+        """
+        row = self.conn.execute(
+            "SELECT manga_name, chapter_name, pdf_path, page_count, status FROM chapters WHERE chapter_key = ?",
+            (chapter_key,)
+        ).fetchone()
+        if not row:
+            return None
+        keys = ("manga_name", "chapter_name", "pdf_path", "page_count", "status")
+        return dict(zip(keys, row))
+
+    def is_chapter_complete(self, chapter_key):
+        """判断章节是否已完成且PDF仍在磁盘上
+
+        Args:
+            chapter_key: 章节标识
+
+        Returns:
+            bool: 是否可以跳过
+        """
+        chapter = self.get_chapter(chapter_key)
+        return bool(chapter and chapter["status"] == "done" and chapter["pdf_path"]
+                    and os.path.exists(chapter["pdf_path"]))
+
+    def start_chapter(self, chapter_key, manga_name, chapter_name, pdf_path, page_count):
+        """登记开始下载的章节，已有的逐页记录保留用于续传
+
+        Args:
+            chapter_key: 章节标识
+            manga_name: 漫画名称
+            chapter_name: 章节名称
+            pdf_path: PDF文件路径
+            page_count: 总页数
+
+        Returns:
+            None
+        """
+        self.conn.execute(
+            "INSERT INTO chapters (chapter_key, manga_name, chapter_name, pdf_path, page_count, status, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, 'partial', ?) "
+            "ON CONFLICT(chapter_key) DO UPDATE SET manga_name = excluded.manga_name, "
+            "chapter_name = excluded.chapter_name, pdf_path = excluded.pdf_path, "
+            "page_count = excluded.page_count, status = 'partial', updated_at = excluded.updated_at",
+            (chapter_key, manga_name, chapter_name, pdf_path, page_count, time.time())
+        )
+        self.conn.commit()
+
+    def mark_page(self, chapter_key, page, page_hash):
+        """记录已保存的页面
+
+        Args:
+            chapter_key: 章节标识
+            page: 页码(从1开始)
+            page_hash: 页面内容哈希
+
+        Returns:
+            None
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (chapter_key, page, status, content_hash, updated_at) "
+            "VALUES (?, ?, 'done', ?, ?)",
+            (chapter_key, page, page_hash, time.time())
+        )
+        self.conn.commit()
+
+    def completed_pages(self, chapter_key):
+        """读取章节已完成的页面
+
+        Args:
+            chapter_key: 章节标识
+
+        Returns:
+            dict: {页码: 内容哈希}
+        """
+        rows = self.conn.execute(
+            "SELECT page, content_hash FROM pages WHERE chapter_key = ? AND status = 'done'",
+            (chapter_key,)
+        ).fetchall()
+        return dict(rows)
+
+    def finish_chapter(self, chapter_key, pdf_path):
+        """标记章节已完成
+
+        Args:
+            chapter_key: 章节标识
+            pdf_path: 生成的PDF文件路径
+
+        Returns:
+            None
+        """
+        self.conn.execute(
+            "UPDATE chapters SET status = 'done', pdf_path = ?, updated_at = ? WHERE chapter_key = ?",
+            (pdf_path, time.time(), chapter_key)
+        )
+        self.conn.commit()
+
+    def get_descriptor(self, chapter_key):
+        """读取章节的图片描述(如图片URL列表或图片路径参数)
+
+        Args:
+            chapter_key: 章节标识
+
+        Returns:
+            图片描述(JSON可序列化的数据)，不存在则返回None
+        """
+        row = self.conn.execute(
+            "SELECT descriptor FROM descriptors WHERE chapter_key = ?", (chapter_key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_descriptor(self, chapter_key, descriptor):
+        """保存章节的图片描述，已有的记录被覆盖
+
+        Args:
+            chapter_key: 章节标识
+            descriptor: 图片描述(JSON可序列化的数据)
+
+        Returns:
+            None
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO descriptors (chapter_key, descriptor, updated_at) VALUES (?, ?, ?)",
+            (chapter_key, json.dumps(descriptor, ensure_ascii=False), time.time())
+        )
+        self.conn.commit()
+
+    def close(self):
+        """关闭数据库连接
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.conn.close()
@@ -0,0 +1,186 @@
+import os
+import re
+import json
+import time
+import hashlib
+from collections import OrderedDict
+
+LATEST_KEY = "latest"
+DEFAULT_TTLS = {
+    "search": 60 * 60,
+    "chapters": 6 * 60 * 60,
+}
+
+
+class MetadataCache:
+    """按 (类型, 标识) 存储的两级元数据缓存
+
+    内存层为LRU，磁盘层为缓存目录下的JSON文件(按最近访问时间淘汰)，
+    每种类型可以单独设置过期时间；标识为latest的条目用于按索引引用最近一次结果，不会过期
+    """
+
+    FILE_PATTERN = re.compile(r'^[a-z_]+_([0-9a-f]{16}|latest)\.json$')
+
+    def __init__(self, cache_dir, ttls=None, max_memory_entries=64, max_disk_entries=256):
+        """初始化缓存
+
+        Args:
+            cache_dir: 磁盘缓存目录
+            ttls: 各类型的过期秒数，None表示不过期，默认为None即使用DEFAULT_TTLS
+            max_memory_entries: 内存层最多保存的条目数，默认为64
+            max_disk_entries: 磁盘层最多保存的条目数，默认为256
+
+        Returns:
+            None
+        """
+        self.cache_dir = cache_dir
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, cache_type, key):
+        if key == LATEST_KEY:
+            return os.path.join(self.cache_dir, f"{cache_type}_{LATEST_KEY}.json")
+        digest = hashlib.sha1(str(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{cache_type}_{digest}.json")
+
+    def _expired(self, entry):
+        if entry["key"] == LATEST_KEY:
+            return False
+        ttl = self.ttls.get(entry["type"])
+        return ttl is not None and time.time() - entry["saved_at"] > ttl
+
+    def _remember(self, entry):
+        memory_key = (entry["type"], entry["key"])
+        self._memory[memory_key] = entry
+        self._memory.move_to_end(memory_key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, cache_type, key=LATEST_KEY):
+        """读取缓存，依次查找内存层与磁盘层
+
+        Args:
+            cache_type: 缓存类型
+            key: 缓存标识，默认为latest
+
+        Returns:
+            缓存的数据，不存在或已过期则返回None
+        """
+        key = str(key)
+        entry = self._memory.get((cache_type, key))
+        if entry is not None:
+            if self._expired(entry):
+                self.delete(cache_type, key)
+                return None
+            self._memory.move_to_end((cache_type, key))
+            return entry["data"]
+        path = self._path(cache_type, key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except Exception as e:
+            print(f"读取缓存文件 {path} 失败: {e}")
+            return None
+        if isinstance(stored, dict) and stored.keys() >= {"type", "key", "saved_at", "data"}:
+            entry = stored
+        else:
+            entry = {"type": cache_type, "key": key, "saved_at": time.time(), "data": stored}
+        if entry["key"] != key:
+            return None
+        if self._expired(entry):
+            self.delete(cache_type, key)
+            return None
+        self._remember(entry)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["data"]
+
+    def set(self, cache_type, data, key=LATEST_KEY):
+        """写入缓存，同时更新内存层与磁盘层
+
+        Args:
+            cache_type: 缓存类型
+            data: 要保存的数据
+            key: 缓存标识，默认为latest
+
+        Returns:
+            None
+        """
+        entry = {"type": cache_type, "key": str(key), "saved_at": time.time(), "data": data}
+        self._remember(entry)
+        path = self._path(cache_type, entry["key"])
+        temp_path = path + ".part"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+        self._evict_disk()
+
+    def delete(self, cache_type, key=LATEST_KEY):
+        """删除单个缓存条目
+
+        Args:
+            cache_type: 缓存类型
+            key: 缓存标识，默认为latest
+
+        Returns:
+            None
+        """
+        key = str(key)
+        self._memory.pop((cache_type, key), None)
+        path = self._path(cache_type, key)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            print(f"删除缓存文件 {path} 失败: {e}")
+
+    def clear(self, cache_type):
+        """删除指定类型的所有缓存条目
+
+        Args:
+            cache_type: 缓存类型
+
+        Returns:
+            None
+        """
+        for memory_key in [k for k in self._memory if k[0] == cache_type]:
+            del self._memory[memory_key]
+        for fname in os.listdir(self.cache_dir):
+            if fname.startswith(f"{cache_type}_") and self.FILE_PATTERN.match(fname):
+                try:
+                    os.remove(os.path.join(self.cache_dir, fname))
+                except Exception as e:
+                    print(f"删除缓存文件 {fname} 失败: {e}")
+
+    def _evict_disk(self):
+        """磁盘条目超过上限时删除最久未访问的条目，latest条目不参与淘汰
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        entries = []
+        for fname in os.listdir(self.cache_dir):
+            if self.FILE_PATTERN.match(fname) and not fname.endswith(f"_{LATEST_KEY}.json"):
+                path = os.path.join(self.cache_dir, fname)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
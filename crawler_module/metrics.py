@@ -0,0 +1,293 @@
+import json
+import time
+import inspect
+import functools
+import threading
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(label_key, extra=None):
+    pairs = list(label_key) + list(extra or [])
+    if not pairs:
+        return ""
+    escaped = [(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def timed(stage):
+    """方法装饰器，用所属爬虫的self.metrics记录整个方法的耗时，支持同步与异步方法
+
+    Args:
+        stage: 阶段名称
+
+    Returns:
+        Callable: 装饰器
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                with self.metrics.timer(stage):
+                    return await func(self, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.timer(stage):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Metrics:
+    """爬虫的计时与计数指标
+
+    各阶段(fetch、resolve、key_capture、decrypt、transcode、pdf_build)的耗时按直方图汇总，
+    字节数、重试、域名切换等按计数器累计；每次记录都会以事件字典通知订阅的钩子，
+    汇总结果可以导出为Prometheus文本格式或JSON行
+    """
+
+    def __init__(self, prefix="manga_crawler", buckets=DEFAULT_BUCKETS):
+        """初始化指标
+
+        Args:
+            prefix: 导出时的指标名前缀，默认为manga_crawler
+            buckets: 耗时直方图的桶上界(秒)，默认为DEFAULT_BUCKETS
+
+        Returns:
+            None
+        """
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.timings = {}
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, hook):
+        """订阅指标事件
+
+        Args:
+            hook: 回调函数，参数为事件字典 {"type", "name", "labels", "value", "ts"}
+
+        Returns:
+            hook: 传入的回调，便于之后取消订阅
+        """
+        self._hooks.append(hook)
+        return hook
+
+    def unsubscribe(self, hook):
+        """取消订阅
+
+        Args:
+            hook: 之前订阅的回调
+
+        Returns:
+            None
+        """
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def _emit(self, kind, name, labels, value):
+        if not self._hooks:
+            return
+        event = {"type": kind, "name": name, "labels": labels, "value": value, "ts": time.time()}
+        for hook in list(self._hooks):
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"指标钩子执行失败: {e}")
+
+    def inc(self, name, value=1, **labels):
+        """累加计数器
+
+        Args:
+            name: 计数器名称
+            value: 增量，默认为1
+            **labels: 标签
+
+        Returns:
+            None
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        self._emit("counter", name, labels, value)
+
+    def observe(self, stage, seconds, **labels):
+        """记录一次阶段耗时
+
+        Args:
+            stage: 阶段名称
+            seconds: 耗时(秒)
+            **labels: 标签
+
+        Returns:
+            None
+        """
+        key = (stage, _label_key(labels))
+        with self._lock:
+            timing = self.timings.get(key)
+            if timing is None:
+                timing = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(self.buckets)}
+                self.timings[key] = timing
+            timing["count"] += 1
+            timing["sum"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    timing["buckets"][index] += 1
+        self._emit("timing", stage, labels, seconds)
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """计时上下文，退出时记录耗时(包括抛出异常的情况)
+
+        Args:
+            stage: 阶段名称
+            **labels: 标签
+
+        Returns:
+            ContextManager: 计时上下文
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        """汇总当前所有指标
+
+        Args:
+            None
+
+        Returns:
+            list: 指标记录列表，每条为 {"type", "name", "labels", ...}
+        """
+        with self._lock:
+            records = [
+                {"type": "counter", "name": name, "labels": dict(label_key), "value": value}
+                for (name, label_key), value in self.counters.items()
+            ]
+            for (name, label_key), timing in self.timings.items():
+                records.append({
+                    "type": "timing", "name": name, "labels": dict(label_key),
+                    "count": timing["count"], "sum": round(timing["sum"], 6), "max": round(timing["max"], 6)
+                })
+        return records
+
+    def to_json_lines(self):
+        """导出为JSON行
+
+        Args:
+            None
+
+        Returns:
+            str: 每行一条指标记录
+        """
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in self.snapshot())
+
+    def to_prometheus(self):
+        """导出为Prometheus文本格式，计数器以_total结尾，耗时为_seconds直方图
+
+        Args:
+            None
+
+        Returns:
+            str: Prometheus文本格式的指标
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            timings = sorted(self.timings.items())
+        declared = set()
+        for (name, label_key), value in counters:
+            metric = f"{self.prefix}_{name}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{_format_labels(label_key)} {value}")
+        for (name, label_key), timing in timings:
+            metric = f"{self.prefix}_{name}_seconds"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} histogram")
+                declared.add(metric)
+            for bound, count in zip(self.buckets, timing["buckets"]):
+                lines.append(f"{metric}_bucket{_format_labels(label_key, [('le', str(bound))])} {count}")
+            lines.append(f"{metric}_bucket{_format_labels(label_key, [('le', '+Inf')])} {timing['count']}")
+            lines.append(f"{metric}_sum{_format_labels(label_key)} {timing['sum']}")
+            lines.append(f"{metric}_count{_format_labels(label_key)} {timing['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class JsonLinesSink:
+    """将指标事件以JSON行追加写入文件的钩子
+
+    事件先缓存在内存中，积累到buffer_size条或距上次写入超过flush_interval秒时批量写入，
+    关闭时写入剩余事件，避免每个事件都在事件循环线程上同步写盘
+    """
+
+    def __init__(self, path, flush_interval=1.0, buffer_size=1000):
+        """打开输出文件
+
+        Args:
+            path: JSON行文件路径
+            flush_interval: 批量写入的最长间隔秒数，默认为1
+            buffer_size: 触发批量写入的缓存事件数，默认为1000
+
+        Returns:
+            None
+        """
+        self.file = open(path, "a", encoding="utf-8")
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.buffer_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        """立即写入缓存的事件
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self.file.write("".join(self._buffer))
+            self._buffer.clear()
+        self.file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """写入剩余事件并关闭输出文件
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if not self.file.closed:
+                self._flush()
+                self.file.close()
@@ -0,0 +1,163 @@
+import os
+from .image_utils import read_jpeg_info
+
+COLOR_SPACES = {1: "/DeviceGray", 3: "/DeviceRGB"}
+
+
+class StreamingPDFWriter:
+    """逐页写入磁盘的PDF生成器
+
+    JPEG数据按块原样拷贝进PDF(DCTDecode)，同一时间只持有一页的读缓冲，
+    内存占用与章节页数无关；页面可以乱序加入，关闭时按序号排列
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, path, dpi=96):
+        """打开PDF输出，内容先写入同目录临时文件，关闭时原子替换
+
+        Args:
+            path: PDF文件路径
+            dpi: JFIF中没有记录分辨率时使用的分辨率，默认为96(不读取EXIF中的分辨率)
+
+        Returns:
+            None
+        """
+        self.path = path
+        self.temp_path = path + ".part"
+        self.dpi = dpi
+        self._file = open(self.temp_path, "wb")
+        self._offsets = {}
+        self._pages = {}
+        self._next_object = 3
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def _begin_object(self, number=None):
+        if number is None:
+            number = self._next_object
+            self._next_object += 1
+        self._offsets[number] = self._file.tell()
+        self._file.write(f"{number} 0 obj\n".encode())
+        return number
+
+    def _write_object(self, body, number=None):
+        number = self._begin_object(number)
+        self._file.write(body.encode() + b"\nendobj\n")
+        return number
+
+    def _points(self, pixels, dpi):
+        return f"{pixels * 72 / dpi:.4f}".rstrip("0").rstrip(".")
+
+    def add_page(self, index, image_path):
+        """把一张JPEG图片作为一页写入PDF
+
+        Args:
+            index: 页面序号，决定最终页序
+            image_path: JPEG图片路径
+
+        Returns:
+            None
+        """
+        with open(image_path, "rb") as f:
+            info = read_jpeg_info(f)
+            if info is None:
+                raise ValueError(f"不是有效的JPEG图片: {image_path}")
+            if info.components not in COLOR_SPACES or info.precision != 8:
+                raise ValueError(f"不支持直接嵌入的JPEG格式: {image_path}")
+            length = os.fstat(f.fileno()).st_size
+            f.seek(0)
+            image_number = self._begin_object()
+            self._file.write(
+                f"<< /Type /XObject /Subtype /Image /Width {info.width} /Height {info.height} "
+                f"/ColorSpace {COLOR_SPACES[info.components]} /BitsPerComponent 8 "
+                f"/Filter /DCTDecode /Length {length} >>\nstream\n".encode()
+            )
+            while True:
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                self._file.write(chunk)
+            self._file.write(b"\nendstream\nendobj\n")
+        x_dpi, y_dpi = info.dpi or (self.dpi, self.dpi)
+        width = self._points(info.width, x_dpi)
+        height = self._points(info.height, y_dpi)
+        content = f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q"
+        content_number = self._write_object(
+            f"<< /Length {len(content)} >>\nstream\n{content}\nendstream"
+        )
+        self._pages[index] = self._write_object(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /XObject << /Im0 {image_number} 0 R >> >> /Contents {content_number} 0 R >>"
+        )
+
+    def close(self):
+        """写入页面树、交叉引用表并完成文件
+
+        Args:
+            None
+
+        Returns:
+            bool: 是否生成了PDF，没有任何页面时返回False
+        """
+        if not self._pages:
+            self.abort()
+            return False
+        kids = " ".join(f"{self._pages[index]} 0 R" for index in sorted(self._pages))
+        self._write_object(f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>", 2)
+        self._write_object("<< /Type /Catalog /Pages 2 0 R >>", 1)
+        xref_offset = self._file.tell()
+        size = self._next_object
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        lines += [f"{self._offsets[number]:010d} 00000 n \n" for number in range(1, size)]
+        lines.append(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self._file.write("".join(lines).encode())
+        self._file.close()
+        os.replace(self.temp_path, self.path)
+        return True
+
+    def abort(self):
+        """放弃写入并删除临时文件
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+def write_pdf(pdf_path, image_paths):
+    """按给定顺序把JPEG图片写成PDF，模块级函数，可提交到进程池执行
+
+    Args:
+        pdf_path: PDF文件路径
+        image_paths: JPEG图片路径列表
+
+    Returns:
+        bool: 是否生成了PDF
+    """
+    writer = StreamingPDFWriter(pdf_path)
+    try:
+        for index, image_path in enumerate(image_paths):
+            writer.add_page(index, image_path)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
@@ -0,0 +1,98 @@
+import asyncio
+from collections import namedtuple
+
+DEFAULT_STAGE_LIMITS = {
+    "resolve": 3,
+    "fetch": 2,
+    "assemble": 1,
+    "window": 8,
+}
+
+
+class StageError(Exception):
+    """章节在某个阶段失败，消息作为该章节的下载结果"""
+    pass
+
+
+class StageSkipped(StageError):
+    """章节无需处理(例如已下载完成)，消息作为该章节的下载结果"""
+    pass
+
+
+class ChapterOutcome(namedtuple("ChapterOutcome", ["status", "message"])):
+    """单个章节的下载结果，status为done、partial、skipped或failed，转为字符串时即为message"""
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.status in ("done", "skipped")
+
+    def __str__(self):
+        return self.message
+
+
+class ChapterPipeline:
+    """分阶段的多章节下载调度器
+
+    元数据解析、图片下载、PDF生成三个阶段各自有全局并发上限，
+    章节N还在下载图片时章节N+1已经可以解析元数据，章节N-1可以同时生成PDF
+    """
+
+    STAGES = ("resolve", "fetch", "assemble")
+
+    def __init__(self, resolve, fetch, assemble, limits=None):
+        """初始化调度器
+
+        Args:
+            resolve: 解析阶段协程函数 resolve(chapter) -> info
+            fetch: 下载阶段协程函数 fetch(chapter, info) -> fetched
+            assemble: 生成阶段协程函数 assemble(chapter, info, fetched) -> ChapterOutcome或str(视为done)
+            limits: 各阶段并发上限，window为同时在流水线中的章节数，默认为None
+
+        Returns:
+            None
+        """
+        limits = {**DEFAULT_STAGE_LIMITS, **(limits or {})}
+        self.stages = dict(zip(self.STAGES, (resolve, fetch, assemble)))
+        self.semaphores = {stage: asyncio.Semaphore(limits[stage]) for stage in self.STAGES}
+        self.window = asyncio.Semaphore(limits["window"])
+
+    async def _run_stage(self, stage, *args):
+        async with self.semaphores[stage]:
+            return await self.stages[stage](*args)
+
+    async def _run_chapter(self, chapter):
+        """依次执行单个章节的三个阶段
+
+        Args:
+            chapter: 章节数据
+
+        Returns:
+            ChapterOutcome: 该章节的下载结果
+        """
+        async with self.window:
+            try:
+                info = await self._run_stage("resolve", chapter)
+                fetched = await self._run_stage("fetch", chapter, info)
+                outcome = await self._run_stage("assemble", chapter, info, fetched)
+            except StageSkipped as e:
+                return ChapterOutcome("skipped", str(e))
+            except StageError as e:
+                return ChapterOutcome("failed", str(e))
+            except Exception as e:
+                return ChapterOutcome("failed", f"出错: {e}")
+            if isinstance(outcome, ChapterOutcome):
+                return outcome
+            return ChapterOutcome("done", str(outcome))
+
+    async def run(self, chapters):
+        """运行全部章节，按输入顺序返回结果
+
+        Args:
+            chapters: 章节数据列表
+
+        Returns:
+            list: 与chapters一一对应的ChapterOutcome
+        """
+        return await asyncio.gather(*(self._run_chapter(chapter) for chapter in chapters))
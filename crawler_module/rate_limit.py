@@ -0,0 +1,269 @@
+import time
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class TokenBucket:
+    """令牌桶限速器，平均每秒最多放行rate个请求，允许burst个请求的突发"""
+
+    def __init__(self, rate, burst=None):
+        """初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            burst: 桶容量，默认为None即与rate相同(至少为1)
+
+        Returns:
+            None
+        """
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """取出一个令牌，令牌不足时等待
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AIMDLimiter:
+    """单个主机的自适应并发限制器
+
+    请求成功且延迟正常时加性增加并发上限(每轮约+1)，
+    遇到429/5xx、网络错误或延迟明显升高时乘性减小，可选叠加令牌桶限速
+    """
+
+    def __init__(self, initial=10, min_limit=1, max_limit=64, backoff_ratio=0.5, latency_tolerance=3.0,
+                 rate=None, burst=None):
+        """初始化限制器
+
+        Args:
+            initial: 初始并发上限，默认为10
+            min_limit: 并发上限的下限，默认为1
+            max_limit: 并发上限的上限，默认为64
+            backoff_ratio: 过载时并发上限乘以的系数，默认为0.5
+            latency_tolerance: 延迟超过基线延迟(慢速EWMA)的倍数时视为过载，默认为3.0
+            rate: 每秒最多发起的请求数，默认为None即不限速
+            burst: 令牌桶容量，默认为None
+
+        Returns:
+            None
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.in_flight = 0
+        self.base_latency = None
+        self.last_decrease = 0.0
+        self._waiters = []
+
+    async def acquire(self):
+        """占用一个并发名额，超过当前上限时等待
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self, latency=None, overloaded=False):
+        """释放名额并根据本次请求的结果调整并发上限
+
+        Args:
+            latency: 成功请求的耗时(秒)，默认为None
+            overloaded: 是否为过载信号(429/5xx/网络错误)，默认为False
+
+        Returns:
+            None
+        """
+        self.in_flight -= 1
+        if not overloaded and latency is not None:
+            if self.base_latency is None:
+                self.base_latency = latency
+            else:
+                self.base_latency += 0.05 * (latency - self.base_latency)
+            overloaded = latency > self.base_latency * self.latency_tolerance
+        if overloaded:
+            self._decrease(latency)
+        elif latency is not None:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _decrease(self, latency):
+        # 同一批在途请求的失败只减一次，避免上限被连续砍到最低
+        now = time.monotonic()
+        if now - self.last_decrease < (latency or self.base_latency or 0):
+            return
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        for waiter in self._waiters[:max(0, free)]:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class ByteBudget:
+    """爬虫全局的在途字节预算，可由多个爬虫共用
+
+    发起图片请求前按预估大小预留字节，在途字节超过上限时新的请求等待；
+    已经开始接收的响应体超出预留时直接追加记账而不等待，避免已开始的下载互相等待造成死锁；
+    页面保存或解密完成后释放，并用实际大小更新预估值
+    """
+
+    def __init__(self, limit=None, estimate=1 << 20):
+        """初始化预算
+
+        Args:
+            limit: 在途字节上限，默认为None即不限制(仍统计在途与峰值字节数)
+            estimate: 单个响应体的初始预估字节数，默认为1MB
+
+        Returns:
+            None
+        """
+        self.limit = limit
+        self.estimate = estimate
+        self.in_flight = 0
+        self.peak = 0
+        self._waiters = []
+
+    async def acquire(self, nbytes):
+        """预留字节，在途字节加上本次预留超过上限时等待；没有在途字节时总是放行，单个超大响应不会卡死
+
+        Args:
+            nbytes: 预留的字节数
+
+        Returns:
+            None
+        """
+        while self.limit is not None and self.in_flight and self.in_flight + nbytes > self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.grow(nbytes)
+
+    def grow(self, nbytes):
+        """追加记账，不等待
+
+        Args:
+            nbytes: 字节数
+
+        Returns:
+            None
+        """
+        self.in_flight += nbytes
+        self.peak = max(self.peak, self.in_flight)
+
+    def release(self, nbytes, actual=None):
+        """释放预留的字节
+
+        Args:
+            nbytes: 释放的字节数
+            actual: 响应体的实际大小，用于更新预估值，默认为None
+
+        Returns:
+            None
+        """
+        self.in_flight -= nbytes
+        if actual:
+            self.estimate = int(self.estimate + 0.2 * (actual - self.estimate))
+        self._wake()
+
+    @asynccontextmanager
+    async def reserve(self):
+        """按当前预估值预留字节，退出时释放
+
+        Args:
+            None
+
+        Returns:
+            AsyncContextManager[ByteReservation]: 预留记录，收到的数据通过add记账
+        """
+        reservation = ByteReservation(self, self.estimate)
+        await self.acquire(reservation.held)
+        try:
+            yield reservation
+        finally:
+            self.release(reservation.held, reservation.used)
+
+    def _wake(self):
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class ByteReservation:
+    """一次响应体下载的字节预留"""
+
+    def __init__(self, budget, held):
+        self.budget = budget
+        self.held = held
+        self.used = 0
+
+    def add(self, nbytes):
+        """记录收到的字节，超出预留的部分追加到预算中
+
+        Args:
+            nbytes: 字节数
+
+        Returns:
+            None
+        """
+        self.used += nbytes
+        if self.used > self.held:
+            self.budget.grow(self.used - self.held)
+            self.held = self.used
+
+    def rewind(self):
+        """重试前清零已收到的字节数，已追加的预留保持不变直到释放
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.used = 0
@@ -0,0 +1,207 @@
+import time
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """主机熔断中，请求未发出即失败"""
+
+    def __init__(self, host):
+        super().__init__(f"{host} 熔断中，暂停请求")
+        self.host = host
+
+
+class NonRetryableError(Exception):
+    """服务器返回了不可重试的状态码"""
+
+    def __init__(self, status_code):
+        super().__init__(f"状态码 {status_code} 不可重试")
+        self.status_code = status_code
+
+
+class CircuitBreaker:
+    """单个主机的熔断器
+
+    连续失败达到阈值后熔断，冷却期内请求直接失败；
+    冷却结束后只放行一个探测请求，成功则恢复，失败则重新熔断
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """初始化熔断器
+
+        Args:
+            failure_threshold: 触发熔断的连续失败次数，默认为5
+            reset_timeout: 熔断冷却秒数，默认为30
+
+        Returns:
+            None
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def is_open(self):
+        """熔断中且冷却未结束
+
+        Args:
+            None
+
+        Returns:
+            bool: 是否熔断中
+        """
+        return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self):
+        """判断是否放行一次请求
+
+        Args:
+            None
+
+        Returns:
+            bool: 是否放行
+        """
+        if self.opened_at is None:
+            return True
+        if self.is_open() or self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def record_success(self):
+        """记录成功，关闭熔断
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self, probe=False):
+        """记录失败，达到阈值或探测失败时熔断
+
+        探测进行中时，熔断前发出的其他请求失败不会结束探测，避免同时放行第二个探测请求
+
+        Args:
+            probe: 该失败是否来自探测请求，默认为False
+
+        Returns:
+            None
+        """
+        self.failures += 1
+        if probe or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        if probe:
+            self.probing = False
+
+    def release_probe(self):
+        """探测请求没有得出结果(如被取消)时交还探测名额，下一次请求重新探测，否则主机会一直被拒绝
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.probing = False
+
+
+class RetryPolicy:
+    """统一的重试策略：指数退避加随机抖动、Retry-After、不可重试状态码分类与按主机熔断"""
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=10.0, retry_statuses=None,
+                 failure_threshold=5, reset_timeout=30.0):
+        """初始化重试策略
+
+        Args:
+            max_attempts: 单个请求的最大尝试次数，默认为3
+            base_delay: 退避基准秒数，默认为0.5
+            max_delay: 单次退避上限秒数，默认为10
+            retry_statuses: 可重试的状态码集合，默认为None即使用RETRYABLE_STATUS
+            failure_threshold: 熔断阈值，默认为5
+            reset_timeout: 熔断冷却秒数，默认为30
+
+        Returns:
+            None
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = RETRYABLE_STATUS if retry_statuses is None else set(retry_statuses)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+
+    def breaker(self, host):
+        """获取主机的熔断器
+
+        Args:
+            host: 主机名
+
+        Returns:
+            CircuitBreaker: 熔断器
+        """
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self._breakers[host] = breaker
+        return breaker
+
+    def is_retryable(self, status_code):
+        """判断状态码是否值得重试
+
+        Args:
+            status_code: HTTP状态码
+
+        Returns:
+            bool: 是否可重试
+        """
+        return status_code in self.retry_statuses
+
+    def retry_after(self, response):
+        """解析响应的Retry-After头
+
+        Args:
+            response: 响应对象
+
+        Returns:
+            float: 需要等待的秒数，没有该头或无法解析时返回None
+        """
+        if response is None:
+            return None
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def backoff(self, attempt, response=None):
+        """计算第attempt次失败后的等待时间
+
+        Args:
+            attempt: 已失败的次数(从0开始)
+            response: 失败时的响应，用于读取Retry-After，默认为None
+
+        Returns:
+            float: 等待秒数
+        """
+        retry_after = self.retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
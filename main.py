@@ -1,6 +1,5 @@
 import asyncio
-from crawler_module.cola_crawler import ColaCrawler
-from crawler_module.copy_crawler import CopyCrawler
+from crawler_module.aggregate_search import AggregatedSearch
 
 PROXIES = None
 
@@ -17,10 +16,57 @@ async def main():
     print("\n请选择漫画源:")
     print("1. ColaManga (默认)")
     print("2. CopyManga")
-    source_choice = input("请输入选项 [1/2]: ").strip() or "1"
-
-    crawler = ColaCrawler(proxies=PROXIES) if source_choice == "1" else CopyCrawler(proxies=PROXIES)
-
+    print("3. 全部漫画源聚合搜索")
+    source_choice = input("请输入选项 [1/2/3]: ").strip() or "1"
+
+    if source_choice == "3":
+        await run_aggregate_search()
+        return
+
+    crawler = create_crawler("cola" if source_choice == "1" else "copy")
+    async with crawler:
+        await run_action(crawler)
+
+
+def create_crawler(source):
+    # 按需导入，只使用CopyManga时不会加载浏览器、HTML解析等Cola专用依赖
+    if source == "cola":
+        from crawler_module.cola_crawler import ColaCrawler
+        return ColaCrawler(proxies=PROXIES)
+    from crawler_module.copy_crawler import CopyCrawler
+    return CopyCrawler(proxies=PROXIES)
+
+
+async def run_aggregate_search():
+    keywords = [k.strip() for k in input("\n请输入搜索关键词(多个用逗号分隔): ").replace("，", ",").split(",") if k.strip()]
+    if not keywords:
+        print("错误: 搜索操作需要提供关键词")
+        return
+
+    pages = input("请输入每个关键词搜索的页数 [默认1]: ").strip() or "1"
+    try:
+        pages = max(1, int(pages))
+    except ValueError:
+        print("无效的页数，使用默认值1")
+        pages = 1
+
+    crawlers = {source: create_crawler(source) for source in ("cola", "copy")}
+    try:
+        search = AggregatedSearch(crawlers, keywords, range(1, pages + 1))
+        count = 0
+        async for entry in search.stream():
+            count += 1
+            sources = ", ".join(f"{hit['source']}:{hit['path_word']}" for hit in entry["sources"])
+            print(f"{count}. {entry['name']}  [{sources}]")
+        print(f"\n共找到 {count} 部漫画")
+        for source, errors in search.errors.items():
+            print(f"{source} 部分搜索失败: {'; '.join(errors)}")
+    finally:
+        for crawler in crawlers.values():
+            await crawler.close()
+
+
+async def run_action(crawler):
     # 选择操作类型
     print("\n请选择操作类型:")
     print("1. 搜索漫画")
@@ -0,0 +1,37 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_crawler(tmp_path, monkeypatch):
+    """在临时目录中创建只用于测试请求层的最小爬虫"""
+    pytest.importorskip("curl_cffi")
+    from crawler_module.base_crawler import BaseCrawler
+
+    class DummyCrawler(BaseCrawler):
+        async def search_manga(self, keyword, page=1):
+            return ""
+
+        async def search_results(self, keyword, page=1):
+            return {}
+
+        async def get_manga_chapters(self, index_or_url):
+            return ""
+
+        async def download_report(self, chapter_spec, index_or_url):
+            return self.make_report("")
+
+    monkeypatch.chdir(tmp_path)
+    crawlers = []
+
+    def create(**kwargs):
+        crawler = DummyCrawler(**kwargs)
+        crawlers.append(crawler)
+        return crawler
+
+    yield create
+    for crawler in crawlers:
+        crawler.manifest.close()
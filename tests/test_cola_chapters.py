@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+
+
+@pytest.fixture
+def crawler(tmp_path, monkeypatch):
+    pytest.importorskip("curl_cffi")
+    from crawler_module.cola_crawler import ColaCrawler
+    monkeypatch.chdir(tmp_path)
+    crawler = ColaCrawler(cache_ttls={"chapters": 60})
+    yield crawler
+    crawler.manifest.close()
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+
+def test_cached_chapters_keep_manga_name(crawler):
+    requests = []
+
+    async def fetch(url, **kwargs):
+        requests.append(url)
+        return FakeResponse()
+    crawler.fetch = fetch
+    crawler.parse_manga_page = lambda html: {"name": "示例漫画", "chapters": [{"name": "第1话", "url": "u1"}]}
+    first = asyncio.run(crawler.load_manga_page("manga-demo", "https://www.colamanga.com/manga-demo"))
+    second = asyncio.run(crawler.load_manga_page("manga-demo", "https://www.colamanga.com/manga-demo"))
+    assert first == second == {"name": "示例漫画", "chapters": [{"name": "第1话", "url": "u1"}]}
+    assert len(requests) == 1
+    assert crawler.cache.ttls["chapters"] == 60
+
+
+def test_legacy_chapter_list_cache_is_refetched(crawler):
+    crawler.save_to_cache("chapters", [{"name": "第1话", "url": "u1"}], "manga-demo")
+
+    async def fetch(url, **kwargs):
+        return FakeResponse()
+    crawler.fetch = fetch
+    crawler.parse_manga_page = lambda html: {"name": "示例漫画", "chapters": [{"name": "第1话", "url": "u1"}]}
+    page = asyncio.run(crawler.load_manga_page("manga-demo", "https://www.colamanga.com/manga-demo"))
+    assert page["name"] == "示例漫画"
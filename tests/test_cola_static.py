@@ -0,0 +1,186 @@
+import os
+import base64
+import pytest
+from crawler_module.aes_backend import available_backends, get_aes_backend
+from crawler_module.cola_static import (ZERO_IV, key_candidates, find_image_key, find_chapter_data,
+                                        decode_chapter_data, resolve_image_info, unescape_js)
+
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+IMAGE_KEY = b"testimagekey0001"
+DATA_KEY = b"testdatakey00002"
+CODE_KEY = b"testcodekey00003"
+WRONG_KEY = b"wrongkeywrongkey"
+
+
+@pytest.fixture(params=available_backends())
+def backend(request):
+    return get_aes_backend(request.param)
+
+
+def encrypt(key, data, mode):
+    padder = padding.PKCS7(128).padder()
+    padded = padder.update(data) + padder.finalize()
+    encryptor = Cipher(algorithms.AES(key), mode).encryptor()
+    return encryptor.update(padded) + encryptor.finalize()
+
+
+def encrypt_text(key, text, mode=None):
+    return base64.b64encode(encrypt(key, text.encode("utf-8"), mode or modes.ECB())).decode("ascii")
+
+
+def js_hex(text):
+    return "".join(f"\\x{ord(c):02x}" for c in text)
+
+
+def js_unicode(text):
+    return "".join(f"\\u{ord(c):04x}" for c in text)
+
+
+def chapter_script(pages="12", path="manga-77/chapterX", startimg=1, img_type="enc.webp"):
+    return (
+        f'var mh_info={{startimg:{startimg},enc_code1:"{encrypt_text(CODE_KEY, pages)}",mhid:"77",'
+        f'enc_code2:"{encrypt_text(CODE_KEY, path)}",mhname:"test",pageid:5}};'
+        f'var image_info={{img_type:"{img_type}",urls__direct:"",line_id:1}};'
+    )
+
+
+def test_unescape_js_hex_and_unicode():
+    assert unescape_js(js_hex("abc")) == "abc"
+    assert unescape_js(js_unicode("键")) == "键"
+    assert unescape_js(r"a\'b\nc") == "a'b\nc"
+
+
+def test_key_candidates_prefers_parse_arguments():
+    scripts = [
+        'var decoy="abcdefghijklmnop";var short="tooshort";',
+        f'var k=CryptoJS.enc.Utf8.parse("{js_hex(IMAGE_KEY.decode())}");',
+        f"var h=CryptoJS.enc.Hex.parse('{DATA_KEY.hex()}');",
+        f'var b=CryptoJS.enc.Base64.parse("{base64.b64encode(CODE_KEY).decode()}");',
+        f'var u="{js_unicode(IMAGE_KEY.decode())}";',
+    ]
+    candidates = key_candidates(scripts)
+    assert candidates[:3] == [IMAGE_KEY, DATA_KEY, CODE_KEY]
+    assert b"abcdefghijklmnop" in candidates
+    assert b"tooshort" not in candidates
+    assert candidates.count(IMAGE_KEY) == 1
+
+
+def test_key_candidates_ignores_invalid_parse_arguments():
+    scripts = ['CryptoJS.enc.Hex.parse("zz");CryptoJS.enc.Base64.parse("***");CryptoJS.enc.Utf8.parse("short")']
+    assert key_candidates(scripts) == []
+
+
+def test_find_image_key(backend):
+    sample = encrypt(IMAGE_KEY, b"\xff\xd8\xff\xe0" + os.urandom(500), modes.CBC(ZERO_IV))
+    candidates = [WRONG_KEY, b"abcdefghijklmnop", IMAGE_KEY]
+    assert find_image_key(candidates, sample, backend) == IMAGE_KEY
+
+
+def test_find_image_key_without_correct_key(backend):
+    sample = encrypt(IMAGE_KEY, b"RIFF" + os.urandom(300), modes.CBC(ZERO_IV))
+    assert find_image_key([WRONG_KEY, DATA_KEY], sample, backend) is None
+    assert find_image_key([], sample, backend) is None
+
+
+def test_find_image_key_rejects_non_image_plaintext(backend):
+    sample = encrypt(IMAGE_KEY, b"<html>" + os.urandom(300), modes.CBC(ZERO_IV))
+    assert find_image_key([IMAGE_KEY], sample, backend) is None
+
+
+def test_find_image_key_decrypts_only_edge_blocks(backend):
+    sample = encrypt(IMAGE_KEY, b"\x89PNG" + os.urandom(4000), modes.CBC(ZERO_IV))
+    decrypted = []
+
+    class RecordingBackend:
+        def decrypt_block(self, key, block):
+            decrypted.append(len(block))
+            return backend.decrypt_block(key, block)
+
+        def decrypt_cbc(self, key, iv, data):
+            decrypted.append(len(data))
+            return backend.decrypt_cbc(key, iv, data)
+
+    assert find_image_key([WRONG_KEY, DATA_KEY, IMAGE_KEY], sample, RecordingBackend()) == IMAGE_KEY
+    assert max(decrypted) == 16
+
+
+def test_find_image_key_with_iv(backend):
+    iv = os.urandom(16)
+    sample = encrypt(IMAGE_KEY, b"GIF89a" + os.urandom(100), modes.CBC(iv))
+    assert find_image_key([IMAGE_KEY], sample, backend, iv) == IMAGE_KEY
+    assert find_image_key([IMAGE_KEY], sample, backend) is None
+
+
+def test_find_image_key_rejects_malformed_sample(backend):
+    assert find_image_key([IMAGE_KEY], b"\x00" * 40, backend) is None
+    assert find_image_key([IMAGE_KEY], b"\x00" * 16, backend) is None
+
+
+def test_find_chapter_data():
+    html = "<script>\nvar C_DATA = 'QUJD\n  REVG';\n</script>"
+    assert find_chapter_data(html) == "QUJDREVG"
+    assert find_chapter_data('<script>var C_DATA="QUJD";</script>') == "QUJD"
+
+
+def test_find_chapter_data_missing():
+    assert find_chapter_data("<script>var OTHER='QUJD';</script>") is None
+    assert find_chapter_data("") is None
+
+
+def test_decode_chapter_data_double_base64(backend):
+    c_data = base64.b64encode(encrypt_text(DATA_KEY, chapter_script()).encode("ascii")).decode("ascii")
+    result = decode_chapter_data(c_data, [WRONG_KEY, DATA_KEY], backend)
+    assert result["key"] == DATA_KEY
+    assert result["mh_info"]["mhid"] == "77"
+    assert result["image_info"]["img_type"] == "enc.webp"
+
+
+def test_decode_chapter_data_single_layer_cbc(backend):
+    c_data = encrypt_text(DATA_KEY, chapter_script(), modes.CBC(ZERO_IV))
+    result = decode_chapter_data(c_data, [DATA_KEY], backend)
+    assert result["key"] == DATA_KEY
+    assert result["mh_info"]["pageid"] == "5"
+
+
+def test_decode_chapter_data_unencrypted(backend):
+    c_data = base64.b64encode(chapter_script().encode("utf-8")).decode("ascii")
+    result = decode_chapter_data(c_data, [], backend)
+    assert result["key"] is None
+    assert result["mh_info"]["mhname"] == "test"
+
+
+def test_decode_chapter_data_wrong_key(backend):
+    c_data = base64.b64encode(encrypt_text(DATA_KEY, chapter_script()).encode("ascii")).decode("ascii")
+    assert decode_chapter_data(c_data, [WRONG_KEY, CODE_KEY], backend) is None
+    assert decode_chapter_data("not base64!", [DATA_KEY], backend) is None
+
+
+def decoded(script, backend):
+    c_data = base64.b64encode(encrypt_text(DATA_KEY, script).encode("ascii")).decode("ascii")
+    return decode_chapter_data(c_data, [DATA_KEY], backend)
+
+
+def test_resolve_image_info(backend):
+    chapter_data = decoded(chapter_script(), backend)
+    info = resolve_image_info(chapter_data, [DATA_KEY, CODE_KEY], backend)
+    assert info == ("manga-77", "chapterX", 12, "0001.enc.webp")
+
+
+def test_resolve_image_info_start_page_and_type(backend):
+    script = chapter_script(path="/comic/manga-77/chapterY/", startimg=3, img_type=".webp")
+    info = resolve_image_info(decoded(script, backend), [CODE_KEY], backend)
+    assert info == ("manga-77", "chapterY", 12, "0003.webp")
+
+
+def test_resolve_image_info_without_code_key(backend):
+    chapter_data = decoded(chapter_script(), backend)
+    assert resolve_image_info(chapter_data, [DATA_KEY, WRONG_KEY], backend) is None
+
+
+def test_resolve_image_info_incomplete(backend):
+    chapter_data = decoded('var mh_info={startimg:1,mhid:"77"};var image_info={};', backend)
+    assert resolve_image_info(chapter_data, [CODE_KEY], backend) is None
+    assert resolve_image_info(decoded(chapter_script(pages="0"), backend), [CODE_KEY], backend) is None
@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+
+
+@pytest.fixture
+def crawler(tmp_path, monkeypatch):
+    pytest.importorskip("curl_cffi")
+    from crawler_module.copy_crawler import CopyCrawler
+    monkeypatch.chdir(tmp_path)
+    crawler = CopyCrawler()
+    yield crawler
+    crawler.manifest.close()
+
+
+def chapter_page(names, total):
+    return {"results": {"list": [{"name": name, "uuid": name} for name in names], "total": total}}
+
+
+def serve(crawler, routes):
+    async def api_get(path, *args, **kwargs):
+        for prefix, data in routes.items():
+            if path.startswith(prefix):
+                return data
+        return None
+    crawler._api_get = api_get
+
+
+def test_fetch_chapters_includes_every_group(crawler):
+    serve(crawler, {
+        "/api/v3/comic2/demo": {"results": {"groups": {
+            "tankobon": {"path_word": "tankobon", "name": "单行本", "count": 1},
+            "default": {"path_word": "default", "name": "默认", "count": 2},
+        }}},
+        "/api/v3/comic/demo/group/default/": chapter_page(["第1话", "第2话"], 2),
+        "/api/v3/comic/demo/group/tankobon/": chapter_page(["第1卷"], 1),
+    })
+    chapters = asyncio.run(crawler._fetch_chapters("demo"))
+    assert [ch["name"] for ch in chapters] == ["第1话", "第2话", "[单行本] 第1卷"]
+    assert crawler.load_from_cache("chapters", "demo")["results"]["total"] == 3
+
+
+def test_fetch_chapters_fails_without_group_list(crawler):
+    serve(crawler, {"/api/v3/comic/demo/group/default/": chapter_page(["第1话"], 1)})
+    result = asyncio.run(crawler._fetch_chapters("demo"))
+    assert isinstance(result, str) and "获取章节失败" in result
+    assert crawler.load_from_cache("chapters", "demo") is None
+
+
+def test_fetch_chapters_fails_when_a_group_fails(crawler):
+    serve(crawler, {
+        "/api/v3/comic2/demo": {"results": {"groups": {
+            "default": {"path_word": "default", "name": "默认", "count": 1},
+            "other": {"path_word": "other", "name": "番外", "count": 1},
+        }}},
+        "/api/v3/comic/demo/group/default/": chapter_page(["第1话"], 1),
+    })
+    result = asyncio.run(crawler._fetch_chapters("demo"))
+    assert isinstance(result, str) and "番外" in result
+    assert crawler.load_from_cache("chapters", "demo") is None
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+def test_api_get_honors_retry_after(crawler, monkeypatch):
+    responses = [FakeResponse(429, {"Retry-After": "7"}), FakeResponse(200, text='{"results": {}}')]
+
+    async def fetch(url, **kwargs):
+        return responses.pop(0)
+    crawler.fetch = fetch
+    crawler.domains = crawler.domains[:1]
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    assert asyncio.run(crawler._api_get("/api/v3/comic2/demo")) == {"results": {}}
+    assert delays == [7.0]
+
+
+def test_revalidated_chapter_is_judged_by_fresh_page_count(crawler):
+    old_urls = [f"https://cdn.example.com/old/{page}.jpg" for page in range(1, 3)]
+    fresh_urls = [f"https://cdn.example.com/new/{page}.jpg" for page in range(1, 4)]
+
+    async def download_images(urls, dir_path, path_word, uuid):
+        completed_pages = crawler.manifest.completed_pages(uuid)
+        success = 0
+        for page in range(1, len(urls) + 1):
+            if page in completed_pages:
+                continue
+            if urls is old_urls and page == 2:
+                crawler.mark_stale(uuid, 403)
+                continue
+            crawler.manifest.mark_page(uuid, page, "hash")
+            success += 1
+        return success
+
+    async def get_image_urls(path_word, uuid, refresh=False):
+        return fresh_urls
+
+    async def generate_pdf(dir_path, pdf_path, keep_images=False):
+        return True
+    crawler._download_images = download_images
+    crawler._get_image_urls = get_image_urls
+    crawler._generate_pdf = generate_pdf
+
+    async def run():
+        fetched = await crawler._fetch_chapter("示例", "第1话", "demo", "ch-1", old_urls)
+        return await crawler._assemble_chapter("ch-1", *fetched)
+    outcome = asyncio.run(run())
+    assert outcome.status == "done"
+    assert outcome.message == "成功 3/3"
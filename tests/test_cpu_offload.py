@@ -0,0 +1,71 @@
+import os
+import asyncio
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from crawler_module.aes_backend import available_backends
+from crawler_module.cola_static import ZERO_IV, search_image_key
+
+pytest.importorskip("curl_cffi")
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+IMAGE_KEY = b"offloadimagekey1"
+
+
+def encrypt_cbc(key, data):
+    padder = padding.PKCS7(128).padder()
+    padded = padder.update(data) + padder.finalize()
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(ZERO_IV)).encryptor()
+    return encryptor.update(padded) + encryptor.finalize()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_cpu_queue_is_forwarded(workdir):
+    from crawler_module.cola_crawler import ColaCrawler
+    from crawler_module.copy_crawler import CopyCrawler
+    for crawler_class in (ColaCrawler, CopyCrawler):
+        crawler = crawler_class(cpu_workers=2, cpu_queue=7)
+        assert crawler._cpu_slots._value == 7
+        crawler.manifest.close()
+
+
+def test_search_image_key_runs_in_process_pool():
+    sample = encrypt_cbc(IMAGE_KEY, b"\xff\xd8\xff\xe0" + os.urandom(200))
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        for name in available_backends():
+            key = pool.submit(search_image_key, name, [b"0123456789abcdef", IMAGE_KEY], sample).result()
+            assert key == IMAGE_KEY
+
+
+def test_static_key_search_uses_executor(workdir):
+    from crawler_module.cola_crawler import ColaCrawler
+    crawler = ColaCrawler()
+    sample = encrypt_cbc(IMAGE_KEY, b"RIFF" + os.urandom(200))
+    submitted = []
+    run_cpu = crawler.run_cpu
+
+    async def recording_run_cpu(func, *args):
+        submitted.append(func)
+        return await run_cpu(func, *args)
+
+    async def fetch_reader_scripts(url):
+        return [f'CryptoJS.enc.Utf8.parse("{IMAGE_KEY.decode()}")']
+
+    crawler.run_cpu = recording_run_cpu
+    crawler.fetch_reader_scripts = fetch_reader_scripts
+
+    async def extract():
+        try:
+            return await crawler.extract_static_key("https://www.colamanga.com/manga-abc/1/2.html", sample)
+        finally:
+            await crawler.close()
+
+    assert asyncio.run(extract())
+    assert submitted == [search_image_key]
+    assert crawler._static_keys == [IMAGE_KEY]
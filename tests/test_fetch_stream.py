@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from crawler_module.body_sink import BufferSink
+from crawler_module.rate_limit import ByteBudget
+from crawler_module.retry import RetryPolicy
+
+HOST = "cdn.example.com"
+URL = f"https://{HOST}/comic/1/0001.jpg"
+
+
+class FakeResponse:
+    def __init__(self, status_code, chunks, fail_after=None, delay=0.0):
+        self.status_code = status_code
+        self.headers = {}
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.delay = delay
+        self.closed = False
+
+    async def aiter_content(self):
+        for index, chunk in enumerate(self.chunks):
+            if index == self.fail_after:
+                raise ConnectionResetError("connection reset")
+            await asyncio.sleep(self.delay)
+            yield chunk
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append(kwargs)
+        return self.responses.pop(0)
+
+
+def prepare(make_crawler, responses):
+    crawler = make_crawler(retry_policy=RetryPolicy(base_delay=0.0))
+    session = FakeSession(responses)
+    crawler.get_session = lambda host: session
+    return crawler, session
+
+
+def test_body_error_is_retried_and_sink_reset(make_crawler):
+    broken = FakeResponse(200, [b"aa", b"bb", b"cc"], fail_after=1)
+    good = FakeResponse(200, [b"11", b"22", b"33"])
+    crawler, session = prepare(make_crawler, [broken, good])
+    budget = ByteBudget()
+
+    async def download():
+        async with budget.reserve() as reservation:
+            sink = BufferSink(reservation)
+            response = await crawler.fetch(URL, sink=sink)
+            return response, sink.getvalue(), reservation.used
+
+    response, body, used = asyncio.run(download())
+    assert response.status_code == 200
+    assert body == b"112233"
+    assert used == 6
+    assert broken.closed and good.closed
+    assert all(kwargs["stream"] for kwargs in session.requests)
+    assert crawler.metrics.counters[("retries", (("host", HOST),))] == 1
+    assert crawler.retry_policy.breaker(HOST).failures == 0
+    assert budget.in_flight == 0
+
+
+def test_limiter_slot_held_until_body_drained(make_crawler):
+    response = FakeResponse(200, [b"x"] * 5, delay=0.01)
+    crawler, _ = prepare(make_crawler, [response])
+    limiter = crawler.get_limiter(HOST)
+    observed = []
+
+    class RecordingSink(BufferSink):
+        def write(self, chunk):
+            observed.append(limiter.in_flight)
+            super().write(chunk)
+
+    async def download():
+        async with ByteBudget().reserve() as reservation:
+            await crawler.fetch(URL, sink=RecordingSink(reservation))
+
+    asyncio.run(download())
+    assert observed == [1] * 5
+    assert limiter.in_flight == 0
+    timing = crawler.metrics.timings[("fetch", (("host", HOST),))]
+    assert timing["max"] >= 0.04
+
+
+def test_non_200_body_is_not_read(make_crawler):
+    response = FakeResponse(404, [b"not found"])
+    crawler, _ = prepare(make_crawler, [response])
+
+    async def download():
+        async with ByteBudget().reserve() as reservation:
+            sink = BufferSink(reservation)
+            result = await crawler.fetch(URL, sink=sink)
+            return result, sink.getvalue()
+
+    result, body = asyncio.run(download())
+    assert result.status_code == 404
+    assert body == b""
+    assert response.closed
+
+
+def test_body_errors_exhaust_retries(make_crawler):
+    responses = [FakeResponse(200, [b"a", b"b"], fail_after=1) for _ in range(3)]
+    crawler, _ = prepare(make_crawler, responses)
+
+    async def download():
+        async with ByteBudget().reserve() as reservation:
+            await crawler.fetch(URL, sink=BufferSink(reservation))
+
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(download())
+    assert crawler.retry_policy.breaker(HOST).failures == 3
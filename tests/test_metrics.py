@@ -0,0 +1,40 @@
+import json
+from crawler_module.metrics import Metrics, JsonLinesSink
+
+
+def read_events(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_json_lines_sink_buffers_until_close(tmp_path):
+    path = tmp_path / "events.jsonl"
+    metrics = Metrics()
+    sink = metrics.subscribe(JsonLinesSink(path, flush_interval=3600, buffer_size=100))
+    for _ in range(5):
+        metrics.inc("http_requests", host="a.example.com", status=200)
+    assert read_events(path) == []
+    sink.close()
+    events = read_events(path)
+    assert len(events) == 5
+    assert events[0]["name"] == "http_requests" and events[0]["labels"]["status"] == 200
+    sink.close()
+
+
+def test_json_lines_sink_flushes_full_buffer(tmp_path):
+    path = tmp_path / "events.jsonl"
+    sink = JsonLinesSink(path, flush_interval=3600, buffer_size=3)
+    for index in range(7):
+        sink({"type": "counter", "name": "n", "labels": {}, "value": index})
+    assert [event["value"] for event in read_events(path)] == list(range(6))
+    sink.flush()
+    assert len(read_events(path)) == 7
+    sink.close()
+
+
+def test_json_lines_sink_flushes_after_interval(tmp_path):
+    path = tmp_path / "events.jsonl"
+    sink = JsonLinesSink(path, flush_interval=0, buffer_size=100)
+    sink({"type": "counter", "name": "n", "labels": {}, "value": 1})
+    assert len(read_events(path)) == 1
+    sink.close()
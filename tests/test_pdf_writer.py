@@ -0,0 +1,75 @@
+import re
+from io import BytesIO
+import pytest
+from crawler_module.image_utils import read_jpeg_info
+from crawler_module.pdf_writer import StreamingPDFWriter, write_pdf
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def save_jpeg(path, size=(300, 600), **options):
+    Image.new("RGB", size, (200, 30, 30)).save(path, "JPEG", **options)
+    return str(path)
+
+
+def media_boxes(pdf_path):
+    with open(pdf_path, "rb") as f:
+        data = f.read()
+    return [tuple(float(v) for v in box) for box in re.findall(rb"/MediaBox \[0 0 ([\d.]+) ([\d.]+)\]", data)]
+
+
+@pytest.mark.parametrize("dpi, expected", [
+    ((300, 300), (72.0, 144.0)),
+    ((72, 72), (300.0, 600.0)),
+    ((150, 300), (144.0, 144.0)),
+])
+def test_page_size_follows_jfif_density(tmp_path, dpi, expected):
+    image = save_jpeg(tmp_path / "page.jpg", dpi=dpi)
+    pdf_path = str(tmp_path / "out.pdf")
+    assert write_pdf(pdf_path, [image])
+    assert media_boxes(pdf_path) == [expected]
+
+
+def test_page_size_defaults_without_density(tmp_path):
+    buffer = BytesIO()
+    Image.new("L", (96, 192)).save(buffer, "JPEG")
+    data = bytearray(buffer.getvalue())
+    # 把JFIF单位改为0(只有宽高比)，应按默认分辨率计算
+    assert data[6:11] == b"JFIF\0"
+    data[13] = 0
+    path = tmp_path / "page.jpg"
+    path.write_bytes(bytes(data))
+    assert read_jpeg_info(bytes(data)).dpi is None
+    pdf_path = str(tmp_path / "out.pdf")
+    assert write_pdf(pdf_path, [str(path)])
+    assert media_boxes(pdf_path) == [(72.0, 144.0)]
+
+
+def test_dots_per_centimetre(tmp_path):
+    buffer = BytesIO()
+    Image.new("RGB", (10, 10)).save(buffer, "JPEG", dpi=(254, 254))
+    data = bytearray(buffer.getvalue())
+    data[13] = 2
+    data[14:16] = (100).to_bytes(2, "big")
+    data[16:18] = (100).to_bytes(2, "big")
+    assert read_jpeg_info(bytes(data)).dpi == (254.0, 254.0)
+
+
+def test_pages_sorted_by_index(tmp_path):
+    small = save_jpeg(tmp_path / "a.jpg", size=(72, 72), dpi=(72, 72))
+    large = save_jpeg(tmp_path / "b.jpg", size=(144, 144), dpi=(72, 72))
+    pdf_path = str(tmp_path / "out.pdf")
+    with StreamingPDFWriter(pdf_path) as writer:
+        writer.add_page(1, small)
+        writer.add_page(0, large)
+    with open(pdf_path, "rb") as f:
+        data = f.read()
+    kids = [int(n) for n in re.findall(rb"(\d+) 0 R", re.search(rb"/Kids \[(.*?)\]", data).group(1))]
+    pages = {int(n): box for n, box in re.findall(rb"(\d+) 0 obj\n<< /Type /Page .*?/MediaBox \[0 0 ([\d.]+ [\d.]+)\]", data)}
+    assert [pages[k] for k in kids] == [b"144 144", b"72 72"]
+
+
+def test_empty_writer_leaves_no_file(tmp_path):
+    pdf_path = tmp_path / "out.pdf"
+    assert not write_pdf(str(pdf_path), [])
+    assert not pdf_path.exists() and not (tmp_path / "out.pdf.part").exists()
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from crawler_module.retry import CircuitBreaker, RetryPolicy
+
+
+def open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    return breaker
+
+
+def test_breaker_allows_single_probe_after_cooldown():
+    breaker = open_breaker()
+    assert breaker.allow()
+    assert breaker.probing
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    breaker.opened_at -= 60.0
+    assert breaker.allow()
+    breaker.record_failure(probe=True)
+    assert breaker.is_open()
+    assert not breaker.allow()
+
+
+def test_stale_failure_keeps_probe_in_flight():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60.0)
+    for _ in range(3):
+        breaker.record_failure()
+    breaker.opened_at -= 60.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.probing
+    assert not breaker.allow()
+
+
+def test_released_probe_can_be_retaken():
+    breaker = open_breaker()
+    assert breaker.allow()
+    breaker.release_probe()
+    assert not breaker.is_open()
+    assert breaker.allow()
+
+
+class HangingSession:
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def request(self, method, url, **kwargs):
+        self.started.set()
+        await asyncio.Event().wait()
+
+
+def test_cancelled_probe_does_not_blackhole_host(make_crawler):
+    crawler = make_crawler(retry_policy=RetryPolicy(failure_threshold=1, reset_timeout=0.0))
+    session = HangingSession()
+    crawler.get_session = lambda host: session
+    host = "mirror.example.com"
+    breaker = crawler.retry_policy.breaker(host)
+    breaker.record_failure()
+
+    async def cancel_probe():
+        task = asyncio.create_task(crawler.fetch(f"https://{host}/api"))
+        await session.started.wait()
+        assert breaker.probing
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert not breaker.probing
+    assert crawler.get_limiter(host).in_flight == 0
+    assert breaker.allow()